@@ -0,0 +1,220 @@
+import threading
+from array import array
+from datetime import date, timedelta
+
+from dates import DATE_COLUMNS
+
+# Period lengths the aggregations can group by
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+
+# Tables kept in memory: date column, amount column and text columns to group by
+CACHED_TABLES = {
+    'sales': ('date', 'total_amount', ('customer_name',)),
+    'financial_transactions': ('date', 'amount', ('type', 'category')),
+}
+
+def period_key(day, granularity):
+    """Bucket a 'YYYY-MM-DD' day: the day, its week's Monday, 'YYYY-MM' or 'YYYY-Qn'"""
+    if granularity == 'day':
+        return day
+    if granularity == 'month':
+        return day[:7]
+    if granularity == 'quarter':
+        return f"{day[:4]}-Q{(int(day[5:7]) - 1) // 3 + 1}"
+    if granularity == 'week':
+        start = date.fromisoformat(day)
+        return (start - timedelta(days=start.weekday())).isoformat()
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+class Dictionary:
+    """Distinct values of a text column, each stored once and referred to by code"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        """Return the code for a value, adding it when new"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class ColumnTable:
+    """One table held as column arrays, refreshed from the last id seen
+
+    The day and the text columns are dictionary encoded, so a million rows
+    take a few integer arrays plus one copy of each distinct value. Rows
+    whose date is not a readable day (legacy text left alone by migration
+    10, so their epoch column is NULL) are not loaded, as the daily_sales
+    rollup leaves them out too.
+    """
+
+    def __init__(self, table, date_column, value_column, group_columns):
+        self.table = table
+        self.date_column = date_column
+        self.value_column = value_column
+        self.group_columns = group_columns
+        self.rewrites = None
+        self.clear()
+
+    def clear(self):
+        """Drop every loaded row"""
+        self.last_id = 0
+        self.days = Dictionary()
+        self.day_codes = array('l')
+        self.values = array('d')
+        self.groups = {column: (Dictionary(), array('l')) for column in self.group_columns}
+
+    def refresh(self, db, batch_size=5000):
+        """Load rows added since the last refresh; reload all after updates or deletes"""
+        rewrites = db.fetch_value("SELECT rewrites FROM change_log WHERE table_name = ?",
+                                  (self.table,), default=0)
+        if rewrites != self.rewrites:
+            self.clear()
+            self.rewrites = rewrites
+
+        columns = ', '.join((self.date_column, self.value_column) + self.group_columns)
+        epoch_column = DATE_COLUMNS[self.table][2]
+        cursor = db.execute(f"""
+            SELECT id, {columns}
+            FROM {self.table}
+            WHERE id > ? AND {epoch_column} IS NOT NULL
+            ORDER BY id
+        """, (self.last_id,))
+
+        group_arrays = [self.groups[column] for column in self.group_columns]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+
+            ids, days, values, *groups = zip(*rows)
+            self.day_codes.extend(self.days.code(day[:10]) for day in days)
+            self.values.extend(value or 0 for value in values)
+            for (dictionary, codes), column in zip(group_arrays, groups):
+                codes.extend(dictionary.code(value) for value in column)
+            self.last_id = ids[-1]
+
+    def day_mask(self, start=None, end=None):
+        """Flag each day code inside an inclusive 'YYYY-MM-DD' range"""
+        return [(start is None or day >= start) and (end is None or day <= end)
+                for day in self.days.values]
+
+    def filter_mask(self, filters):
+        """Flag each row matching every column -> value filter, or None without filters"""
+        mask = None
+        for column, wanted in (filters or {}).items():
+            dictionary, codes = self.groups[column]
+            code = dictionary.codes.get(wanted)
+            matches = array('b', (c == code for c in codes))
+            mask = matches if mask is None else array('b', map(min, mask, matches))
+        return mask
+
+    def totals_by_period(self, granularity, start=None, end=None, filters=None):
+        """Sum values per period over a day range as [(period, total, count)], oldest first"""
+        # Sum per day code first; there are far fewer days than rows
+        day_totals = [0.0] * len(self.days.values)
+        day_counts = [0] * len(self.days.values)
+        mask = self.filter_mask(filters)
+        if mask is None:
+            for day, value in zip(self.day_codes, self.values):
+                day_totals[day] += value
+                day_counts[day] += 1
+        else:
+            for day, value, keep in zip(self.day_codes, self.values, mask):
+                if keep:
+                    day_totals[day] += value
+                    day_counts[day] += 1
+
+        periods = {}
+        for day, inside, total, count in zip(self.days.values, self.day_mask(start, end),
+                                             day_totals, day_counts):
+            if inside and count:
+                key = period_key(day, granularity)
+                previous = periods.get(key, (0.0, 0))
+                periods[key] = (previous[0] + total, previous[1] + count)
+        return [(key, total, count) for key, (total, count) in sorted(periods.items())]
+
+    def totals_by_group(self, column, start=None, end=None, filters=None, limit=None):
+        """Sum values per distinct column value as [(value, total, count)], largest first"""
+        dictionary, codes = self.groups[column]
+        totals = [0.0] * len(dictionary.values)
+        counts = [0] * len(dictionary.values)
+        inside = self.day_mask(start, end)
+        mask = self.filter_mask(filters)
+
+        if mask is None:
+            for day, group, value in zip(self.day_codes, codes, self.values):
+                if inside[day]:
+                    totals[group] += value
+                    counts[group] += 1
+        else:
+            for day, group, value, keep in zip(self.day_codes, codes, self.values, mask):
+                if keep and inside[day]:
+                    totals[group] += value
+                    counts[group] += 1
+
+        result = sorted(((value, total, count) for value, total, count
+                         in zip(dictionary.values, totals, counts) if count),
+                        key=lambda item: item[1], reverse=True)
+        return result[:limit] if limit else result
+
+class AnalyticsCache:
+    """In-memory column copies of sales and financial_transactions for aggregations
+
+    Shared by every connection of a process (see connections.py). Each call
+    first brings the table up to date: new ids are appended, and any update
+    or delete counted in change_log reloads the table. Results are memoized
+    until the table changes again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {table: ColumnTable(table, *spec) for table, spec in CACHED_TABLES.items()}
+        self.results = {}
+
+    def table(self, db, name):
+        """Return a table's columns refreshed against the database"""
+        table = self.tables[name]
+        state = (table.rewrites, table.last_id)
+        table.refresh(db)
+        if (table.rewrites, table.last_id) != state:
+            self.results = {key: value for key, value in self.results.items()
+                            if key[0] != name}
+        return table
+
+    def memoized(self, db, name, key, compute):
+        """Run compute(table) once per table state"""
+        with self.lock:
+            table = self.table(db, name)
+            key = (name,) + key
+            if key not in self.results:
+                self.results[key] = compute(table)
+            return self.results[key]
+
+    def totals_by_period(self, db, name, granularity='day', start=None, end=None, filters=None):
+        """Sum a table's amounts per day, week, month or quarter, oldest first"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        frozen = tuple(sorted((filters or {}).items()))
+        return self.memoized(db, name, ('period', granularity, start, end, frozen),
+                             lambda table: table.totals_by_period(granularity, start, end,
+                                                                  filters))
+
+    def totals_by_group(self, db, name, column, start=None, end=None, filters=None, limit=None):
+        """Sum a table's amounts per value of a text column, largest first"""
+        frozen = tuple(sorted((filters or {}).items()))
+        return self.memoized(db, name, ('group', column, start, end, frozen, limit),
+                             lambda table: table.totals_by_group(column, start, end, filters,
+                                                                 limit))
+
+    def top_customers(self, db, limit=5, start=None, end=None):
+        """(customer_name, revenue, sales) for the biggest customers"""
+        return self.totals_by_group(db, 'sales', 'customer_name', start, end, limit=limit)
+
+    def expenses_by_category(self, db, start=None, end=None):
+        """(category, total, entries) of expenses, largest first"""
+        return self.totals_by_group(db, 'financial_transactions', 'category', start, end,
+                                    filters={'type': 'Expense'})
@@ -0,0 +1,413 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from connections import ConnectionPool
+from dates import DATE_COLUMNS, normalize
+from paged_list import build_page_query
+from search import build_where
+from specs import LIST_SPECS
+
+# Resources served under /api/<name> and the table behind each; they page
+# and search like the matching module's list
+RESOURCE_TABLES = {
+    'products': 'products',
+    'sales': 'sales',
+    'customers': 'customers',
+    'employees': 'employees',
+    'suppliers': 'suppliers',
+    'transactions': 'financial_transactions',
+}
+
+RESOURCES = {name: dict(LIST_SPECS[table], table=table) for name, table in RESOURCE_TABLES.items()}
+
+# Columns the API may not write because triggers maintain them, or because
+# they are derived from a sale's lines
+READ_ONLY_COLUMNS = {
+    'customers': ('total_purchases', 'lifetime_revenue'),
+    'sales': ('items', 'items_count'),
+}
+
+MAX_PAGE_SIZE = 500
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 409: 'Conflict', 500: 'Internal Server Error'}
+
+class ApiError(Exception):
+    """An error with the HTTP status to answer with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def first(query, name, default=None):
+    """First value of a query-string parameter"""
+    values = query.get(name)
+    return values[0] if values else default
+
+class ApiServer:
+    """Local HTTP/JSON API over the same repositories and queries as the UI
+
+    Requests are parsed on the asyncio loop; every database call runs on a
+    thread pool with connections borrowed from a ConnectionPool, so slow
+    queries never hold up other clients.
+    """
+
+    def __init__(self, db_path='bms.db', host='127.0.0.1', port=8765, workers=4):
+        self.host = host
+        self.port = port
+        self.pool = ConnectionPool(db_path, readers=workers)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bms-api')
+
+    async def query(self, job):
+        """Run job(db) on a worker thread with a pooled connection"""
+        def run():
+            with self.pool.reader() as db:
+                return job(db)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    async def serve(self):
+        """Accept connections until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"BMS API listening on http://{self.host}:{self.port}/api/")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests on one connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, target, version = request_line.decode('latin-1').split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0) or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, target, body)
+                data = json.dumps(payload).encode('utf-8')
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                    + data)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        """Route a request and return (status, JSON payload)"""
+        try:
+            url = urlsplit(target)
+            query = parse_qs(url.query)
+            parts = [part for part in url.path.split('/') if part]
+
+            if not parts or parts[0] != 'api':
+                raise ApiError(404, "Not found")
+            parts = parts[1:]
+
+            if parts == ['health']:
+                return 200, {'status': 'ok'}
+
+            if parts and parts[0] == 'reports':
+                if len(parts) != 2:
+                    raise ApiError(404, "Not found")
+                if method != 'GET':
+                    raise ApiError(405, "Reports are read-only")
+                return 200, await self.report(parts[1], query)
+
+            if not parts or parts[0] not in RESOURCES:
+                raise ApiError(404, "Not found")
+            resource = RESOURCES[parts[0]]
+
+            if len(parts) == 1:
+                if method == 'GET':
+                    return 200, await self.list_rows(resource, query)
+                if method == 'POST':
+                    return 201, await self.create(resource, self.parse_body(body))
+            elif len(parts) == 2 and parts[1].isdigit():
+                row_id = int(parts[1])
+                if method == 'GET':
+                    return 200, await self.get(resource, row_id)
+                if method in ('PUT', 'PATCH'):
+                    return 200, await self.update(resource, row_id, self.parse_body(body))
+                if method == 'DELETE':
+                    return 200, await self.delete(resource, row_id)
+            else:
+                raise ApiError(404, "Not found")
+
+            raise ApiError(405, f"{method} is not allowed here")
+
+        except ApiError as e:
+            return e.status, {'error': str(e)}
+        except sqlite3.IntegrityError as e:
+            return 409, {'error': str(e)}
+        except Exception as e:
+            print(f"API error handling {method} {target}: {str(e)}")
+            return 500, {'error': "Internal server error"}
+
+    def parse_body(self, body):
+        """Decode a JSON object request body"""
+        try:
+            record = json.loads(body or b'{}')
+        except ValueError:
+            raise ApiError(400, "Body must be JSON")
+        if not isinstance(record, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        return record
+
+    def check_record(self, resource, record):
+        """Reject columns the table does not have or the API may not write, and bad dates"""
+        table = resource['table']
+        allowed = set(self.pool.writer.repositories[table].columns)
+        allowed -= set(READ_ONLY_COLUMNS.get(table, ()))
+
+        unknown = sorted(set(record) - allowed - {'lines'})
+        if unknown:
+            raise ApiError(400, f"Unknown or read-only fields: {', '.join(unknown)}")
+        if 'lines' in record and table != 'sales':
+            raise ApiError(400, "Only sales have lines")
+
+        # Dates are stored in one format; accept the other ISO spellings too
+        if table in DATE_COLUMNS:
+            column, fmt, _ = DATE_COLUMNS[table]
+            if record.get(column):
+                try:
+                    record[column] = normalize(record[column], fmt)
+                except ValueError as e:
+                    raise ApiError(400, f"{column}: {str(e)}")
+
+    async def list_rows(self, resource, query):
+        """One keyset page, optionally filtered by a search term"""
+        try:
+            limit = min(int(first(query, 'limit', 50)), MAX_PAGE_SIZE)
+            after = first(query, 'after')
+            key = json.loads(after) if after else None
+        except ValueError:
+            raise ApiError(400, "limit must be a number and after a JSON array")
+        if limit < 1 or (key is not None and (not isinstance(key, list)
+                                              or len(key) != len(resource['order_by']))):
+            raise ApiError(400, "Invalid limit or after key")
+
+        table = resource['table']
+        columns = ['id'] + list(self.pool.writer.repositories[table].columns)
+        where, params = build_where(first(query, 'q', ''), resource['search_fields'], table)
+        sql, params = build_page_query(table, columns, resource['order_by'], resource['descending'],
+                                       where, params, key, True, limit + 1)
+
+        rows = await self.query(lambda db: db.fetch_all(sql, params))
+
+        width = len(columns)
+        items = [dict(zip(columns, row[:width])) for row in rows[:limit]]
+        next_key = list(rows[limit - 1][width:]) if len(rows) > limit else None
+        return {'items': items, 'next': next_key}
+
+    async def get(self, resource, row_id):
+        """One row by id"""
+        table = resource['table']
+        row = await self.query(lambda db: db.repositories[table].get(row_id))
+        if row is None:
+            raise ApiError(404, f"No {table} row with id {row_id}")
+        return dict(row)
+
+    async def create(self, resource, record):
+        """Insert a row (and for sales, its lines) and return it"""
+        self.check_record(resource, record)
+        table = resource['table']
+        lines = record.pop('lines', None)
+
+        def job(db):
+            with db.transaction():
+                row_id = db.repositories[table].insert(record)
+                if lines is not None:
+                    self.write_lines(db, row_id, lines)
+            return db.repositories[table].get(row_id)
+
+        return dict(await self.query(job))
+
+    async def update(self, resource, row_id, record):
+        """Change some columns of a row and return it"""
+        self.check_record(resource, record)
+        table = resource['table']
+        lines = record.pop('lines', None)
+        if not record and lines is None:
+            raise ApiError(400, "Nothing to update")
+
+        def job(db):
+            repo = db.repositories[table]
+            with db.transaction():
+                if repo.get(row_id) is None:
+                    return None
+                if record:
+                    repo.update(row_id, record)
+                if lines is not None:
+                    self.write_lines(db, row_id, lines)
+            return repo.get(row_id)
+
+        row = await self.query(job)
+        if row is None:
+            raise ApiError(404, f"No {table} row with id {row_id}")
+        return dict(row)
+
+    async def delete(self, resource, row_id):
+        """Delete a row by id"""
+        table = resource['table']
+
+        def job(db):
+            repo = db.repositories[table]
+            with db.transaction():
+                if repo.get(row_id) is None:
+                    return False
+                repo.delete(row_id)
+            return True
+
+        if not await self.query(job):
+            raise ApiError(404, f"No {table} row with id {row_id}")
+        return {'deleted': row_id}
+
+    def write_lines(self, db, sale_id, lines):
+        """Replace a sale's lines from [{product_id, quantity}], priced from the products"""
+        priced = []
+        for line in lines:
+            try:
+                product_id, quantity = int(line['product_id']), int(line['quantity'])
+            except (TypeError, KeyError, ValueError):
+                raise ApiError(400, "Each line needs a product_id and quantity")
+
+            if quantity < 1:
+                raise ApiError(400, "Each line's quantity must be at least 1")
+
+            product = db.products.get(product_id)
+            if product is None:
+                raise ApiError(400, f"Unknown product: {product_id}")
+            priced.append((product_id, quantity, product['price'], product['name']))
+
+        # Same items text the Sales form writes, so the sale opens there and is searchable
+        db.sale_items.replace_for_sale(sale_id, [line[:3] for line in priced])
+        db.sales.update(sale_id, {
+            'items': db.sales.items_text((quantity, name) for _, quantity, _, name in priced),
+            'items_count': sum(quantity for _, quantity, _, _ in priced)})
+
+    async def report(self, name, query):
+        """Reporting endpoints backed by the trigger-maintained rollups"""
+        if name == 'summary':
+            def job(db):
+                summary = db.metrics.summary()
+                return {**(dict(summary) if summary else {}),
+                        'ledger': db.transactions.totals_by_type()}
+            return await self.query(job)
+
+        if name == 'daily-sales':
+            start, end = first(query, 'start'), first(query, 'end')
+            if not start or not end:
+                raise ApiError(400, "start and end (YYYY-MM-DD) are required")
+            rows = await self.query(lambda db: db.metrics.daily_sales(start, end))
+            return {'items': [dict(row) for row in rows]}
+
+        if name == 'top-products':
+            try:
+                limit = min(int(first(query, 'limit', 10)), MAX_PAGE_SIZE)
+            except ValueError:
+                raise ApiError(400, "limit must be a number")
+            rows = await self.query(lambda db: db.sale_items.totals_by_product(limit))
+            return {'items': [dict(row) for row in rows]}
+
+        if name == 'expenses-by-category':
+            rows = await self.query(lambda db: db.transactions.expense_by_category())
+            return {'items': [dict(row) for row in rows]}
+
+        if name == 'monthly':
+            type_ = first(query, 'type', 'Expense')
+            start, end = first(query, 'start', '0000-00'), first(query, 'end', '9999-99')
+            rows = await self.query(lambda db: db.transactions.monthly_totals(type_, start, end))
+            return {'items': [dict(row) for row in rows]}
+
+        raise ApiError(404, f"Unknown report: {name}")
+
+async def load_test(host, port, path, requests, concurrency):
+    """Hit one endpoint with keep-alive clients and print throughput and latency"""
+    latencies = []
+    per_client = max(requests // concurrency, 1)
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1')
+        for _ in range(per_client):
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    print(f"{len(latencies)} requests to {path} in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s), "
+          f"p50 {percentile(0.5):.1f}ms, p95 {percentile(0.95):.1f}ms, p99 {percentile(0.99):.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Business Management System local API")
+    parser.add_argument('--db', default='bms.db', help="database file")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4, help="query threads")
+    parser.add_argument('--load-test', metavar='PATH',
+                        help="load-test a running server on this path instead of serving")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.load_test:
+        asyncio.run(load_test(args.host, args.port, args.load_test,
+                              args.requests, args.concurrency))
+        return
+
+    from migrations import migrate
+    server = ApiServer(args.db, args.host, args.port, args.workers)
+    migrate(server.pool.writer)
+
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
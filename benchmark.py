@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from database import Database
+from invoicing import INVOICE_QUERY
+from paged_list import build_page_query
+from search import build_match, build_where
+from specs import LIST_SPECS
+from timeseries import date_range
+
+# Module name -> the table its list pages through
+MODULE_LISTS = {
+    'inventory': 'products',
+    'sales': 'sales',
+    'customers': 'customers',
+    'employees': 'employees',
+    'suppliers': 'suppliers',
+    'financial': 'financial_transactions',
+}
+
+# Typical search terms per module: a word, and a number or date prefix
+SEARCH_TERMS = {
+    'inventory': ('Widget', '250'),
+    'sales': ('Smith', datetime.now().strftime('%Y-%m')),
+    'customers': ('Patel', 'customer42@'),
+    'employees': ('Manager', 'Finance'),
+    'suppliers': ('Co 1', 'Inactive'),
+    'financial': ('Rent', datetime.now().strftime('%Y-%m')),
+}
+
+PAGE_SIZE = 100
+
+def list_cases(module):
+    """Timed jobs for a module's list: first page, deep scroll and searches
+
+    Pages select the same columns, order and filters as the module's PagedList.
+    """
+    table = MODULE_LISTS[module]
+    spec = LIST_SPECS[table]
+    width = len(spec['columns'])
+
+    def page(db, where='', params=(), key=None):
+        sql, params = build_page_query(table, spec['columns'], spec['order_by'], spec['descending'],
+                                       where, params, key, True, PAGE_SIZE + 1)
+        return db.fetch_all(sql, params)
+
+    def load(db):
+        return page(db)
+
+    def scroll(db):
+        # Ten pages down, as PagedList fetches them while scrolling
+        key = None
+        for _ in range(10):
+            rows = page(db, key=key)
+            if len(rows) <= PAGE_SIZE:
+                break
+            key = tuple(rows[PAGE_SIZE - 1][width:])
+
+    def search(term):
+        def job(db):
+            where, params = build_where(term, spec['search_fields'], table)
+            page(db, where, params)
+            return db.fetch_value(f"SELECT COUNT(*) FROM {table} WHERE {where}", params)
+        return job
+
+    cases = [(f"{module}.load", load), (f"{module}.scroll_10_pages", scroll)]
+    for term in SEARCH_TERMS[module]:
+        cases.append((f"{module}.search[{term}]", search(term)))
+    return cases
+
+def dashboard_load(db):
+    """Same reads as Dashboard.fetch_data"""
+    today = datetime.now().date()
+    db.metrics.summary()
+    db.metrics.daily_sales((today - timedelta(days=13)).isoformat(), today.isoformat())
+    db.transactions.total_for_type('Income')
+    db.transactions.total_for_type('Expense')
+
+def invoice_lookup(db):
+    """Customers.generate_invoice for a customer in the middle of the table"""
+    customer_id = (db.fetch_value("SELECT MAX(id) FROM customers", default=0) // 2) or 1
+    db.customers.get(customer_id)
+    return db.sales.recent_for_customer(customer_id, 5)
+
+def invoice_batch_query(db):
+    """The batch invoicing query, read to the end"""
+    for _ in db.execute(INVOICE_QUERY, (5,)):
+        pass
+
+def sales_charts(db, range_label, granularity):
+    """Same reads as Sales.update_charts"""
+    start, end = date_range(range_label)
+    return (db.timeseries.sales(granularity, start, end),
+            db.analytics.top_customers(db, 5, start, end))
+
+def financial_charts(db, range_label, granularity):
+    """Same reads as Financial.update_charts"""
+    start, end = date_range(range_label)
+    return (db.timeseries.cash_flow(granularity, start, end),
+            db.analytics.expenses_by_category(db, start, end))
+
+def all_cases():
+    """Every benchmark as (name, job(db))"""
+    cases = []
+    for module in MODULE_LISTS:
+        cases.extend(list_cases(module))
+
+    cases += [
+        ('sales.update_charts', lambda db: sales_charts(db, 'Last 30 days', 'day')),
+        ('sales.update_charts[all,month]', lambda db: sales_charts(db, 'All time', 'month')),
+        ('analytics.monthly_sales', lambda db: db.analytics.totals_by_period(db, 'sales', 'month')),
+        ('inventory.top_products', lambda db: db.sale_items.totals_by_product(10)),
+        ('customers.generate_invoice', invoice_lookup),
+        ('customers.invoice_all_query', invoice_batch_query),
+        ('financial.update_summary', lambda db: db.transactions.totals_by_type()),
+        ('financial.update_charts', lambda db: financial_charts(db, 'Last 30 days', 'day')),
+        ('financial.update_charts[all,month]',
+         lambda db: financial_charts(db, 'All time', 'month')),
+        ('dashboard.load_data', dashboard_load),
+        ('main.global_search', lambda db: db.search_index.search(build_match('Smith'))),
+    ]
+    return cases
+
+def time_case(db, job, repeat):
+    """Run a job once to warm the cache, then repeat times; returns timings in ms"""
+    job(db)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        job(db)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def run(path, repeat=5, only=None):
+    """Benchmark every case against a database and return the report dict"""
+    db = Database(path)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'database': os.path.abspath(path),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'rows': {table: db.repositories[table].count() for table in db.repositories},
+        'results': {},
+    }
+
+    for name, job in all_cases():
+        if only and not any(part in name for part in only):
+            continue
+
+        timings = time_case(db, job, repeat)
+        timings.sort()
+        report['results'][name] = {
+            'min_ms': timings[0],
+            'median_ms': statistics.median(timings),
+            'p95_ms': timings[min(int(len(timings) * 0.95), len(timings) - 1)],
+        }
+
+    db.close()
+    return report
+
+def print_report(report, baseline=None):
+    """Print results as a table, with the change against a baseline when given"""
+    print(f"{report['created']}  sqlite {report['sqlite']}  python {report['python']}")
+    print("  " + ", ".join(f"{table} {count:,}" for table, count in report['rows'].items()))
+    print()
+    print(f"{'case':<40} {'min ms':>9} {'median ms':>10} {'p95 ms':>9}"
+          + (f" {'vs base':>9}" if baseline else ""))
+
+    for name, result in report['results'].items():
+        line = (f"{name:<40} {result['min_ms']:>9.2f} {result['median_ms']:>10.2f} "
+                f"{result['p95_ms']:>9.2f}")
+
+        base = (baseline or {}).get('results', {}).get(name)
+        if base and base['median_ms']:
+            change = (result['median_ms'] - base['median_ms']) / base['median_ms'] * 100
+            line += f" {change:>+8.0f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the BMS hot paths against a database")
+    parser.add_argument('path', help="database to benchmark (see datagen.py)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help="run only cases containing these words")
+    parser.add_argument('--output', help="report file (default benchmarks/<timestamp>.json)")
+    parser.add_argument('--compare', help="earlier report to compare against")
+    args = parser.parse_args()
+
+    report = run(args.path, args.repeat, args.only)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    output = args.output or os.path.join(
+        'benchmarks', f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {output}")
+
+if __name__ == "__main__":
+    main()
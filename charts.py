@@ -0,0 +1,178 @@
+import math
+
+class ChartRenderer:
+    """Draw matplotlib charts in place, and only when their data changed
+
+    Each chart is addressed by a name. Its artists are created on the first
+    draw and updated afterwards (set_data for lines, set_height for bars, new
+    angles for pie wedges) instead of clearing the axes. A chart whose data
+    equals what it last showed is left alone, and show() does nothing when no
+    chart changed.
+
+    Line and bar artists are animated: when only their values changed and the
+    axes limits and tick labels stayed the same, show() blits them over the
+    background cached at the last full draw instead of redrawing the figure.
+    """
+
+    def __init__(self, fig, canvas, max_ticks=12):
+        self.fig = fig
+        self.canvas = canvas
+        self.max_ticks = max_ticks
+
+        # name -> data last drawn, name -> its line or bars, name -> pie parts
+        self.fingerprints = {}
+        self.artists = {}
+        self.pies = {}
+
+        # Tick labels last set on each axes
+        self.ticks = {}
+
+        # What is waiting for show(): artists to blit, or a full draw
+        self.dirty = False
+        self.layout_changed = True
+        self.background = None
+
+        # Capture the background and draw the animated artists after every full draw
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def changed(self, name, data):
+        """Remember data for a chart and report whether it differs from the last"""
+        if self.fingerprints.get(name) == data:
+            return False
+        self.fingerprints[name] = data
+        self.dirty = True
+        return True
+
+    def positions(self, ax, labels):
+        """Map x labels to positions the way a categorical axis does, and set the ticks
+
+        Repeated labels share a position, and at most max_ticks labels are
+        shown so long series stay readable. A change of labels is a layout change.
+        """
+        order = {label: index for index, label in enumerate(dict.fromkeys(labels))}
+        ticks = tuple(order)
+        if self.ticks.get(ax) != ticks:
+            step = max(1, -(-len(ticks) // self.max_ticks))
+            ax.set_xticks(range(0, len(ticks), step), ticks[::step])
+            self.ticks[ax] = ticks
+            self.layout_changed = True
+        return [order[label] for label in labels]
+
+    def rescale(self, ax):
+        """Fit the axes to their data, noting a layout change when the limits move
+
+        The limits are kept while the data still fills most of them, so small
+        changes can be blitted without redrawing the ticks.
+        """
+        (x0, x1), (y0, y1) = limits = (ax.get_xlim(), ax.get_ylim())
+        ax.relim()
+        data = ax.dataLim
+        if (x0 <= data.x0 and data.x1 <= x1 and y0 <= data.y0 and data.y1 <= y1
+                and data.height >= (y1 - y0) / 2):
+            return
+
+        ax.autoscale_view()
+        if (ax.get_xlim(), ax.get_ylim()) != limits:
+            self.layout_changed = True
+
+    def line(self, ax, name, labels, values, **style):
+        """Draw or update a line over categorical x labels"""
+        labels, values = tuple(labels), tuple(values)
+        if not self.changed(name, (labels, values)):
+            return
+
+        positions = self.positions(ax, labels)
+        line = self.artists.get(name)
+        if line is None:
+            line, = ax.plot(positions, values, animated=True, **style)
+            self.artists[name] = line
+            self.layout_changed = True
+        else:
+            line.set_data(positions, values)
+        self.rescale(ax)
+
+    def bars(self, ax, name, labels, values, **style):
+        """Draw or update a bar series over categorical x labels"""
+        labels, values = tuple(labels), tuple(values)
+        if not self.changed(name, (labels, values)):
+            return
+
+        positions = self.positions(ax, labels)
+        bars = self.artists.get(name)
+        if bars is not None and [round(bar.get_x() + bar.get_width() / 2) for bar in bars] == positions:
+            for bar, value in zip(bars, values):
+                bar.set_height(value)
+        else:
+            # The bars moved; build the series again
+            if bars is not None:
+                bars.remove()
+            bars = ax.bar(positions, values, animated=True, **style)
+            self.artists[name] = bars
+            self.layout_changed = True
+        self.rescale(ax)
+
+    def pie(self, ax, name, labels, values, colors=None, autopct='%1.1f%%'):
+        """Draw or update a pie chart; slices are moved rather than rebuilt"""
+        labels, values = tuple(labels), tuple(values)
+        if not self.changed(name, (labels, values)):
+            return
+
+        # Text moves with the wedges, so a pie always needs a full draw
+        self.layout_changed = True
+        parts = self.pies.get(name)
+        total = sum(values)
+
+        if parts is None or len(parts[0]) != len(values) or not total:
+            if parts is not None:
+                for artist in [*parts[0], *parts[1], *parts[2]]:
+                    artist.remove()
+            if not total:
+                # Nothing to share out; leave the axes empty
+                self.pies.pop(name, None)
+                return
+
+            self.pies[name] = tuple(ax.pie(values, labels=labels, autopct=autopct, colors=colors))
+            return
+
+        wedges, texts, autotexts = parts
+        angle = 0.0
+        for wedge, text, autotext, label, value in zip(wedges, texts, autotexts, labels, values):
+            # Same geometry as Axes.pie: counter-clockwise from 0 degrees
+            share = value / total
+            wedge.set_theta1(angle)
+            angle += 360 * share
+            wedge.set_theta2(angle)
+
+            middle = math.radians((wedge.theta1 + wedge.theta2) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            text.set_text(label)
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(autopct % (share * 100))
+
+    def on_draw(self, event):
+        """Cache the static background and paint the animated artists over it"""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        """Draw every animated line and bar artist onto the canvas"""
+        for artist in self.artists.values():
+            for part in getattr(artist, 'patches', [artist]):
+                part.axes.draw_artist(part)
+
+    def show(self):
+        """Put changed charts on screen: blit when possible, else redraw once"""
+        if not self.dirty:
+            return
+
+        if self.layout_changed or self.background is None:
+            self.fig.tight_layout()
+            self.canvas.draw()
+            self.layout_changed = False
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_animated()
+            self.canvas.blit(self.fig.bbox)
+        self.dirty = False
@@ -0,0 +1,77 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from analytics import AnalyticsCache
+from database import Database
+
+class ConnectionPool:
+    """SQLite connections for one database file shared by several terminals
+
+    The file is switched to WAL so readers never block the writer (or the
+    other way round), across processes as well as threads. Every connection
+    from the pool shares one write lock, so writes from this process queue up
+    here instead of failing with "database is locked"; writers in other
+    processes are waited for up to the busy timeout.
+    """
+
+    def __init__(self, path='bms.db', readers=4, busy_timeout=5000):
+        self.path = path
+        self.max_readers = readers
+        self.busy_timeout = busy_timeout
+
+        # Serializes writes made through any connection in this process
+        self.write_lock = threading.RLock()
+
+        # One in-memory analytics copy for all connections
+        self.analytics = AnalyticsCache()
+
+        # Idle reader connections, most recently used first
+        self.idle = queue.LifoQueue()
+        self.readers = []
+        self.lock = threading.Lock()
+
+        # The writer stays on the Tk thread; it also turns WAL on for the file
+        self.writer = self.connect(shared=False)
+        self.writer.execute("PRAGMA journal_mode = WAL")
+
+    def connect(self, shared=True):
+        """Open a configured connection; shared ones may move between threads"""
+        db = Database(self.path, busy_timeout=self.busy_timeout,
+                      check_same_thread=not shared, write_lock=self.write_lock,
+                      analytics=self.analytics)
+
+        # Safe with WAL: a power cut can lose the last commits but never corrupts
+        db.execute("PRAGMA synchronous = NORMAL")
+        db.execute("PRAGMA temp_store = MEMORY")
+        return db
+
+    @contextmanager
+    def reader(self):
+        """Borrow a connection for background work and return it afterwards"""
+        try:
+            db = self.idle.get_nowait()
+        except queue.Empty:
+            db = None
+            with self.lock:
+                if len(self.readers) < self.max_readers:
+                    db = self.connect()
+                    self.readers.append(db)
+            if db is None:
+                db = self.idle.get()
+
+        try:
+            yield db
+        finally:
+            # Never hand out a connection with a transaction left open
+            if db.conn.in_transaction:
+                db.conn.rollback()
+            self.idle.put(db)
+
+    def close(self):
+        """Close every connection"""
+        with self.lock:
+            for db in self.readers:
+                db.close()
+            self.readers = []
+        self.writer.close()
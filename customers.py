@@ -2,11 +2,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
+from exporter import export_table
+from importer import import_csv
+from invoicing import BatchInvoicer, render_invoice
+from paged_list import PagedList
+from specs import LIST_SPECS
+
 class Customers:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('customers', 'sales')
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -47,6 +55,10 @@ class Customers:
         # Load initial data
         self.load_customers()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_customers()
+    
     def init_customer_list(self, parent):
         """Initialize customer list view"""
         # Search frame
@@ -61,6 +73,10 @@ class Customers:
         ttk.Button(search_frame, text="Search",
                   command=self.search_customers).pack(side=tk.LEFT, padx=5)
         
+        # Match count
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=5)
+        
         # Customer list
         self.customer_tree = ttk.Treeview(parent, columns=("ID", "Name", "Email", "Phone", "Total Purchases"),
                                        show="headings")
@@ -81,7 +97,10 @@ class Customers:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.customer_tree.yview)
-        self.customer_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Page rows in as the user scrolls instead of loading the whole table
+        self.customer_list = PagedList(self.customer_tree, scrollbar, self.db, "customers",
+                                       **LIST_SPECS["customers"])
         
         # Pack widgets
         self.customer_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -101,8 +120,14 @@ class Customers:
                   command=self.show_edit_customer).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🗑️ Delete Customer",
                   command=self.delete_customer).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📥 Import CSV",
+                  command=self.import_customers).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📤 Export",
+                  command=self.export_customers).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="📄 Generate Invoice",
                   command=self.generate_invoice).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="🧾 Invoice All",
+                  command=self.generate_all_invoices).pack(side=tk.LEFT, padx=5)
         
         # Bind Enter key to search
         self.search_entry.bind('<Return>', lambda e: self.search_customers())
@@ -141,12 +166,12 @@ class Customers:
         self.phone_entry = ttk.Entry(phone_frame)
         self.phone_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
-        # Total Purchases
+        # Total Purchases (kept up to date from sales)
         total_purchases_frame = ttk.Frame(details_frame)
         total_purchases_frame.pack(fill=tk.X, pady=5)
         ttk.Label(total_purchases_frame, text="Total Purchases:").pack(side=tk.LEFT)
-        self.total_purchases_entry = ttk.Entry(total_purchases_frame, state='readonly')
-        self.total_purchases_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.total_purchases_label = ttk.Label(total_purchases_frame, text="")
+        self.total_purchases_label.pack(side=tk.LEFT, padx=5)
         
         # Address
         address_frame = ttk.Frame(details_frame)
@@ -169,20 +194,9 @@ class Customers:
     def load_customers(self):
         """Load customers from database"""
         try:
-            # Clear existing items
-            for item in self.customer_tree.get_children():
-                self.customer_tree.delete(item)
-            
-            # Get customers from database
-            self.cursor.execute("""
-                SELECT id, name, email, phone, total_purchases
-                FROM customers
-                ORDER BY name
-            """)
-            
-            # Add customers to treeview
-            for customer in self.cursor.fetchall():
-                self.customer_tree.insert("", tk.END, values=customer)
+            # Load the first page in the background; later pages are fetched on scroll
+            self.customer_list.reload(lambda e: messagebox.showerror(
+                                      "Error", f"Failed to load customers: {str(e)}"))
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load customers: {str(e)}")
@@ -197,37 +211,31 @@ class Customers:
         customer_id = self.customer_tree.item(selection[0])['values'][0]
         
         # Get customer details from database
-        self.cursor.execute("""
-            SELECT id, name, email, phone, address, notes
-            FROM customers
-            WHERE id = ?
-        """, (customer_id,))
-        
-        customer = self.cursor.fetchone()
+        customer = self.db.customers.get(customer_id)
         if customer:
             # Update form fields
             self.id_entry.configure(state='normal')
             self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(customer[0]))
+            self.id_entry.insert(0, str(customer['id']))
             self.id_entry.configure(state='readonly')
             
             self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, customer[1])
+            self.name_entry.insert(0, customer['name'])
             
             self.email_entry.delete(0, tk.END)
-            self.email_entry.insert(0, customer[2])
+            self.email_entry.insert(0, customer['email'])
             
             self.phone_entry.delete(0, tk.END)
-            self.phone_entry.insert(0, customer[3])
+            self.phone_entry.insert(0, customer['phone'])
             
-            self.total_purchases_entry.delete(0, tk.END)
-            self.total_purchases_entry.insert(0, str(customer[4]))
+            self.total_purchases_label.config(
+                text=f"{customer['total_purchases'] or 0:,} (${customer['lifetime_revenue']:,.2f} lifetime)")
             
             self.address_text.delete('1.0', tk.END)
-            self.address_text.insert('1.0', customer[5] or '')
+            self.address_text.insert('1.0', customer['address'] or '')
             
             self.notes_text.delete('1.0', tk.END)
-            self.notes_text.insert('1.0', customer[6] or '')
+            self.notes_text.insert('1.0', customer['notes'] or '')
     
     def show_add_customer(self):
         """Show add customer form"""
@@ -239,7 +247,7 @@ class Customers:
         self.name_entry.delete(0, tk.END)
         self.email_entry.delete(0, tk.END)
         self.phone_entry.delete(0, tk.END)
-        self.total_purchases_entry.delete(0, tk.END)
+        self.total_purchases_label.config(text="")
         self.address_text.delete('1.0', tk.END)
         self.notes_text.delete('1.0', tk.END)
     
@@ -258,7 +266,6 @@ class Customers:
             name = self.name_entry.get()
             email = self.email_entry.get()
             phone = self.phone_entry.get()
-            total_purchases = self.total_purchases_entry.get()
             address = self.address_text.get('1.0', tk.END).strip()
             notes = self.notes_text.get('1.0', tk.END).strip()
             
@@ -272,20 +279,17 @@ class Customers:
                 messagebox.showerror("Error", "Please enter a valid email address")
                 return
             
-            if customer_id:  # Update existing customer
-                self.cursor.execute("""
-                    UPDATE customers
-                    SET name = ?, email = ?, phone = ?, total_purchases = ?, address = ?, notes = ?
-                    WHERE id = ?
-                """, (name, email, phone, total_purchases, address, notes, customer_id))
-            else:  # Add new customer
-                self.cursor.execute("""
-                    INSERT INTO customers (name, email, phone, total_purchases, address, notes)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (name, email, phone, total_purchases, address, notes))
+            record = {'name': name, 'email': email, 'phone': phone,
+                      'address': address, 'notes': notes}
+            
+            with self.db.transaction():
+                if customer_id:  # Update existing customer
+                    self.db.customers.update(customer_id, record)
+                else:  # Add new customer
+                    customer_id = self.db.customers.insert(record)
             
-            self.conn.commit()
-            self.load_customers()
+            # Redraw only the saved row instead of reloading the list
+            self.customer_list.refresh_row(customer_id, select=True)
             messagebox.showinfo("Success", "Customer saved successfully")
             
         except Exception as e:
@@ -302,15 +306,23 @@ class Customers:
             try:
                 customer_id = self.customer_tree.item(selection[0])['values'][0]
                 
-                self.cursor.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
-                self.conn.commit()
+                with self.db.transaction():
+                    self.db.customers.delete(customer_id)
                 
-                self.load_customers()
+                self.customer_list.remove_row(customer_id)
                 messagebox.showinfo("Success", "Customer deleted successfully")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete customer: {str(e)}")
     
+    def import_customers(self):
+        """Bulk import customers from a CSV file"""
+        import_csv(self.frame, self.db, 'customers', self.refresh)
+    
+    def export_customers(self):
+        """Export customers to a CSV or JSONL file"""
+        export_table(self.frame, self.db, 'customers')
+    
     def generate_invoice(self):
         """Generate and send invoice to customer"""
         selection = self.customer_tree.selection()
@@ -322,103 +334,86 @@ class Customers:
             # Get selected customer ID
             customer_id = self.customer_tree.item(selection[0])['values'][0]
             
-            # Get customer details
-            self.cursor.execute("""
-                SELECT name, email, phone, total_purchases
-                FROM customers
-                WHERE id = ?
-            """, (customer_id,))
-            
-            customer = self.cursor.fetchone()
-            if not customer:
-                messagebox.showerror("Error", "Customer not found")
-                return
-            
-            name, email, phone, total_purchases = customer
-            
-            # Get recent sales for this customer
-            self.cursor.execute("""
-                SELECT date, total_amount
-                FROM sales
-                WHERE customer_name = ?
-                ORDER BY date DESC
-                LIMIT 5
-            """, (name,))
-            
-            recent_sales = self.cursor.fetchall()
-            
-            # Generate invoice content
-            invoice_content = f"""
-INVOICE
-=======
-Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Invoice #: INV-{datetime.now().strftime('%Y%m%d%H%M%S')}
-
-Customer Details:
----------------
-Name: {name}
-Email: {email}
-Phone: {phone}
-
-Recent Purchases:
----------------
-"""
-            
-            for sale_date, amount in recent_sales:
-                invoice_content += f"{sale_date}: ${amount:.2f}\n"
-            
-            invoice_content += f"""
-Total Amount: ${total_purchases:.2f}
-
-Thank you for your business!
-===========================
-"""
-            
-            # Save invoice to file
-            filename = f"invoice_{name}_{datetime.now().strftime('%Y%m%d%H%M%S')}.txt"
-            with open(filename, 'w') as f:
-                f.write(invoice_content)
-            
-            # Here you would integrate with an SMS service to send the invoice
-            # For now, we'll just show a success message
-            messagebox.showinfo("Success", 
-                              f"Invoice generated successfully!\nSaved as: {filename}\n\n"
-                              f"Note: SMS sending functionality requires integration with an SMS service.")
+            # Query and write the file in the background
+            self.db.run(lambda db: self.write_invoice(db, customer_id),
+                        self.show_invoice_result, key=(self, 'invoice'),
+                        error=lambda e: messagebox.showerror(
+                            "Error", f"Failed to generate invoice: {str(e)}"))
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate invoice: {str(e)}")
     
-    def search_customers(self):
-        """Search customers and highlight matches"""
-        search_term = self.search_entry.get().lower()
+    def write_invoice(self, db, customer_id):
+        """Write a customer's invoice file and return its name; runs on a worker thread"""
+        # Get customer details
+        customer = db.customers.get(customer_id)
+        if not customer:
+            return None
+        
+        # Get recent sales for this customer
+        recent_sales = db.sales.recent_for_customer(customer_id, 5)
+        
+        # Same layout as the batch run
+        issued = datetime.now()
+        invoice_content = render_invoice(
+            (customer['id'], customer['name'], customer['email'], customer['phone'],
+             customer['lifetime_revenue']), recent_sales, issued)
+        
+        # Save invoice to file
+        filename = f"invoice_{customer['name']}_{issued.strftime('%Y%m%d%H%M%S')}.txt"
+        with open(filename, 'w') as f:
+            f.write(invoice_content)
+        
+        return filename
+    
+    def show_invoice_result(self, filename):
+        """Report the generated invoice"""
+        if filename is None:
+            messagebox.showerror("Error", "Customer not found")
+            return
         
-        # Clear existing items
-        for item in self.customer_tree.get_children():
-            self.customer_tree.delete(item)
+        # Here you would integrate with an SMS service to send the invoice
+        # For now, we'll just show a success message
+        messagebox.showinfo("Success", 
+                          f"Invoice generated successfully!\nSaved as: {filename}\n\n"
+                          f"Note: SMS sending functionality requires integration with an SMS service.")
+    
+    def generate_all_invoices(self):
+        """Write invoices for every customer in a batch"""
+        if not messagebox.askyesno("Confirm", "Generate invoices for all customers?"):
+            return
+        
+        self.db.run(lambda db: BatchInvoicer(db).run(), self.show_batch_result,
+                    key=(self, 'batch_invoice'),
+                    error=lambda e: messagebox.showerror(
+                        "Error", f"Failed to generate invoices: {str(e)}"))
+    
+    def show_batch_result(self, summary):
+        """Report a finished batch invoice run"""
+        message = (f"Wrote {summary['written']:,} invoices to {summary['directory']}\n"
+                   f"in {summary['seconds']:.1f}s ({summary['per_second']:,.0f} per second)")
+        
+        if summary['failures']:
+            message += f"\n\n{len(summary['failures']):,} failed; see failures.txt in that folder"
+            messagebox.showwarning("Batch Invoices", message)
+        else:
+            messagebox.showinfo("Batch Invoices", message)
+    
+    def show_record(self, customer_id):
+        """Open a customer from a search hit so their contact details fill the form"""
+        self.search_entry.delete(0, tk.END)
+        self.match_label.config(text="")
+        self.customer_list.jump_to(customer_id, lambda e: messagebox.showerror(
+            "Error", f"Failed to load customers: {str(e)}"))
+    
+    def search_customers(self):
+        """Search customers and show only the matches"""
+        search_term = self.search_entry.get()
         
         try:
-            # Get all customers
-            self.cursor.execute("""
-                SELECT id, name, email, phone, total_purchases
-                FROM customers
-                ORDER BY name
-            """)
-            
-            # Add customers to treeview with highlighting
-            for customer in self.cursor.fetchall():
-                # Convert all values to strings for case-insensitive search
-                values = [str(val) for val in customer]
-                
-                # Check if any field contains the search term
-                if search_term in ' '.join(values).lower():
-                    # Insert with tag for highlighting
-                    item = self.customer_tree.insert("", tk.END, values=values, tags=('highlight',))
-                else:
-                    # Insert without highlighting
-                    self.customer_tree.insert("", tk.END, values=values)
-            
-            # Configure tag for highlighting
-            self.customer_tree.tag_configure('highlight', background='#FFE5B4')  # Light orange background
+            # Filter the list in SQL and page in the matches, showing the match count
+            self.customer_list.search(search_term, self.match_label, lambda e: messagebox.showerror(
+                                      "Error", f"Failed to search customers: {str(e)}"))
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search customers: {str(e)}") 
\ No newline at end of file
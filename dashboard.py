@@ -2,15 +2,19 @@ import tkinter as tk
 from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
-import random
 from datetime import datetime, timedelta
 
+from charts import ChartRenderer
+from querystats import report_error
+
 class Dashboard:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('sales', 'products', 'customers', 'employees', 'suppliers',
+              'financial_transactions')
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -47,6 +51,10 @@ class Dashboard:
         # Load data
         self.load_data()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_data()
+    
     def init_metrics(self):
         """Initialize metrics display"""
         # Create metrics grid
@@ -76,39 +84,58 @@ class Dashboard:
         self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(12, 4))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.charts_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Titles and axes are set once; refreshes only update the plotted data
+        self.ax1.set_title('📈 Sales Trend')
+        self.ax1.set_xlabel('Date')
+        self.ax1.set_ylabel('Number of Sales')
+        self.ax1.tick_params(axis='x', rotation=45)
+        self.ax2.set_title('💰 Revenue Trend')
+        self.ax2.set_xlabel('Date')
+        self.ax2.set_ylabel('Revenue ($)')
+        self.ax2.tick_params(axis='x', rotation=45)
+        self.charts = ChartRenderer(self.fig, self.canvas)
     
     def load_data(self):
         """Load and display dashboard data"""
+        # Query in the background and fill in the widgets when the data arrives
+        self.db.run(self.fetch_data, self.show_data, key=(self, 'data'),
+                    error=lambda e: report_error("Error loading dashboard data", e))
+    
+    def fetch_data(self, db):
+        """Read dashboard data; runs on a worker thread"""
+        return {
+            # Every headline number in one lookup
+            'summary': db.metrics.summary(),
+            'series': self.get_daily_series(db, 14),
+            'income': db.transactions.total_for_type('Income'),
+            'expense': db.transactions.total_for_type('Expense')
+        }
+    
+    def show_data(self, data):
+        """Display dashboard data"""
         try:
-            # Get total sales
-            self.cursor.execute("SELECT COUNT(*) FROM sales")
-            total_sales = self.cursor.fetchone()[0]
-            
-            # Get total products
-            self.cursor.execute("SELECT COUNT(*) FROM products")
-            total_products = self.cursor.fetchone()[0]
-            
-            # Get total customers
-            self.cursor.execute("SELECT COUNT(*) FROM customers")
-            total_customers = self.cursor.fetchone()[0]
-            
-            # Get total employees
-            self.cursor.execute("SELECT COUNT(*) FROM employees")
-            total_employees = self.cursor.fetchone()[0]
-            
-            # Get total suppliers
-            self.cursor.execute("SELECT COUNT(*) FROM suppliers")
-            total_suppliers = self.cursor.fetchone()[0]
-            
-            # Get total revenue
-            self.cursor.execute("SELECT SUM(total_amount) FROM sales")
-            total_revenue = self.cursor.fetchone()[0] or 0
-            
-            # Calculate growth rate (example)
-            growth_rate = random.uniform(5, 15)
-            
-            # Calculate profit margin (example)
-            profit_margin = random.uniform(20, 30)
+            summary = data['summary']
+            
+            total_sales = summary['sales_count']
+            total_products = summary['product_count']
+            total_customers = summary['customer_count']
+            total_employees = summary['employee_count']
+            total_suppliers = summary['supplier_count']
+            total_revenue = summary['sales_revenue']
+            
+            # Calculate growth rate (revenue this week vs the week before)
+            dates, sales_data, revenue = data['series']
+            previous_week = sum(revenue[:7])
+            this_week = sum(revenue[7:])
+            growth_rate = ((this_week - previous_week) / previous_week * 100
+                           if previous_week else 0)
+            
+            # Calculate profit margin (net profit over income)
+            total_income = data['income']
+            total_expense = data['expense']
+            profit_margin = ((total_income - total_expense) / total_income * 100
+                             if total_income else 0)
             
             # Update metrics
             metrics = [
@@ -134,44 +161,39 @@ class Dashboard:
                 ttk.Label(metric_frame, text=value,
                          font=('Helvetica', 20, 'bold')).pack()
             
-            # Update charts
-            self.update_charts()
+            # Update charts with the last week
+            self.update_charts(dates[7:], sales_data[7:], revenue[7:])
             
         except Exception as e:
-            print(f"Error loading dashboard data: {str(e)}")
+            report_error("Error loading dashboard data", e)
+    
+    def get_daily_series(self, db, days):
+        """Return (dates, sales counts, revenue) for the last N days, oldest first"""
+        today = datetime.now().date()
+        dates = [(today - timedelta(days=i)).strftime('%Y-%m-%d')
+                for i in range(days - 1, -1, -1)]
+        
+        # Read the rollups; days without sales have no row
+        rollups = {row['day']: row for row in db.metrics.daily_sales(dates[0], dates[-1])}
+        
+        sales_data = [rollups[day]['sales_count'] if day in rollups else 0 for day in dates]
+        revenue_data = [rollups[day]['revenue'] if day in rollups else 0 for day in dates]
+        
+        return dates, sales_data, revenue_data
     
-    def update_charts(self):
+    def update_charts(self, dates, sales_data, revenue_data):
         """Update dashboard charts"""
         try:
-            # Clear previous plots
-            self.ax1.clear()
-            self.ax2.clear()
-            
-            # Generate sample data for charts
-            dates = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                    for i in range(7)]
-            sales_data = [random.randint(1000, 5000) for _ in range(7)]
-            revenue_data = [random.randint(5000, 15000) for _ in range(7)]
-            
             # Plot sales trend
-            self.ax1.plot(dates, sales_data, marker='o',
-                         color=self.colors['primary'])
-            self.ax1.set_title('📈 Sales Trend')
-            self.ax1.set_xlabel('Date')
-            self.ax1.set_ylabel('Number of Sales')
-            self.ax1.tick_params(axis='x', rotation=45)
+            self.charts.line(self.ax1, 'sales', dates, sales_data, marker='o',
+                             color=self.colors['primary'])
             
             # Plot revenue trend
-            self.ax2.plot(dates, revenue_data, marker='o',
-                         color=self.colors['success'])
-            self.ax2.set_title('💰 Revenue Trend')
-            self.ax2.set_xlabel('Date')
-            self.ax2.set_ylabel('Revenue ($)')
-            self.ax2.tick_params(axis='x', rotation=45)
+            self.charts.line(self.ax2, 'revenue', dates, revenue_data, marker='o',
+                             color=self.colors['success'])
             
-            # Adjust layout and display
-            self.fig.tight_layout()
-            self.canvas.draw()
+            # Redraw only if the data changed
+            self.charts.show()
             
         except Exception as e:
-            print(f"Error updating charts: {str(e)}") 
\ No newline at end of file
+            report_error("Error updating charts", e) 
\ No newline at end of file
@@ -0,0 +1,180 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from analytics import AnalyticsCache
+from querystats import stats
+from timeseries import TimeSeriesRepository
+
+from repositories import (UserRepository, ProductRepository, SaleRepository,
+                          SaleItemRepository, CustomerRepository, EmployeeRepository,
+                          SupplierRepository, TransactionRepository, MetricsRepository,
+                          SearchRepository)
+
+class Database:
+    """Shared data-access layer between the UI modules and SQLite"""
+
+    def __init__(self, path='bms.db', cached_statements=256, busy_timeout=5000,
+                 check_same_thread=True, write_lock=None, analytics=None):
+        # sqlite3 keeps compiled statements keyed by SQL text, so repositories
+        # build each statement once and reuse the exact same string
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=busy_timeout / 1000,
+                                    cached_statements=cached_statements,
+                                    check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+
+        # Shared by connections to the same file (see connections.py) so
+        # writes from this process never compete for the database lock
+        self.write_lock = write_lock or threading.RLock()
+
+        # In-memory column copies for aggregations, shared the same way
+        self.analytics = analytics or AnalyticsCache()
+
+        # Set by the UI to run queries off the Tk thread (see executor.py)
+        self.executor = None
+
+        # Write counters per table, so cached views can tell what changed
+        self.table_versions = {}
+
+        # One repository per table
+        self.users = UserRepository(self)
+        self.products = ProductRepository(self)
+        self.sales = SaleRepository(self)
+        self.sale_items = SaleItemRepository(self)
+        self.customers = CustomerRepository(self)
+        self.employees = EmployeeRepository(self)
+        self.suppliers = SupplierRepository(self)
+        self.transactions = TransactionRepository(self)
+        self.repositories = {repo.table: repo for repo in (
+            self.users, self.products, self.sales, self.sale_items, self.customers,
+            self.employees, self.suppliers, self.transactions)}
+
+        # Trigger-maintained summaries and full-text index
+        self.metrics = MetricsRepository(self)
+        self.search_index = SearchRepository(self)
+        self.timeseries = TimeSeriesRepository(self)
+
+    def touch(self, *tables):
+        """Record that rows in the given tables were written"""
+        for table in tables:
+            self.table_versions[table] = self.table_versions.get(table, 0) + 1
+
+    def snapshot(self, tables):
+        """Return a value that changes whenever any of the tables is written
+
+        PRAGMA data_version covers commits made through other connections.
+        """
+        return (self.fetch_value("PRAGMA data_version"),
+                tuple(self.table_versions.get(table, 0) for table in tables))
+
+    def run(self, job, callback=None, key=None, error=None):
+        """Run job(db) in the background when an executor is attached, else inline
+
+        callback(result) or error(exception) is called with the outcome.
+        """
+        if self.executor is not None:
+            return self.executor.submit(job, callback, key, error)
+
+        try:
+            result = job(self)
+        except Exception as e:
+            if error is None:
+                raise
+            error(e)
+            return None
+
+        if callback:
+            callback(result)
+        return None
+
+    def cancel(self, key):
+        """Drop a background request submitted under a key"""
+        if self.executor is not None:
+            self.executor.cancel(key)
+
+    def timed(self, sql, call):
+        """Run call() -> (result, rows) and record its duration with the query stats"""
+        started = time.perf_counter()
+        try:
+            result, rows = call()
+        except Exception as e:
+            stats.record(sql, time.perf_counter() - started, 0, e)
+            raise
+        stats.record(sql, time.perf_counter() - started, rows)
+        return result
+
+    def execute(self, sql, params=()):
+        """Run one statement and return its cursor"""
+        def call():
+            cursor = self.conn.execute(sql, params)
+            return cursor, cursor.rowcount
+        return self.timed(sql, call)
+
+    def executescript(self, script):
+        """Run a multi-statement SQL script"""
+        return self.timed(script, lambda: (self.conn.executescript(script), 0))
+
+    def fetch_one(self, sql, params=()):
+        """Run a query and return its first row, or None"""
+        def call():
+            row = self.conn.execute(sql, params).fetchone()
+            return row, int(row is not None)
+        return self.timed(sql, call)
+
+    def fetch_all(self, sql, params=()):
+        """Run a query and return all rows"""
+        def call():
+            rows = self.conn.execute(sql, params).fetchall()
+            return rows, len(rows)
+        return self.timed(sql, call)
+
+    def fetch_value(self, sql, params=(), default=None):
+        """Run a query and return the first column of its first row"""
+        row = self.fetch_one(sql, params)
+        if row is None or row[0] is None:
+            return default
+        return row[0]
+
+    def execute_many(self, sql, rows, batch_size=1000):
+        """Run a statement for every row in batches, returning the number of rows written"""
+        total = 0
+        batch = []
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.timed(sql, lambda: (self.conn.executemany(sql, batch), len(batch)))
+                total += len(batch)
+                batch = []
+
+        if batch:
+            self.timed(sql, lambda: (self.conn.executemany(sql, batch), len(batch)))
+            total += len(batch)
+
+        return total
+
+    @contextmanager
+    def transaction(self):
+        """Commit everything in the block at once, or roll it all back on error"""
+        with self.write_lock:
+            # Take the write lock up front; upgrading a read transaction
+            # later can fail at once instead of waiting for other processes
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield self
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def commit(self):
+        """Commit pending changes"""
+        self.conn.commit()
+
+    def close(self):
+        """Close the underlying connection"""
+        self.conn.close()
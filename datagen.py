@@ -0,0 +1,226 @@
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from database import Database
+from migrations import migrate
+
+# Word lists for plausible-looking records
+FIRST_NAMES = ('James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+               'David', 'Elizabeth', 'Aarav', 'Priya', 'Rahul', 'Ananya', 'Wei', 'Mei',
+               'Carlos', 'Sofia', 'Ahmed', 'Fatima', 'Olu', 'Amara', 'Yuki', 'Hana')
+LAST_NAMES = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Sharma', 'Patel', 'Singh', 'Kumar', 'Wang', 'Li', 'Chen', 'Lopez', 'Hassan',
+              'Okafor', 'Tanaka', 'Sato', 'Nguyen', 'Kim', 'Ivanov', 'Rossi')
+PRODUCT_WORDS = ('Widget', 'Gadget', 'Cable', 'Adapter', 'Charger', 'Bottle', 'Notebook',
+                 'Pen', 'Lamp', 'Chair', 'Desk', 'Mug', 'Shirt', 'Shoes', 'Bag', 'Speaker')
+PRODUCT_CATEGORIES = ('Electronics', 'Stationery', 'Furniture', 'Clothing', 'Kitchen', 'Outdoor')
+DEPARTMENTS = ('Sales', 'Operations', 'Finance', 'HR', 'IT', 'Warehouse')
+POSITIONS = ('Associate', 'Senior Associate', 'Manager', 'Director', 'Analyst', 'Clerk')
+INCOME_CATEGORIES = ('Sales', 'Services', 'Interest', 'Other Income')
+EXPENSE_CATEGORIES = ('Rent', 'Salaries', 'Utilities', 'Supplies', 'Marketing', 'Travel',
+                      'Maintenance')
+STATUSES = ('Active', 'Active', 'Active', 'Inactive')
+
+class DataGenerator:
+    """Fill a database with large, realistic volumes for benchmarking
+
+    Rows are produced lazily and written through the repositories in chunked
+    transactions, so memory stays flat at any volume and the usual triggers
+    keep every rollup consistent.
+    """
+
+    def __init__(self, db, seed=42, years=3, chunk_size=10000, progress=print):
+        self.db = db
+        self.random = random.Random(seed)
+        self.end_day = date.today()
+        self.start_day = self.end_day - timedelta(days=365 * years)
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def person_name(self):
+        """A random full name"""
+        return f"{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}"
+
+    def customer_name(self, customer_id):
+        """The name generated for a customer id, so sales can repeat it"""
+        return (f"{FIRST_NAMES[customer_id % len(FIRST_NAMES)]} "
+                f"{LAST_NAMES[customer_id // len(FIRST_NAMES) % len(LAST_NAMES)]}")
+
+    def phone(self):
+        """A random phone number"""
+        return f"+1-555-{self.random.randint(0, 9999999):07d}"
+
+    def day(self):
+        """A random date in the generated period"""
+        span = (self.end_day - self.start_day).days
+        return self.start_day + timedelta(days=self.random.randint(0, span))
+
+    def write(self, repo, columns, rows, count, lines=None):
+        """Insert count generated rows in chunked transactions
+
+        lines, when given, is a list of sale_items rows the generator fills
+        for the rows it yields; they are written with their chunk.
+        """
+        started = time.perf_counter()
+        written = 0
+        chunk = []
+
+        def flush():
+            with self.db.transaction():
+                repo.insert_many(columns, chunk, self.chunk_size)
+                if lines:
+                    self.db.sale_items.insert_many(self.db.sale_items.columns, lines,
+                                                   self.chunk_size)
+                    lines.clear()
+
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                flush()
+                written += len(chunk)
+                chunk = []
+                if self.progress and written % (self.chunk_size * 10) == 0:
+                    self.progress(f"  {repo.table}: {written:,}/{count:,}")
+
+        if chunk:
+            flush()
+            written += len(chunk)
+
+        if self.progress:
+            seconds = time.perf_counter() - started
+            self.progress(f"{repo.table}: {written:,} rows in {seconds:.1f}s "
+                          f"({written / seconds if seconds else 0:,.0f}/s)")
+        return written
+
+    def products(self, count):
+        """Products with huge stock so generated sales never run out"""
+        def rows():
+            for i in range(count):
+                yield (f"{self.random.choice(PRODUCT_WORDS)} {i + 1}",
+                       self.random.choice(PRODUCT_CATEGORIES),
+                       10 ** 9,
+                       round(self.random.uniform(1, 500), 2),
+                       f"Generated product {i + 1}")
+        return self.write(self.db.products, ('name', 'category', 'stock', 'price', 'description'),
+                          rows(), count)
+
+    def customers(self, count):
+        """Customers whose names are derived from their ids"""
+        first_id = self.db.fetch_value("SELECT MAX(id) FROM customers", default=0) + 1
+
+        def rows():
+            for i in range(first_id, first_id + count):
+                yield (i, self.customer_name(i), f"customer{i}@example.com", self.phone(),
+                       f"{self.random.randint(1, 9999)} Main Street", None)
+        return self.write(self.db.customers, ('id', 'name', 'email', 'phone', 'address', 'notes'),
+                          rows(), count)
+
+    def employees(self, count):
+        """Employees across departments with random hire dates"""
+        def rows():
+            for i in range(count):
+                yield (self.person_name(), self.random.choice(POSITIONS),
+                       self.random.choice(DEPARTMENTS), self.random.choice(STATUSES),
+                       f"employee{i + 1}@example.com", self.phone(), None,
+                       self.day().isoformat(), round(self.random.uniform(25000, 150000), 2), None)
+        return self.write(self.db.employees, self.db.employees.columns, rows(), count)
+
+    def suppliers(self, count):
+        """Suppliers with mixed status and payment terms"""
+        def rows():
+            for i in range(count):
+                yield (f"{self.random.choice(LAST_NAMES)} {self.random.choice(PRODUCT_WORDS)} Co {i + 1}",
+                       self.person_name(), f"supplier{i + 1}@example.com", self.phone(),
+                       self.random.choice(STATUSES), None,
+                       self.random.choice(('Net 15', 'Net 30', 'Net 60')), None)
+        return self.write(self.db.suppliers, self.db.suppliers.columns, rows(), count)
+
+    def sales(self, count, max_lines=3):
+        """Sales spread over the period, each with 1..max_lines line items"""
+        products = self.db.fetch_all("SELECT id, name, price FROM products")
+        customers = self.db.fetch_value("SELECT MAX(id) FROM customers", default=0)
+        if not products or not customers:
+            raise ValueError("Generate products and customers before sales")
+
+        first_sale = self.db.fetch_value("SELECT MAX(id) FROM sales", default=0) + 1
+        lines = []
+
+        def rows():
+            for i in range(count):
+                picked = [(self.random.choice(products), self.random.randint(1, 5))
+                          for _ in range(self.random.randint(1, max_lines))]
+                sale_id = first_sale + i
+                for product, quantity in picked:
+                    lines.append((sale_id, product['id'], quantity, product['price']))
+
+                customer_id = self.random.randint(1, customers)
+                yield (sale_id, f"{self.day().isoformat()} {self.random.randint(8, 20):02d}:"
+                       f"{self.random.randint(0, 59):02d}:{self.random.randint(0, 59):02d}",
+                       customer_id, self.customer_name(customer_id),
+                       "\n".join(f"{q} x {p['name']}" for p, q in picked),
+                       sum(q for _, q in picked),
+                       round(sum(p['price'] * q for p, q in picked), 2))
+
+        # Ids are given explicitly so each sale's lines can go in with its chunk
+        return self.write(self.db.sales, ('id', 'date', 'customer_id', 'customer_name', 'items',
+                                          'items_count', 'total_amount'), rows(), count, lines)
+
+    def transactions(self, count):
+        """Income and expense entries over the period, roughly 60/40"""
+        def rows():
+            for _ in range(count):
+                if self.random.random() < 0.6:
+                    type_, category = 'Income', self.random.choice(INCOME_CATEGORIES)
+                    amount = round(self.random.uniform(50, 5000), 2)
+                else:
+                    type_, category = 'Expense', self.random.choice(EXPENSE_CATEGORIES)
+                    amount = round(self.random.uniform(20, 3000), 2)
+                yield (self.day().isoformat(), type_, category, amount, None)
+        return self.write(self.db.transactions, self.db.transactions.columns, rows(), count)
+
+    def run(self, products, customers, employees, suppliers, sales, transactions):
+        """Generate every table in dependency order"""
+        started = time.perf_counter()
+        self.products(products)
+        self.customers(customers)
+        self.employees(employees)
+        self.suppliers(suppliers)
+        self.sales(sales)
+        self.transactions(transactions)
+        if self.progress:
+            self.progress(f"Done in {time.perf_counter() - started:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic BMS database")
+    parser.add_argument('path', help="database file to create (must not exist)")
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--customers', type=int, default=100000)
+    parser.add_argument('--employees', type=int, default=500)
+    parser.add_argument('--suppliers', type=int, default=200)
+    parser.add_argument('--sales', type=int, default=1000000)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--years', type=int, default=3, help="length of the sales history")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # Never write into an existing (possibly live) database
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+
+    db = Database(args.path)
+    migrate(db)
+
+    # A throwaway database does not need to survive a power cut mid-load
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("PRAGMA synchronous = OFF")
+
+    DataGenerator(db, args.seed, args.years).run(args.products, args.customers, args.employees,
+                                                 args.suppliers, args.sales, args.transactions)
+    db.execute("ANALYZE")
+    db.close()
+
+if __name__ == "__main__":
+    main()
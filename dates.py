@@ -0,0 +1,42 @@
+import calendar
+import re
+from datetime import date, datetime
+
+# Text formats dates are stored in; triggers reject any other spelling
+DATE_FORMAT = '%Y-%m-%d'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Per table: the date column, its stored format and the indexed epoch column
+# generated from it (seconds since 1970, NULL for a legacy value that cannot be read)
+DATE_COLUMNS = {
+    'sales': ('date', TIMESTAMP_FORMAT, 'date_epoch'),
+    'financial_transactions': ('date', DATE_FORMAT, 'date_epoch'),
+    'employees': ('hire_date', DATE_FORMAT, 'hire_date_epoch'),
+}
+
+# What users may type: a day, optionally followed by HH:MM or HH:MM:SS
+INPUT_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?')
+
+EXPECTED = {DATE_FORMAT: 'YYYY-MM-DD', TIMESTAMP_FORMAT: 'YYYY-MM-DD HH:MM:SS'}
+
+def normalize(value, fmt):
+    """Return a typed date in the stored format, or raise ValueError
+
+    A missing time is midnight, and a time given for a date-only column is dropped.
+    """
+    value = str(value).strip()
+    try:
+        if not INPUT_PATTERN.fullmatch(value):
+            raise ValueError
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"expected {EXPECTED[fmt]}")
+
+    # Already in the stored format: skip the strftime, which matters on big imports
+    if len(value) == len(EXPECTED[fmt]) and value[10:11] != 'T':
+        return value
+    return parsed.strftime(fmt)
+
+def epoch(day):
+    """Seconds since 1970 at the start of a 'YYYY-MM-DD' day, as in the epoch columns"""
+    return calendar.timegm(date.fromisoformat(day).timetuple())
@@ -0,0 +1,176 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from querystats import stats
+
+# Where slow queries go when logging is switched on
+SLOW_LOG_PATH = 'slow_queries.log'
+
+class Diagnostics:
+    """Admin view of query timings and recent errors"""
+    # Reads in-memory counters only, so no table changes affect it
+    tables = ()
+    
+    # Milliseconds between automatic refreshes while the view is shown
+    refresh_interval = 2000
+    
+    def __init__(self, parent, db):
+        self.frame = ttk.Frame(parent)
+        self.db = db
+        self.after_id = None
+        
+        # Create main container
+        container = ttk.Frame(self.frame)
+        container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # Title
+        title_label = ttk.Label(container, text="🩺 Diagnostics",
+                              font=('Helvetica', 24, 'bold'))
+        title_label.pack(pady=(0, 20))
+        
+        # Initialize components
+        self.init_controls(container)
+        self.init_query_list(container)
+        self.init_error_list(container)
+        
+        # Load initial data and keep it current
+        self.refresh()
+        self.frame.bind('<Destroy>', self.on_destroy)
+    
+    def init_controls(self, parent):
+        """Initialize refresh, reset and slow-query logging controls"""
+        control_frame = ttk.Frame(parent)
+        control_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Button(control_frame, text="🔄 Refresh",
+                  command=self.refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="🧹 Reset",
+                  command=self.reset).pack(side=tk.LEFT, padx=5)
+        
+        # Slow-query logging
+        self.slow_log_var = tk.BooleanVar(value=stats.slow_log_path is not None)
+        ttk.Checkbutton(control_frame, text=f"Log slow queries to {SLOW_LOG_PATH}",
+                       variable=self.slow_log_var,
+                       command=self.update_slow_log).pack(side=tk.LEFT, padx=(20, 5))
+        
+        ttk.Label(control_frame, text="Threshold (ms):").pack(side=tk.LEFT)
+        self.threshold_entry = ttk.Entry(control_frame, width=8)
+        self.threshold_entry.insert(0, str(stats.slow_ms))
+        self.threshold_entry.pack(side=tk.LEFT, padx=5)
+        self.threshold_entry.bind('<Return>', lambda e: self.update_slow_log())
+        
+        # Totals
+        self.summary_label = ttk.Label(control_frame, text="")
+        self.summary_label.pack(side=tk.RIGHT, padx=5)
+    
+    def init_query_list(self, parent):
+        """Initialize the per-query timing table"""
+        list_frame = ttk.LabelFrame(parent, text="Queries by total time", padding=10)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        
+        columns = ("Query", "Calls", "Rows", "p50", "p95", "p99", "Max", "Total", "Errors")
+        self.query_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        
+        # Configure columns
+        for col in columns:
+            self.query_tree.heading(col, text=col if col in ("Query", "Calls", "Rows", "Errors")
+                                    else f"{col} ms")
+            self.query_tree.column(col, width=80, anchor=tk.E)
+        self.query_tree.column("Query", width=380, anchor=tk.W)
+        
+        # Add scrollbar
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.query_tree.yview)
+        self.query_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Pack widgets
+        self.query_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Show the SQL of the selected query
+        self.sql_label = ttk.Label(parent, text="", wraplength=900, justify=tk.LEFT)
+        self.sql_label.pack(fill=tk.X, pady=5)
+        self.query_tree.bind('<<TreeviewSelect>>', self.on_query_select)
+        self.sql_by_item = {}
+    
+    def init_error_list(self, parent):
+        """Initialize the recent errors list"""
+        error_frame = ttk.LabelFrame(parent, text="Recent errors", padding=10)
+        error_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.error_list = tk.Listbox(error_frame, height=6)
+        self.error_list.pack(fill=tk.X)
+    
+    def refresh(self):
+        """Redraw the timings and schedule the next refresh"""
+        if self.after_id is not None:
+            self.frame.after_cancel(self.after_id)
+            self.after_id = None
+        
+        # Skip the work while another module is shown
+        if self.frame.winfo_ismapped() or not self.query_tree.get_children():
+            self.load_stats()
+        self.after_id = self.frame.after(self.refresh_interval, self.refresh)
+    
+    def load_stats(self):
+        """Fill the tables from the shared query stats"""
+        selected = self.query_tree.selection()
+        selected_label = self.query_tree.item(selected[0])['values'][0] if selected else None
+        
+        self.query_tree.delete(*self.query_tree.get_children())
+        self.sql_by_item = {}
+        
+        calls = 0
+        total_ms = 0.0
+        for query in stats.snapshot():
+            item = self.query_tree.insert('', 'end', values=(
+                query['label'],
+                f"{query['calls']:,}",
+                f"{query['rows']:,}",
+                f"{query['p50_ms']:.2f}",
+                f"{query['p95_ms']:.2f}",
+                f"{query['p99_ms']:.2f}",
+                f"{query['max_ms']:.2f}",
+                f"{query['total_ms']:.1f}",
+                query['errors']
+            ))
+            self.sql_by_item[item] = query['sql']
+            if query['label'] == selected_label:
+                self.query_tree.selection_set(item)
+            calls += query['calls']
+            total_ms += query['total_ms']
+        
+        self.summary_label.config(text=f"{calls:,} queries, {total_ms / 1000:.2f}s in SQLite")
+        
+        self.error_list.delete(0, tk.END)
+        for when, context, message in stats.recent_errors():
+            self.error_list.insert(tk.END, f"{when.strftime('%H:%M:%S')}  {context}: {message}")
+    
+    def on_query_select(self, event):
+        """Show the full SQL of the selected query"""
+        selected = self.query_tree.selection()
+        self.sql_label.config(text=self.sql_by_item.get(selected[0], "") if selected else "")
+    
+    def update_slow_log(self):
+        """Apply the slow-query logging checkbox and threshold"""
+        try:
+            threshold = float(self.threshold_entry.get())
+            if threshold < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Threshold must be a non-negative number of milliseconds")
+            return
+        
+        stats.slow_ms = threshold
+        stats.slow_log_path = SLOW_LOG_PATH if self.slow_log_var.get() else None
+    
+    def reset(self):
+        """Clear all recorded timings and errors"""
+        if messagebox.askyesno("Confirm", "Clear all recorded query timings and errors?"):
+            stats.reset()
+            self.load_stats()
+    
+    def on_destroy(self, event):
+        """Stop refreshing once the module is closed"""
+        if event.widget is self.frame and self.after_id is not None:
+            self.frame.after_cancel(self.after_id)
+            self.after_id = None
@@ -2,11 +2,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
+from dates import DATE_FORMAT, normalize
+from exporter import export_table
+from paged_list import PagedList
+from specs import LIST_SPECS
+
 class Employees:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('employees',)
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -47,6 +54,10 @@ class Employees:
         # Load initial data
         self.load_employees()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_employees()
+    
     def init_employee_list(self, parent):
         """Initialize employee list view"""
         # Search frame
@@ -57,6 +68,14 @@ class Employees:
         self.search_entry = ttk.Entry(search_frame)
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
+        # Add search button
+        ttk.Button(search_frame, text="Search",
+                  command=self.search_employees).pack(side=tk.LEFT, padx=5)
+        
+        # Match count
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=5)
+        
         # Employee list
         self.employee_tree = ttk.Treeview(parent, columns=("ID", "Name", "Position", "Department", "Status"),
                                        show="headings")
@@ -77,7 +96,10 @@ class Employees:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.employee_tree.yview)
-        self.employee_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Page rows in as the user scrolls instead of loading the whole table
+        self.employee_list = PagedList(self.employee_tree, scrollbar, self.db, "employees",
+                                       **LIST_SPECS["employees"])
         
         # Pack widgets
         self.employee_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -97,6 +119,11 @@ class Employees:
                   command=self.show_edit_employee).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🗑️ Delete Employee",
                   command=self.delete_employee).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📤 Export",
+                  command=self.export_employees).pack(side=tk.LEFT, padx=5)
+        
+        # Bind Enter key to search
+        self.search_entry.bind('<Return>', lambda e: self.search_employees())
     
     def init_employee_details(self, parent):
         """Initialize employee details form"""
@@ -190,20 +217,9 @@ class Employees:
     def load_employees(self):
         """Load employees from database"""
         try:
-            # Clear existing items
-            for item in self.employee_tree.get_children():
-                self.employee_tree.delete(item)
-            
-            # Get employees from database
-            self.cursor.execute("""
-                SELECT id, name, position, department, status
-                FROM employees
-                ORDER BY name
-            """)
-            
-            # Add employees to treeview
-            for employee in self.cursor.fetchall():
-                self.employee_tree.insert("", tk.END, values=employee)
+            # Load the first page in the background; later pages are fetched on scroll
+            self.employee_list.reload(lambda e: messagebox.showerror(
+                                      "Error", f"Failed to load employees: {str(e)}"))
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load employees: {str(e)}")
@@ -218,49 +234,42 @@ class Employees:
         employee_id = self.employee_tree.item(selection[0])['values'][0]
         
         # Get employee details from database
-        self.cursor.execute("""
-            SELECT id, name, position, department, status, email, phone,
-                   hire_date, salary, notes
-            FROM employees
-            WHERE id = ?
-        """, (employee_id,))
-        
-        employee = self.cursor.fetchone()
+        employee = self.db.employees.get(employee_id)
         if employee:
             # Update form fields
             self.id_entry.configure(state='normal')
             self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(employee[0]))
+            self.id_entry.insert(0, str(employee['id']))
             self.id_entry.configure(state='readonly')
             
             self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, employee[1])
+            self.name_entry.insert(0, employee['name'])
             
             self.position_entry.delete(0, tk.END)
-            self.position_entry.insert(0, employee[2])
+            self.position_entry.insert(0, employee['position'])
             
             self.department_entry.delete(0, tk.END)
-            self.department_entry.insert(0, employee[3])
+            self.department_entry.insert(0, employee['department'])
             
-            self.status_var.set(employee[4])
+            self.status_var.set(employee['status'])
             
             self.email_entry.delete(0, tk.END)
-            self.email_entry.insert(0, employee[5])
+            self.email_entry.insert(0, employee['email'])
             
             self.phone_entry.delete(0, tk.END)
-            self.phone_entry.insert(0, employee[6])
+            self.phone_entry.insert(0, employee['phone'])
             
             self.address_text.delete('1.0', tk.END)
-            self.address_text.insert('1.0', employee[7] or '')
+            self.address_text.insert('1.0', employee['address'] or '')
             
             self.hire_date_entry.delete(0, tk.END)
-            self.hire_date_entry.insert(0, employee[8])
+            self.hire_date_entry.insert(0, employee['hire_date'])
             
             self.salary_entry.delete(0, tk.END)
-            self.salary_entry.insert(0, str(employee[9]))
+            self.salary_entry.insert(0, str(employee['salary']))
             
             self.notes_text.delete('1.0', tk.END)
-            self.notes_text.insert('1.0', employee[10] or '')
+            self.notes_text.insert('1.0', employee['notes'] or '')
     
     def show_add_employee(self):
         """Show add employee form"""
@@ -277,7 +286,7 @@ class Employees:
         self.phone_entry.delete(0, tk.END)
         self.address_text.delete('1.0', tk.END)
         self.hire_date_entry.delete(0, tk.END)
-        self.hire_date_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
+        self.hire_date_entry.insert(0, datetime.now().strftime(DATE_FORMAT))
         self.salary_entry.delete(0, tk.END)
         self.notes_text.delete('1.0', tk.END)
     
@@ -314,30 +323,30 @@ class Employees:
                 messagebox.showerror("Error", "Please enter a valid email address")
                 return
             
+            try:
+                hire_date = normalize(hire_date, DATE_FORMAT)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid hire date: {str(e)}")
+                return
+            
             try:
                 salary = float(salary)
             except ValueError:
                 messagebox.showerror("Error", "Invalid salary amount")
                 return
             
-            if employee_id:  # Update existing employee
-                self.cursor.execute("""
-                    UPDATE employees
-                    SET name = ?, position = ?, department = ?, status = ?,
-                        email = ?, phone = ?, address = ?, hire_date = ?, salary = ?, notes = ?
-                    WHERE id = ?
-                """, (name, position, department, status, email, phone, address,
-                      hire_date, salary, notes, employee_id))
-            else:  # Add new employee
-                self.cursor.execute("""
-                    INSERT INTO employees (name, position, department, status,
-                                         email, phone, address, hire_date, salary, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (name, position, department, status, email, phone, address,
-                      hire_date, salary, notes))
+            record = {'name': name, 'position': position, 'department': department,
+                      'status': status, 'email': email, 'phone': phone, 'address': address,
+                      'hire_date': hire_date, 'salary': salary, 'notes': notes}
+            
+            with self.db.transaction():
+                if employee_id:  # Update existing employee
+                    self.db.employees.update(employee_id, record)
+                else:  # Add new employee
+                    employee_id = self.db.employees.insert(record)
             
-            self.conn.commit()
-            self.load_employees()
+            # Redraw only the saved row instead of reloading the list
+            self.employee_list.refresh_row(employee_id, select=True)
             messagebox.showinfo("Success", "Employee saved successfully")
             
         except Exception as e:
@@ -354,11 +363,34 @@ class Employees:
             try:
                 employee_id = self.employee_tree.item(selection[0])['values'][0]
                 
-                self.cursor.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
-                self.conn.commit()
+                with self.db.transaction():
+                    self.db.employees.delete(employee_id)
                 
-                self.load_employees()
+                self.employee_list.remove_row(employee_id)
                 messagebox.showinfo("Success", "Employee deleted successfully")
                 
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete employee: {str(e)}") 
\ No newline at end of file
+                messagebox.showerror("Error", f"Failed to delete employee: {str(e)}") 
+    
+    def export_employees(self):
+        """Export employees to a CSV or JSONL file"""
+        export_table(self.frame, self.db, 'employees')
+    
+    def show_record(self, employee_id):
+        """Open an employee from a search hit, with the colleagues listed next to them"""
+        self.search_entry.delete(0, tk.END)
+        self.match_label.config(text="")
+        self.employee_list.jump_to(employee_id, lambda e: messagebox.showerror(
+            "Error", f"Failed to load employees: {str(e)}"))
+    
+    def search_employees(self):
+        """Search employees and show only the matches"""
+        search_term = self.search_entry.get()
+        
+        try:
+            # Filter the list in SQL and page in the matches, showing the match count
+            self.employee_list.search(search_term, self.match_label, lambda e: messagebox.showerror(
+                                      "Error", f"Failed to search employees: {str(e)}"))
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to search employees: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,111 @@
+import itertools
+import queue
+import threading
+
+from querystats import report_error
+
+class QueryExecutor:
+    """Run database work on worker threads and hand results back to the Tk thread
+
+    Workers borrow connections from a ConnectionPool. Jobs are submitted with an optional
+    key; submitting a newer job under the same key makes the older one stale,
+    so it is skipped if it has not started and its result is dropped if it has.
+    """
+
+    def __init__(self, root, pool, workers=2, poll_interval=20):
+        self.root = root
+        self.pool = pool
+        self.poll_interval = poll_interval
+
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+
+        # Latest ticket per key, used to recognise stale requests
+        self.latest = {}
+        self.lock = threading.Lock()
+        self.tickets = itertools.count()
+        self.closed = False
+
+        # Start workers and the result poller
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self.work, name=f"bms-query-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+        self.root.after(self.poll_interval, self.poll)
+
+    def submit(self, job, callback=None, key=None, error=None):
+        """Queue job(db) for a worker; callback(result) or error(exception) runs on the Tk thread"""
+        ticket = next(self.tickets)
+        if key is not None:
+            with self.lock:
+                self.latest[key] = ticket
+
+        self.jobs.put((ticket, key, job, callback, error))
+        return ticket
+
+    def cancel(self, key):
+        """Drop any pending or running request submitted under a key"""
+        with self.lock:
+            self.latest.pop(key, None)
+
+    def is_stale(self, ticket, key):
+        """Check whether a newer request (or a cancel) replaced this one"""
+        if key is None:
+            return False
+        with self.lock:
+            return self.latest.get(key) != ticket
+
+    def work(self):
+        """Worker loop: run each job on a pooled connection"""
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+
+            ticket, key, job, callback, error = item
+            if self.is_stale(ticket, key):
+                continue
+
+            try:
+                with self.pool.reader() as db:
+                    result = job(db)
+                self.results.put((ticket, key, callback, result, None, error))
+            except Exception as e:
+                self.results.put((ticket, key, callback, None, e, error))
+
+    def poll(self):
+        """Deliver finished results on the Tk thread"""
+        while True:
+            try:
+                ticket, key, callback, result, exception, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if self.is_stale(ticket, key):
+                continue
+
+            if key is not None:
+                with self.lock:
+                    del self.latest[key]
+
+            try:
+                if exception is not None:
+                    if error:
+                        error(exception)
+                    else:
+                        report_error("Background query failed", exception)
+                elif callback:
+                    callback(result)
+            except Exception as e:
+                report_error("Error handling query result", e)
+
+        if not self.closed:
+            self.root.after(self.poll_interval, self.poll)
+
+    def shutdown(self):
+        """Stop the workers once queued jobs are done"""
+        self.closed = True
+        for _ in self.threads:
+            self.jobs.put(None)
@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import date, timedelta
+
+from dates import DATE_COLUMNS, epoch
+
+# Output formats by file extension
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl'}
+
+# Columns left out unless asked for by name
+HIDDEN_COLUMNS = {
+    'users': ('password',),
+}
+
+class TableExporter:
+    """Stream one table to a CSV or JSONL file in constant memory
+
+    Rows are read with fetchmany and written as they arrive, so only one
+    batch is held at a time whatever the size of the table.
+    """
+
+    def __init__(self, db, table, batch_size=1000, progress=None):
+        if table not in db.repositories:
+            raise ValueError(f"Export is not supported for {table}")
+
+        self.db = db
+        self.table = table
+        self.batch_size = batch_size
+        self.progress = progress
+        self.written = 0
+
+    def available_columns(self):
+        """Every exportable column, id first"""
+        return ['id'] + list(self.db.repositories[self.table].columns)
+
+    def default_columns(self):
+        """Columns exported when none are chosen"""
+        hidden = HIDDEN_COLUMNS.get(self.table, ())
+        return [column for column in self.available_columns() if column not in hidden]
+
+    def build_query(self, columns=None, start=None, end=None):
+        """Build the SELECT for the chosen columns and inclusive 'YYYY-MM-DD' range"""
+        columns = list(columns or self.default_columns())
+        unknown = [column for column in columns if column not in self.available_columns()]
+        if unknown:
+            raise ValueError(f"Unknown columns for {self.table}: {', '.join(unknown)}")
+
+        conditions = []
+        params = []
+
+        if start or end:
+            if self.table not in DATE_COLUMNS:
+                raise ValueError(f"{self.table} has no date column to filter on")
+
+            # Range on the indexed epoch column, which skips rows without a readable date
+            epoch_column = DATE_COLUMNS[self.table][2]
+            if start:
+                conditions.append(f"{epoch_column} >= ?")
+                params.append(epoch(start))
+            if end:
+                conditions.append(f"{epoch_column} < ?")
+                params.append(epoch((date.fromisoformat(end) + timedelta(days=1)).isoformat()))
+
+        sql = f"SELECT {', '.join(columns)} FROM {self.table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+
+        return sql, params, columns
+
+    def run(self, path, columns=None, start=None, end=None):
+        """Write matching rows to path (format from its extension) and return the row count"""
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in FORMATS:
+            raise ValueError("Export file must end in .csv or .jsonl")
+
+        sql, params, columns = self.build_query(columns, start, end)
+        cursor = self.db.execute(sql, params)
+
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if FORMATS[extension] == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                write_rows = writer.writerows
+            else:
+                def write_rows(rows):
+                    f.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+
+                write_rows(rows)
+                self.written += len(rows)
+                if self.progress:
+                    self.progress(self.written)
+
+        return self.written
+
+def export_table(parent, db, table):
+    """Show the export options for a table and export it in the background"""
+    exporter = TableExporter(db, table)
+    date_column = DATE_COLUMNS[table][0] if table in DATE_COLUMNS else None
+
+    window = tk.Toplevel(parent)
+    window.title("Export")
+    window.resizable(False, False)
+    window.transient(parent)
+
+    container = ttk.Frame(window, padding=20)
+    container.pack(fill=tk.BOTH, expand=True)
+
+    ttk.Label(container, text=f"📤 Export {table.replace('_', ' ')}",
+              font=('Helvetica', 12, 'bold')).pack(anchor=tk.W, pady=(0, 10))
+
+    # Column selection
+    columns_frame = ttk.LabelFrame(container, text="Columns", padding=10)
+    columns_frame.pack(fill=tk.X)
+
+    selected = {}
+    defaults = exporter.default_columns()
+    for column in exporter.available_columns():
+        selected[column] = tk.BooleanVar(value=column in defaults)
+        ttk.Checkbutton(columns_frame, text=column,
+                        variable=selected[column]).pack(anchor=tk.W)
+
+    # Optional date range
+    start_entry = end_entry = None
+    if date_column:
+        range_frame = ttk.LabelFrame(container, text=f"{date_column} range (YYYY-MM-DD, optional)",
+                                     padding=10)
+        range_frame.pack(fill=tk.X, pady=10)
+
+        ttk.Label(range_frame, text="From:").pack(side=tk.LEFT)
+        start_entry = ttk.Entry(range_frame, width=12)
+        start_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(range_frame, text="To:").pack(side=tk.LEFT)
+        end_entry = ttk.Entry(range_frame, width=12)
+        end_entry.pack(side=tk.LEFT, padx=5)
+
+    status_label = ttk.Label(container, text="")
+    status_label.pack(anchor=tk.W, pady=5)
+
+    # Updated from the worker thread, read by the Tk thread
+    written = [0]
+
+    def show_progress():
+        if not window.winfo_exists() or written[0] is None:
+            return
+        status_label.config(text=f"{written[0]:,} rows written")
+        window.after(200, show_progress)
+
+    def finished(count):
+        written[0] = None
+        window.destroy()
+        messagebox.showinfo("Export", f"Exported {count:,} rows.")
+
+    def failed(e):
+        written[0] = None
+        if window.winfo_exists():
+            export_button.configure(state='normal')
+            status_label.config(text="")
+        messagebox.showerror("Error", f"Failed to export: {str(e)}")
+
+    def start_export():
+        columns = [column for column, var in selected.items() if var.get()]
+        if not columns:
+            messagebox.showerror("Error", "Please select at least one column", parent=window)
+            return
+
+        start = start_entry.get().strip() if start_entry else ''
+        end = end_entry.get().strip() if end_entry else ''
+        try:
+            for value in (start, end):
+                if value:
+                    date.fromisoformat(value)
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be YYYY-MM-DD", parent=window)
+            return
+
+        path = filedialog.asksaveasfilename(parent=window, title="Export", defaultextension=".csv",
+                                            initialfile=f"{table}.csv",
+                                            filetypes=[("CSV files", "*.csv"),
+                                                       ("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+
+        export_button.configure(state='disabled')
+        written[0] = 0
+        show_progress()
+
+        def progress(count):
+            if written[0] is not None:
+                written[0] = count
+
+        db.run(lambda db: TableExporter(db, table, progress=progress).run(path, columns, start, end),
+               finished, error=failed)
+
+    export_button = ttk.Button(container, text="📤 Export", command=start_export)
+    export_button.pack(anchor=tk.E)
@@ -3,13 +3,24 @@ from tkinter import ttk, messagebox
 from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
+
+from exporter import export_table
+from importer import import_csv
+from analytics import GRANULARITIES
+from charts import ChartRenderer
+from dates import DATE_FORMAT, normalize
+from paged_list import PagedList
+from querystats import report_error
+from specs import LIST_SPECS
+from timeseries import RANGES, date_range
 
 class Financial:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('financial_transactions',)
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -50,6 +61,10 @@ class Financial:
         # Load initial data
         self.load_transactions()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_transactions()
+    
     def init_transaction_list(self, parent):
         """Initialize transaction list view"""
         # Search frame
@@ -64,6 +79,10 @@ class Financial:
         ttk.Button(search_frame, text="Search",
                   command=self.search_transactions).pack(side=tk.LEFT, padx=5)
         
+        # Match count
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=5)
+        
         # Transaction list
         self.transaction_tree = ttk.Treeview(parent, columns=("ID", "Date", "Type", "Category", "Amount"),
                                           show="headings")
@@ -84,7 +103,10 @@ class Financial:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.transaction_tree.yview)
-        self.transaction_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Page rows in as the user scrolls instead of loading the whole table
+        self.transaction_list = PagedList(self.transaction_tree, scrollbar, self.db, "financial_transactions",
+                                          **LIST_SPECS["financial_transactions"])
         
         # Pack widgets
         self.transaction_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -104,6 +126,10 @@ class Financial:
                   command=self.show_edit_transaction).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🗑️ Delete Transaction",
                   command=self.delete_transaction).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📥 Import CSV",
+                  command=self.import_transactions).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📤 Export",
+                  command=self.export_transactions).pack(side=tk.LEFT, padx=5)
         
         # Bind Enter key to search
         self.search_entry.bind('<Return>', lambda e: self.search_transactions())
@@ -191,28 +217,44 @@ class Financial:
         charts_frame = ttk.LabelFrame(parent, text="Financial Analytics", padding=10)
         charts_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Chart range and period length
+        options_frame = ttk.Frame(charts_frame)
+        options_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(options_frame, text="Range:").pack(side=tk.LEFT)
+        self.range_var = tk.StringVar(value='Last 30 days')
+        range_box = ttk.Combobox(options_frame, textvariable=self.range_var,
+                                 values=list(RANGES), state='readonly', width=15)
+        range_box.pack(side=tk.LEFT, padx=5)
+        range_box.bind('<<ComboboxSelected>>', lambda e: self.update_charts())
+        
+        ttk.Label(options_frame, text="Group by:").pack(side=tk.LEFT, padx=(10, 0))
+        self.granularity_var = tk.StringVar(value='Day')
+        granularity_box = ttk.Combobox(options_frame, textvariable=self.granularity_var,
+                                       values=[g.capitalize() for g in GRANULARITIES],
+                                       state='readonly', width=10)
+        granularity_box.pack(side=tk.LEFT, padx=5)
+        granularity_box.bind('<<ComboboxSelected>>', lambda e: self.update_charts())
+        
         # Create figure for charts
         self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(12, 4))
         self.canvas = FigureCanvasTkAgg(self.fig, master=charts_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Titles and axes are set once; refreshes only update the plotted data
+        self.ax1.set_title('💰 Income vs Expense')
+        self.ax1.set_xlabel('Period')
+        self.ax1.set_ylabel('Amount ($)')
+        self.ax1.tick_params(axis='x', rotation=45)
+        self.ax2.set_title('💸 Expense Distribution')
+        self.charts = ChartRenderer(self.fig, self.canvas)
     
     def load_transactions(self):
         """Load transactions from database"""
         try:
-            # Clear existing items
-            for item in self.transaction_tree.get_children():
-                self.transaction_tree.delete(item)
-            
-            # Get transactions from database
-            self.cursor.execute("""
-                SELECT id, date, type, category, amount
-                FROM financial_transactions
-                ORDER BY date DESC
-            """)
-            
-            # Add transactions to treeview
-            for transaction in self.cursor.fetchall():
-                self.transaction_tree.insert("", tk.END, values=transaction)
+            # Load the first page in the background; later pages are fetched on scroll
+            self.transaction_list.reload(lambda e: messagebox.showerror(
+                                         "Error", f"Failed to load transactions: {str(e)}"))
             
             # Update summary and charts
             self.update_summary()
@@ -231,33 +273,27 @@ class Financial:
         transaction_id = self.transaction_tree.item(selection[0])['values'][0]
         
         # Get transaction details from database
-        self.cursor.execute("""
-            SELECT id, date, type, category, amount, description
-            FROM financial_transactions
-            WHERE id = ?
-        """, (transaction_id,))
-        
-        transaction = self.cursor.fetchone()
+        transaction = self.db.transactions.get(transaction_id)
         if transaction:
             # Update form fields
             self.id_entry.configure(state='normal')
             self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(transaction[0]))
+            self.id_entry.insert(0, str(transaction['id']))
             self.id_entry.configure(state='readonly')
             
             self.date_entry.delete(0, tk.END)
-            self.date_entry.insert(0, transaction[1])
+            self.date_entry.insert(0, transaction['date'])
             
-            self.type_var.set(transaction[2])
+            self.type_var.set(transaction['type'])
             
             self.category_entry.delete(0, tk.END)
-            self.category_entry.insert(0, transaction[3])
+            self.category_entry.insert(0, transaction['category'])
             
             self.amount_entry.delete(0, tk.END)
-            self.amount_entry.insert(0, str(transaction[4]))
+            self.amount_entry.insert(0, str(transaction['amount']))
             
             self.desc_text.delete('1.0', tk.END)
-            self.desc_text.insert('1.0', transaction[5] or '')
+            self.desc_text.insert('1.0', transaction['description'] or '')
     
     def show_new_transaction(self):
         """Show add transaction form"""
@@ -267,7 +303,7 @@ class Financial:
         self.id_entry.configure(state='readonly')
         
         self.date_entry.delete(0, tk.END)
-        self.date_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
+        self.date_entry.insert(0, datetime.now().strftime(DATE_FORMAT))
         
         self.type_var.set("Income")
         self.category_entry.delete(0, tk.END)
@@ -297,26 +333,31 @@ class Financial:
                 messagebox.showerror("Error", "Please fill in all required fields")
                 return
             
+            try:
+                date = normalize(date, DATE_FORMAT)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid date: {str(e)}")
+                return
+            
             try:
                 amount = float(amount)
             except ValueError:
                 messagebox.showerror("Error", "Invalid amount")
                 return
             
-            if transaction_id:  # Update existing transaction
-                self.cursor.execute("""
-                    UPDATE financial_transactions
-                    SET date = ?, type = ?, category = ?, amount = ?, description = ?
-                    WHERE id = ?
-                """, (date, type_, category, amount, description, transaction_id))
-            else:  # Add new transaction
-                self.cursor.execute("""
-                    INSERT INTO financial_transactions (date, type, category, amount, description)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (date, type_, category, amount, description))
+            record = {'date': date, 'type': type_, 'category': category,
+                      'amount': amount, 'description': description}
             
-            self.conn.commit()
-            self.load_transactions()
+            with self.db.transaction():
+                if transaction_id:  # Update existing transaction
+                    self.db.transactions.update(transaction_id, record)
+                else:  # Add new transaction
+                    transaction_id = self.db.transactions.insert(record)
+            
+            # Redraw only the saved row instead of reloading the list
+            self.transaction_list.refresh_row(transaction_id, select=True)
+            self.update_summary()
+            self.update_charts()
             messagebox.showinfo("Success", "Transaction saved successfully")
             
         except Exception as e:
@@ -333,33 +374,37 @@ class Financial:
             try:
                 transaction_id = self.transaction_tree.item(selection[0])['values'][0]
                 
-                self.cursor.execute("DELETE FROM financial_transactions WHERE id = ?", (transaction_id,))
-                self.conn.commit()
+                with self.db.transaction():
+                    self.db.transactions.delete(transaction_id)
                 
-                self.load_transactions()
+                self.transaction_list.remove_row(transaction_id)
+                self.update_summary()
+                self.update_charts()
                 messagebox.showinfo("Success", "Transaction deleted successfully")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete transaction: {str(e)}")
     
+    def import_transactions(self):
+        """Bulk import transactions from a CSV file"""
+        import_csv(self.frame, self.db, 'financial_transactions', self.refresh)
+    
+    def export_transactions(self):
+        """Export transactions to a CSV or JSONL file"""
+        export_table(self.frame, self.db, 'financial_transactions')
+    
     def update_summary(self):
         """Update financial summary"""
+        # Query in the background and fill in the labels when the totals arrive
+        self.db.run(lambda db: db.transactions.totals_by_type(),
+                    self.show_summary, key=(self, 'summary'),
+                    error=lambda e: report_error("Error updating summary", e))
+    
+    def show_summary(self, totals):
+        """Display financial summary"""
         try:
-            # Get total income
-            self.cursor.execute("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM financial_transactions
-                WHERE type = 'Income'
-            """)
-            total_income = self.cursor.fetchone()[0]
-            
-            # Get total expense
-            self.cursor.execute("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM financial_transactions
-                WHERE type = 'Expense'
-            """)
-            total_expense = self.cursor.fetchone()[0]
+            total_income = totals.get('Income', 0)
+            total_expense = totals.get('Expense', 0)
             
             # Calculate net profit
             net_profit = total_income - total_expense
@@ -370,97 +415,58 @@ class Financial:
             self.net_profit_label.config(text=f"${net_profit:,.2f}")
             
         except Exception as e:
-            print(f"Error updating summary: {str(e)}")
+            report_error("Error updating summary", e)
     
     def update_charts(self):
         """Update financial charts"""
+        # Query in the background and draw when the data arrives
+        start, end = date_range(self.range_var.get())
+        granularity = self.granularity_var.get().lower()
+        self.db.run(lambda db: (db.timeseries.cash_flow(granularity, start, end),
+                                db.analytics.expenses_by_category(db, start, end)),
+                    self.draw_charts, key=(self, 'charts'),
+                    error=lambda e: report_error("Error updating charts", e))
+    
+    def draw_charts(self, data):
+        """Draw financial charts"""
         try:
-            # Clear previous plots
-            self.ax1.clear()
-            self.ax2.clear()
+            (periods, income, expense), categories = data
             
-            # Get transaction data for charts
-            self.cursor.execute("""
-                SELECT date, type, amount
-                FROM financial_transactions
-                ORDER BY date
-                LIMIT 7
-            """)
-            
-            transactions = self.cursor.fetchall()
-            if transactions:
-                dates = [t[0] for t in transactions]
-                income = [t[2] if t[1] == 'Income' else 0 for t in transactions]
-                expense = [t[2] if t[1] == 'Expense' else 0 for t in transactions]
-                
-                # Plot income vs expense
-                self.ax1.bar(dates, income, color=self.colors['success'],
-                           label='Income', alpha=0.6)
-                self.ax1.bar(dates, [-e for e in expense], color=self.colors['error'],
-                           label='Expense', alpha=0.6)
-                self.ax1.set_title('💰 Income vs Expense')
-                self.ax1.set_xlabel('Date')
-                self.ax1.set_ylabel('Amount ($)')
+            # Plot income vs expense per period
+            self.charts.bars(self.ax1, 'income', periods, income, color=self.colors['success'],
+                             label='Income', alpha=0.6)
+            self.charts.bars(self.ax1, 'expense', periods, [-e for e in expense],
+                             color=self.colors['error'], label='Expense', alpha=0.6)
+            if periods and self.ax1.get_legend() is None:
                 self.ax1.legend()
-                self.ax1.tick_params(axis='x', rotation=45)
-                
-                # Get category distribution
-                self.cursor.execute("""
-                    SELECT category, SUM(amount)
-                    FROM financial_transactions
-                    WHERE type = 'Expense'
-                    GROUP BY category
-                """)
-                
-                categories = self.cursor.fetchall()
-                if categories:
-                    cat_names = [c[0] for c in categories]
-                    cat_amounts = [c[1] for c in categories]
-                    
-                    # Plot expense distribution
-                    self.ax2.pie(cat_amounts, labels=cat_names, autopct='%1.1f%%',
-                               colors=[self.colors['primary'], self.colors['accent'],
-                                     self.colors['success']])
-                    self.ax2.set_title('💸 Expense Distribution')
             
-            # Adjust layout and display
-            self.fig.tight_layout()
-            self.canvas.draw()
+            # Plot expense distribution over the range
+            self.charts.pie(self.ax2, 'categories', [category for category, _, _ in categories],
+                            [total for _, total, _ in categories],
+                            colors=[self.colors['primary'], self.colors['accent'],
+                                    self.colors['success']])
+            
+            # Redraw only if the data changed
+            self.charts.show()
             
         except Exception as e:
-            print(f"Error updating charts: {str(e)}")
+            report_error("Error updating charts", e)
+    
+    def show_record(self, transaction_id):
+        """Open a ledger entry from a search hit among the transactions dated near it"""
+        self.search_entry.delete(0, tk.END)
+        self.match_label.config(text="")
+        self.transaction_list.jump_to(transaction_id, lambda e: messagebox.showerror(
+            "Error", f"Failed to load transactions: {str(e)}"))
     
     def search_transactions(self):
-        """Search transactions and highlight matches"""
-        search_term = self.search_entry.get().lower()
-        
-        # Clear existing items
-        for item in self.transaction_tree.get_children():
-            self.transaction_tree.delete(item)
+        """Search transactions and show only the matches"""
+        search_term = self.search_entry.get()
         
         try:
-            # Get all transactions
-            self.cursor.execute("""
-                SELECT id, date, type, category, amount
-                FROM financial_transactions
-                ORDER BY date DESC
-            """)
-            
-            # Add transactions to treeview with highlighting
-            for transaction in self.cursor.fetchall():
-                # Convert all values to strings for case-insensitive search
-                values = [str(val) for val in transaction]
-                
-                # Check if any field contains the search term
-                if search_term in ' '.join(values).lower():
-                    # Insert with tag for highlighting
-                    item = self.transaction_tree.insert("", tk.END, values=values, tags=('highlight',))
-                else:
-                    # Insert without highlighting
-                    self.transaction_tree.insert("", tk.END, values=values)
-            
-            # Configure tag for highlighting
-            self.transaction_tree.tag_configure('highlight', background='#FFE5B4')  # Light orange background
+            # Filter the list in SQL and page in the matches, showing the match count
+            self.transaction_list.search(search_term, self.match_label, lambda e: messagebox.showerror(
+                                         "Error", f"Failed to search transactions: {str(e)}"))
             
             # Update summary and charts
             self.update_summary()
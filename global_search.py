@@ -0,0 +1,140 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from querystats import report_error
+from search import build_match
+
+# Module to open and type label for hits from each table
+RESULT_TYPES = {
+    'products': ('inventory', "📦 Product"),
+    'customers': ('customers', "👥 Customer"),
+    'suppliers': ('suppliers', "🏭 Supplier"),
+    'employees': ('employees', "👨‍💼 Employee"),
+    'sales': ('sales', "💰 Sale"),
+    'financial_transactions': ('financial', "💵 Transaction"),
+}
+
+class SearchWindow:
+    """Search every module at once through the full-text index
+
+    Results update as the user types. Opening a hit calls
+    open_record(module_name, record_id).
+    """
+
+    def __init__(self, parent, db, open_record, delay=150):
+        self.db = db
+        self.open_record = open_record
+        self.delay = delay
+        self.after_id = None
+        self.hits = {}
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Search")
+        self.window.geometry("750x450")
+
+        container = ttk.Frame(self.window, padding=10)
+        container.pack(fill=tk.BOTH, expand=True)
+
+        # Search box
+        search_frame = ttk.Frame(container)
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(search_frame, text="🔍 Search everything:").pack(side=tk.LEFT)
+        self.search_entry = ttk.Entry(search_frame)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.search_entry.bind('<KeyRelease>', self.on_key)
+        self.search_entry.bind('<Down>', lambda e: self.focus_results())
+        self.search_entry.bind('<Return>', lambda e: self.open_selected())
+
+        self.status_label = ttk.Label(search_frame, text="")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+
+        # Results, best match first
+        self.result_tree = ttk.Treeview(container, columns=("Type", "Name", "Match"),
+                                        show="headings")
+        self.result_tree.heading("Type", text="Type")
+        self.result_tree.heading("Name", text="Name")
+        self.result_tree.heading("Match", text="Match")
+        self.result_tree.column("Type", width=120)
+        self.result_tree.column("Name", width=180)
+        self.result_tree.column("Match", width=420)
+
+        scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL, command=self.result_tree.yview)
+        self.result_tree.configure(yscrollcommand=scrollbar.set)
+        self.result_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.result_tree.bind('<Double-1>', lambda e: self.open_selected())
+        self.result_tree.bind('<Return>', lambda e: self.open_selected())
+
+    def search(self, term):
+        """Show the window with results for a term"""
+        self.search_entry.delete(0, tk.END)
+        self.search_entry.insert(0, term)
+        self.window.deiconify()
+        self.window.lift()
+        self.search_entry.focus_set()
+        self.run_search()
+
+    def on_key(self, event):
+        """Search again shortly after the user stops typing"""
+        if event.keysym in ('Return', 'Down', 'Up'):
+            return
+        if self.after_id is not None:
+            self.window.after_cancel(self.after_id)
+        self.after_id = self.window.after(self.delay, self.run_search)
+
+    def run_search(self):
+        """Query the index in the background"""
+        self.after_id = None
+        match = build_match(self.search_entry.get())
+        if not match:
+            self.db.cancel((self, 'search'))
+            self.show_results([], 0)
+            return
+
+        started = time.perf_counter()
+        self.db.run(lambda db: db.search_index.search(match),
+                    lambda hits: self.show_results(hits, time.perf_counter() - started),
+                    key=(self, 'search'),
+                    error=lambda e: report_error("Error searching", e))
+
+    def show_results(self, hits, seconds):
+        """Replace the result list"""
+        if not self.window.winfo_exists():
+            return
+
+        self.result_tree.delete(*self.result_tree.get_children())
+        self.hits = {}
+        for hit in hits:
+            module_name, label = RESULT_TYPES[hit['table']]
+            item = self.result_tree.insert("", "end", values=(
+                label, hit['title'], " ".join(hit['snippet'].split())))
+            self.hits[item] = (module_name, hit['id'])
+
+        if hits:
+            first = self.result_tree.get_children()[0]
+            self.result_tree.selection_set(first)
+            self.result_tree.focus(first)
+            self.status_label.config(text=f"{len(hits)} results in {seconds * 1000:.0f} ms")
+        else:
+            self.status_label.config(text="No results" if self.search_entry.get().strip() else "")
+
+    def focus_results(self):
+        """Move the keyboard focus from the search box to the results"""
+        if self.result_tree.get_children():
+            self.result_tree.focus_set()
+
+    def open_selected(self):
+        """Open the module showing the selected hit"""
+        selection = self.result_tree.selection()
+        if not selection:
+            return
+
+        module_name, record_id = self.hits[selection[0]]
+        self.open_record(module_name, record_id)
+
+    def close(self):
+        """Close the window"""
+        if self.window.winfo_exists():
+            self.window.destroy()
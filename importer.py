@@ -0,0 +1,274 @@
+import csv
+import os
+import sqlite3
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+from dates import DATE_FORMAT, TIMESTAMP_FORMAT, normalize
+
+# Value converters; each raises ValueError for a bad value
+def text(value):
+    """Plain text, trimmed"""
+    return value.strip()
+
+def integer(value):
+    """Whole number"""
+    return int(value)
+
+def real(value):
+    """Decimal number"""
+    return float(value)
+
+def non_negative(convert):
+    """Wrap a converter so negative numbers are rejected"""
+    def check(value):
+        number = convert(value)
+        if number < 0:
+            raise ValueError("must not be negative")
+        return number
+    return check
+
+def date_in(fmt):
+    """Accept ISO dates with or without a time, stored in the column's format"""
+    def check(value):
+        return normalize(value, fmt)
+    return check
+
+def choice(*options):
+    """Accept only one of the given values"""
+    def check(value):
+        value = value.strip()
+        if value not in options:
+            raise ValueError(f"expected one of {', '.join(options)}")
+        return value
+    return check
+
+# Marks a column that must have a value in every row
+REQUIRED = object()
+
+# Importable columns per table: (column, converter, default or REQUIRED)
+IMPORT_SPECS = {
+    'products': (
+        ('name', text, REQUIRED),
+        ('category', text, None),
+        ('stock', non_negative(integer), 0),
+        ('price', non_negative(real), REQUIRED),
+        ('description', text, None),
+    ),
+    'customers': (
+        ('name', text, REQUIRED),
+        ('email', text, REQUIRED),
+        ('phone', text, None),
+        ('address', text, None),
+        ('notes', text, None),
+    ),
+    'sales': (
+        ('date', date_in(TIMESTAMP_FORMAT), REQUIRED),
+        ('customer_id', integer, None),
+        ('customer_name', text, REQUIRED),
+        ('items', text, None),
+        ('items_count', non_negative(integer), 0),
+        ('total_amount', non_negative(real), REQUIRED),
+    ),
+    'financial_transactions': (
+        ('date', date_in(DATE_FORMAT), REQUIRED),
+        ('type', choice('Income', 'Expense'), REQUIRED),
+        ('category', text, REQUIRED),
+        ('amount', non_negative(real), REQUIRED),
+        ('description', text, None),
+    ),
+}
+
+class CsvImporter:
+    """Stream a CSV file into one table in chunked transactions
+
+    Rows are validated one at a time and written with executemany, one
+    transaction per chunk, so memory use does not grow with the file. Rows
+    that fail validation or a constraint are written to an error report
+    instead of stopping the import.
+    """
+
+    def __init__(self, db, table, chunk_size=5000, progress=None):
+        if table not in IMPORT_SPECS:
+            raise ValueError(f"Import is not supported for {table}")
+
+        self.db = db
+        self.table = table
+        self.spec = IMPORT_SPECS[table]
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+        # Running counts
+        self.read = 0
+        self.imported = 0
+        self.failed = 0
+        self.header = []
+
+        # Error report, opened on the first bad row
+        self.error_file = None
+        self.error_writer = None
+        self.error_path = None
+
+    def check_header(self, header):
+        """Return the spec entries present in the header, or raise ValueError"""
+        header = header or ()
+        missing = [column for column, _, default in self.spec
+                   if default is REQUIRED and column not in header]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+        return [entry for entry in self.spec if entry[0] in header]
+
+    def parse_row(self, row, fields):
+        """Convert one CSV record into an insert tuple, or raise ValueError"""
+        values = []
+        for column, convert, default in fields:
+            raw = (row.get(column) or '').strip()
+            if not raw:
+                if default is REQUIRED:
+                    raise ValueError(f"{column}: value is required")
+                values.append(default)
+                continue
+
+            try:
+                values.append(convert(raw))
+            except ValueError as e:
+                raise ValueError(f"{column}: {str(e)}")
+        return tuple(values)
+
+    def report_error(self, line, row, message):
+        """Write a rejected row to the error report"""
+        self.failed += 1
+
+        if self.error_writer is None:
+            self.error_file = open(self.error_path, 'w', newline='', encoding='utf-8')
+            self.error_writer = csv.writer(self.error_file)
+            self.error_writer.writerow(['line', 'error'] + self.header)
+
+        self.error_writer.writerow([line, message] + [row.get(name, '') for name in self.header])
+
+    def write_chunk(self, repo, columns, chunk):
+        """Insert a chunk in one transaction, falling back to row by row on a constraint error"""
+        try:
+            with self.db.transaction():
+                repo.insert_many(columns, [values for _, _, values in chunk], len(chunk))
+            self.imported += len(chunk)
+            return
+        except sqlite3.IntegrityError:
+            pass
+
+        # Find the offending rows; a failed INSERT only undoes its own row
+        sql = repo.statement('insert', columns)
+        with self.db.transaction():
+            for line, row, values in chunk:
+                try:
+                    self.db.execute(sql, values)
+                    self.imported += 1
+                except sqlite3.IntegrityError as e:
+                    self.report_error(line, row, str(e))
+        self.db.touch(repo.table, *repo.related_tables)
+
+    def run(self, path, error_path=None):
+        """Import a CSV file and return a summary dict"""
+        base, _ = os.path.splitext(path)
+        self.error_path = error_path or f"{base}_errors.csv"
+        repo = self.db.repositories[self.table]
+
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames:
+                    reader.fieldnames = [name.strip() for name in reader.fieldnames]
+                fields = self.check_header(reader.fieldnames)
+                self.header = list(reader.fieldnames)
+                columns = [column for column, _, _ in fields]
+                chunk = []
+
+                for row in reader:
+                    self.read += 1
+                    line = reader.line_num
+
+                    try:
+                        chunk.append((line, row, self.parse_row(row, fields)))
+                    except ValueError as e:
+                        self.report_error(line, row, str(e))
+
+                    if len(chunk) >= self.chunk_size:
+                        self.write_chunk(repo, columns, chunk)
+                        chunk = []
+                        self.report_progress()
+
+                if chunk:
+                    self.write_chunk(repo, columns, chunk)
+                self.report_progress()
+        finally:
+            if self.error_file is not None:
+                self.error_file.close()
+
+        return {
+            'read': self.read,
+            'imported': self.imported,
+            'failed': self.failed,
+            'error_path': self.error_path if self.failed else None,
+        }
+
+    def report_progress(self):
+        """Pass the running counts to the progress callback"""
+        if self.progress:
+            self.progress(self.read, self.imported, self.failed)
+
+def import_csv(parent, db, table, done=None):
+    """Ask for a CSV file and import it in the background with a progress window
+
+    done() is called on the Tk thread once rows were imported.
+    """
+    path = filedialog.askopenfilename(parent=parent, title="Import CSV",
+                                      filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if not path:
+        return
+
+    # Small progress window
+    window = tk.Toplevel(parent)
+    window.title("Importing")
+    window.resizable(False, False)
+    window.transient(parent)
+
+    ttk.Label(window, text=f"📥 Importing {os.path.basename(path)}",
+              font=('Helvetica', 12, 'bold')).pack(padx=20, pady=(20, 10))
+    status_label = ttk.Label(window, text="Starting...")
+    status_label.pack(padx=20, pady=(0, 20))
+
+    # Updated from the worker thread, read by the Tk thread
+    counts = [0, 0, 0]
+
+    def progress(read, imported, failed):
+        counts[:] = [read, imported, failed]
+
+    def show_progress():
+        if not window.winfo_exists():
+            return
+        read, imported, failed = counts
+        status_label.config(text=f"{read:,} rows read, {imported:,} imported, {failed:,} rejected")
+        window.after(200, show_progress)
+
+    def finished(summary):
+        window.destroy()
+
+        message = f"Imported {summary['imported']:,} of {summary['read']:,} rows."
+        if summary['failed']:
+            message += f"\n{summary['failed']:,} rows were rejected; see {summary['error_path']}"
+            messagebox.showwarning("Import", message)
+        else:
+            messagebox.showinfo("Import", message)
+
+        if done and summary['imported']:
+            done()
+
+    def failed(e):
+        window.destroy()
+        messagebox.showerror("Error", f"Failed to import: {str(e)}")
+        if done:
+            done()
+
+    show_progress()
+    db.run(lambda db: CsvImporter(db, table, progress=progress).run(path), finished, error=failed)
@@ -2,11 +2,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
+from exporter import export_table
+from importer import import_csv
+from paged_list import PagedList
+from specs import LIST_SPECS
+
 class Inventory:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('products', 'sale_items')
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -47,6 +54,10 @@ class Inventory:
         # Load initial data
         self.load_products()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_products()
+    
     def init_product_list(self, parent):
         """Initialize product list view"""
         # Search frame
@@ -61,6 +72,10 @@ class Inventory:
         ttk.Button(search_frame, text="Search",
                   command=self.search_products).pack(side=tk.LEFT, padx=5)
         
+        # Match count
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=5)
+        
         # Product list
         self.product_tree = ttk.Treeview(parent, columns=("ID", "Name", "Category", "Stock", "Price"),
                                        show="headings")
@@ -81,7 +96,10 @@ class Inventory:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.product_tree.yview)
-        self.product_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Page rows in as the user scrolls instead of loading the whole table
+        self.product_list = PagedList(self.product_tree, scrollbar, self.db, "products",
+                                      **LIST_SPECS["products"])
         
         # Pack widgets
         self.product_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -101,6 +119,10 @@ class Inventory:
                   command=self.show_edit_product).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🗑️ Delete Product",
                   command=self.delete_product).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📥 Import CSV",
+                  command=self.import_products).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📤 Export",
+                  command=self.export_products).pack(side=tk.LEFT, padx=5)
         
         # Bind Enter key to search
         self.search_entry.bind('<Return>', lambda e: self.search_products())
@@ -146,6 +168,13 @@ class Inventory:
         self.price_entry = ttk.Entry(price_frame)
         self.price_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
+        # Units sold, from the sale lines
+        sold_frame = ttk.Frame(details_frame)
+        sold_frame.pack(fill=tk.X, pady=5)
+        ttk.Label(sold_frame, text="Sold:").pack(side=tk.LEFT)
+        self.sold_label = ttk.Label(sold_frame, text="")
+        self.sold_label.pack(side=tk.LEFT, padx=5)
+        
         # Description
         desc_frame = ttk.Frame(details_frame)
         desc_frame.pack(fill=tk.X, pady=5)
@@ -160,20 +189,9 @@ class Inventory:
     def load_products(self):
         """Load products from database"""
         try:
-            # Clear existing items
-            for item in self.product_tree.get_children():
-                self.product_tree.delete(item)
-            
-            # Get products from database
-            self.cursor.execute("""
-                SELECT id, name, category, stock, price
-                FROM products
-                ORDER BY name
-            """)
-            
-            # Add products to treeview
-            for product in self.cursor.fetchall():
-                self.product_tree.insert("", tk.END, values=product)
+            # Load the first page in the background; later pages are fetched on scroll
+            self.product_list.reload(lambda e: messagebox.showerror(
+                                     "Error", f"Failed to load products: {str(e)}"))
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load products: {str(e)}")
@@ -188,34 +206,31 @@ class Inventory:
         product_id = self.product_tree.item(selection[0])['values'][0]
         
         # Get product details from database
-        self.cursor.execute("""
-            SELECT id, name, category, stock, price, description
-            FROM products
-            WHERE id = ?
-        """, (product_id,))
-        
-        product = self.cursor.fetchone()
+        product = self.db.products.get(product_id)
         if product:
             # Update form fields
             self.id_entry.configure(state='normal')
             self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(product[0]))
+            self.id_entry.insert(0, str(product['id']))
             self.id_entry.configure(state='readonly')
             
             self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, product[1])
+            self.name_entry.insert(0, product['name'])
             
             self.category_entry.delete(0, tk.END)
-            self.category_entry.insert(0, product[2])
+            self.category_entry.insert(0, product['category'])
             
             self.stock_entry.delete(0, tk.END)
-            self.stock_entry.insert(0, str(product[3]))
+            self.stock_entry.insert(0, str(product['stock']))
             
             self.price_entry.delete(0, tk.END)
-            self.price_entry.insert(0, str(product[4]))
+            self.price_entry.insert(0, str(product['price']))
             
             self.desc_text.delete('1.0', tk.END)
-            self.desc_text.insert('1.0', product[5] or '')
+            self.desc_text.insert('1.0', product['description'] or '')
+            
+            sold = self.db.sale_items.totals_for_product(product_id)
+            self.sold_label.config(text=f"{sold['units']:,} units (${sold['revenue']:,.2f})")
     
     def show_add_product(self):
         """Show add product form"""
@@ -229,6 +244,7 @@ class Inventory:
         self.stock_entry.delete(0, tk.END)
         self.price_entry.delete(0, tk.END)
         self.desc_text.delete('1.0', tk.END)
+        self.sold_label.config(text="")
     
     def show_edit_product(self):
         """Show edit product form"""
@@ -260,20 +276,17 @@ class Inventory:
                 messagebox.showerror("Error", "Invalid stock or price value")
                 return
             
-            if product_id:  # Update existing product
-                self.cursor.execute("""
-                    UPDATE products
-                    SET name = ?, category = ?, stock = ?, price = ?, description = ?
-                    WHERE id = ?
-                """, (name, category, stock, price, description, product_id))
-            else:  # Add new product
-                self.cursor.execute("""
-                    INSERT INTO products (name, category, stock, price, description)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (name, category, stock, price, description))
+            record = {'name': name, 'category': category, 'stock': stock,
+                      'price': price, 'description': description}
+            
+            with self.db.transaction():
+                if product_id:  # Update existing product
+                    self.db.products.update(product_id, record)
+                else:  # Add new product
+                    product_id = self.db.products.insert(record)
             
-            self.conn.commit()
-            self.load_products()
+            # Redraw only the saved row instead of reloading the list
+            self.product_list.refresh_row(product_id, select=True)
             messagebox.showinfo("Success", "Product saved successfully")
             
         except Exception as e:
@@ -290,46 +303,38 @@ class Inventory:
             try:
                 product_id = self.product_tree.item(selection[0])['values'][0]
                 
-                self.cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-                self.conn.commit()
+                with self.db.transaction():
+                    self.db.products.delete(product_id)
                 
-                self.load_products()
+                self.product_list.remove_row(product_id)
                 messagebox.showinfo("Success", "Product deleted successfully")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete product: {str(e)}")
     
+    def import_products(self):
+        """Bulk import products from a CSV file"""
+        import_csv(self.frame, self.db, 'products', self.refresh)
+    
+    def export_products(self):
+        """Export products to a CSV or JSONL file"""
+        export_table(self.frame, self.db, 'products')
+    
+    def show_record(self, product_id):
+        """Open a product from a search hit, listed among its neighbours by name"""
+        self.search_entry.delete(0, tk.END)
+        self.match_label.config(text="")
+        self.product_list.jump_to(product_id, lambda e: messagebox.showerror(
+            "Error", f"Failed to load products: {str(e)}"))
+    
     def search_products(self):
-        """Search products and highlight matches"""
-        search_term = self.search_entry.get().lower()
-        
-        # Clear existing items
-        for item in self.product_tree.get_children():
-            self.product_tree.delete(item)
+        """Search products and show only the matches"""
+        search_term = self.search_entry.get()
         
         try:
-            # Get all products
-            self.cursor.execute("""
-                SELECT id, name, category, stock, price
-                FROM products
-                ORDER BY name
-            """)
-            
-            # Add products to treeview with highlighting
-            for product in self.cursor.fetchall():
-                # Convert all values to strings for case-insensitive search
-                values = [str(val) for val in product]
-                
-                # Check if any field contains the search term
-                if search_term in ' '.join(values).lower():
-                    # Insert with tag for highlighting
-                    item = self.product_tree.insert("", tk.END, values=values, tags=('highlight',))
-                else:
-                    # Insert without highlighting
-                    self.product_tree.insert("", tk.END, values=values)
-            
-            # Configure tag for highlighting
-            self.product_tree.tag_configure('highlight', background='#FFE5B4')  # Light orange background
+            # Filter the list in SQL and page in the matches, showing the match count
+            self.product_list.search(search_term, self.match_label, lambda e: messagebox.showerror(
+                                     "Error", f"Failed to search products: {str(e)}"))
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search products: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import groupby
+
+# Every customer with their latest sales, newest first. Each customer reads
+# only the tail of its range in idx_sales_customer(customer_id, date,
+# total_amount): one seek finds the date of its Nth latest sale, a second
+# reads the sales from that date on. Ties on that date can add rows, so
+# callers keep the first N.
+INVOICE_QUERY = """
+    SELECT c.id, c.name, c.email, c.phone, c.lifetime_revenue, r.date, r.total_amount
+    FROM customers c
+    LEFT JOIN sales r
+        ON r.customer_id = c.id
+       AND r.date >= COALESCE((SELECT date FROM sales
+                               WHERE customer_id = c.id
+                               ORDER BY date DESC
+                               LIMIT 1 OFFSET ? - 1), '')
+    ORDER BY c.id, r.date DESC
+"""
+
+def render_invoice(customer, recent_sales, issued):
+    """Build the invoice text for a (id, name, email, phone, lifetime_revenue) customer"""
+    customer_id, name, email, phone, lifetime_revenue = customer
+
+    content = f"""
+INVOICE
+=======
+Date: {issued.strftime('%Y-%m-%d %H:%M:%S')}
+Invoice #: INV-{issued.strftime('%Y%m%d%H%M%S')}-{customer_id}
+
+Customer Details:
+---------------
+Name: {name}
+Email: {email}
+Phone: {phone}
+
+Recent Purchases:
+---------------
+"""
+
+    for sale_date, amount in recent_sales:
+        content += f"{sale_date}: ${amount:.2f}\n"
+
+    content += f"""
+Total Amount: ${lifetime_revenue or 0:.2f}
+
+Thank you for your business!
+===========================
+"""
+    return content
+
+def invoice_filename(customer_id, name):
+    """File name for a customer's invoice, safe on every platform"""
+    safe_name = re.sub(r'[^\w.-]+', '_', name or '').strip('_') or 'customer'
+    return f"invoice_{customer_id}_{safe_name}.txt"
+
+def write_invoice(job):
+    """Render and write one invoice; runs in a pool process
+
+    Returns (customer_id, error message or None) so one bad record does not
+    stop the batch.
+    """
+    directory, customer, recent_sales, issued = job
+    try:
+        path = os.path.join(directory, invoice_filename(customer[0], customer[1]))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_invoice(customer, recent_sales, issued))
+        return customer[0], None
+    except Exception as e:
+        return customer[0], str(e)
+
+class BatchInvoicer:
+    """Write an invoice for every customer into a dated directory
+
+    Customer and sales data come from a single query over the customer
+    index on sales; the rendering and file writes are spread over a process
+    pool.
+    """
+
+    def __init__(self, db, output_root='invoices', recent_count=5, workers=None, chunk_size=64):
+        self.db = db
+        self.output_root = output_root
+        self.recent_count = recent_count
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def jobs(self, directory, issued):
+        """Yield one (directory, customer, recent_sales, issued) job per customer"""
+        cursor = self.db.execute(INVOICE_QUERY, (self.recent_count,))
+        for customer, rows in groupby(cursor, key=lambda row: tuple(row[:5])):
+            recent_sales = [(row[5], row[6]) for row in rows if row[5] is not None]
+            recent_sales = recent_sales[:self.recent_count]
+            yield directory, customer, recent_sales, issued
+
+    def run(self):
+        """Write every invoice and return a summary dict"""
+        started = time.perf_counter()
+        issued = datetime.now()
+
+        directory = os.path.join(self.output_root, issued.strftime('%Y-%m-%d'))
+        os.makedirs(directory, exist_ok=True)
+
+        written = 0
+        failures = []
+
+        # Spawned workers do not inherit the Tk process's threads or connections
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            for customer_id, error in pool.map(write_invoice, self.jobs(directory, issued),
+                                               chunksize=self.chunk_size):
+                if error is None:
+                    written += 1
+                else:
+                    failures.append((customer_id, error))
+
+        # Keep a record of what failed next to the invoices
+        if failures:
+            with open(os.path.join(directory, 'failures.txt'), 'w', encoding='utf-8') as f:
+                for customer_id, error in failures:
+                    f.write(f"{customer_id}: {error}\n")
+
+        seconds = time.perf_counter() - started
+        summary = {
+            'directory': directory,
+            'written': written,
+            'failures': failures,
+            'seconds': seconds,
+            'per_second': written / seconds if seconds else 0,
+        }
+        return summary
@@ -1,34 +1,47 @@
+# Taken before any other import so startup timing includes module loading
+import time
+START_TIME = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox
 import sv_ttk  # Modern theme for tkinter
-from PIL import Image, ImageTk
 import os
-import sqlite3
-from datetime import datetime
 import hashlib
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
-import random
+import importlib
+from collections import OrderedDict
+
+from connections import ConnectionPool
+from migrations import migrate
+from executor import QueryExecutor
+from global_search import SearchWindow
+from startup import StartupTimer
 
-from dashboard import Dashboard
-from inventory import Inventory
-from sales import Sales
-from customers import Customers
-from employees import Employees
-from suppliers import Suppliers
-from financial import Financial
+# Module classes by name; each file (and matplotlib with it) is imported on first use
+MODULES = {
+    'dashboard': ('dashboard', 'Dashboard'),
+    'inventory': ('inventory', 'Inventory'),
+    'sales': ('sales', 'Sales'),
+    'customers': ('customers', 'Customers'),
+    'employees': ('employees', 'Employees'),
+    'suppliers': ('suppliers', 'Suppliers'),
+    'financial': ('financial', 'Financial'),
+    'diagnostics': ('diagnostics', 'Diagnostics'),
+}
+
+def load_module_class(name):
+    """Import a module file on demand and return its class"""
+    module_name, class_name = MODULES[name]
+    return getattr(importlib.import_module(module_name), class_name)
 
 class RegistrationWindow:
-    def __init__(self, parent, db_connection):
+    def __init__(self, parent, db):
         self.window = tk.Toplevel(parent)
         self.window.title("User Registration")
         self.window.geometry("500x600")
         self.window.resizable(False, False)
         
-        # Store database connection
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        # Store data-access layer
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -153,14 +166,12 @@ class RegistrationWindow:
         
         try:
             # Check if username exists
-            self.cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-            if self.cursor.fetchone():
+            if self.db.users.find_by_username(username):
                 messagebox.showerror("Error", "Username already exists")
                 return
             
             # Check if email exists
-            self.cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-            if self.cursor.fetchone():
+            if self.db.users.find_by_email(email):
                 messagebox.showerror("Error", "Email already exists")
                 return
             
@@ -168,12 +179,9 @@ class RegistrationWindow:
             hashed = hashlib.sha256(password.encode()).hexdigest()
             
             # Insert new user
-            self.cursor.execute("""
-                INSERT INTO users (username, password, email, role)
-                VALUES (?, ?, ?, ?)
-            """, (username, hashed, email, 'user'))
-            
-            self.conn.commit()
+            with self.db.transaction():
+                self.db.users.insert({'username': username, 'password': hashed,
+                                      'email': email, 'role': 'user'})
             
             # Generate welcome message
             self.generate_welcome_message(username, email)
@@ -203,6 +211,10 @@ class RegistrationWindow:
 
 class BusinessManagementSystem:
     def __init__(self):
+        # Measure time to the first login frame
+        self.startup = StartupTimer(START_TIME)
+        self.startup.mark('imports')
+        
         self.root = tk.Tk()
         self.root.title("Business Management System")
         self.root.geometry("1200x800")
@@ -223,9 +235,11 @@ class BusinessManagementSystem:
         
         # Set window background
         self.root.configure(bg=self.colors['background'])
+        self.startup.mark('window')
         
         # Initialize database
         self.init_database()
+        self.startup.mark('database')
         
         # Create main container
         self.main_container = ttk.Frame(self.root)
@@ -243,100 +257,39 @@ class BusinessManagementSystem:
         
         # Initialize UI components
         self.init_login_ui()
+        self.startup.mark('login_ui')
+        
+        # Runs once the main loop is idle, i.e. after the login frame is drawn
+        self.root.after_idle(self.finish_startup)
         
         # Initialize module instances
         self.current_module = None
         
+        # Keep recently used modules alive instead of rebuilding them
+        self.module_cache = OrderedDict()
+        self.module_snapshots = {}
+        self.max_cached_modules = 4
+        
+        # Cross-module search results, opened from the menu bar
+        self.search_window = None
+        
+    def finish_startup(self):
+        """Record the time to the first drawn login frame"""
+        self.root.update_idletasks()
+        self.startup.mark('first_frame')
+        self.startup.report()
+        
     def init_database(self):
-        """Initialize SQLite database and create necessary tables"""
-        self.conn = sqlite3.connect('bms.db')
-        self.cursor = self.conn.cursor()
-        
-        # Create tables
-        self.cursor.executescript('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                role TEXT NOT NULL
-            );
-            
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT,
-                stock INTEGER DEFAULT 0,
-                price REAL NOT NULL,
-                description TEXT
-            );
-            
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                customer_name TEXT NOT NULL,
-                items TEXT,
-                items_count INTEGER DEFAULT 0,
-                total_amount REAL NOT NULL
-            );
-            
-            CREATE TABLE IF NOT EXISTS customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                address TEXT,
-                notes TEXT,
-                total_purchases INTEGER DEFAULT 0
-            );
-            
-            CREATE TABLE IF NOT EXISTS employees (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                position TEXT,
-                department TEXT,
-                status TEXT DEFAULT 'Active',
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                address TEXT,
-                hire_date TEXT,
-                salary REAL,
-                notes TEXT
-            );
-            
-            CREATE TABLE IF NOT EXISTS suppliers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                contact_person TEXT,
-                email TEXT UNIQUE NOT NULL,
-                phone TEXT,
-                status TEXT DEFAULT 'Active',
-                address TEXT,
-                payment_terms TEXT,
-                notes TEXT
-            );
-            
-            CREATE TABLE IF NOT EXISTS financial_transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                type TEXT NOT NULL,
-                category TEXT NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT
-            );
-        ''')
-        
-        # Create default admin user if not exists
-        self.cursor.execute("SELECT * FROM users WHERE username = 'admin'")
-        if not self.cursor.fetchone():
-            # Simple password hashing using SHA-256
-            hashed = hashlib.sha256('admin123'.encode()).hexdigest()
-            self.cursor.execute("""
-                INSERT INTO users (username, password, email, role)
-                VALUES (?, ?, ?, ?)
-            """, ('admin', hashed, 'admin@example.com', 'admin'))
-        
-        self.conn.commit()
+        """Open the SQLite database and bring its schema up to date"""
+        # WAL plus a pool, so several terminals can share one database file
+        self.pool = ConnectionPool('bms.db')
+        self.db = self.pool.writer
+        
+        # Schema and indexes are versioned; nothing runs when already current
+        migrate(self.db)
+        
+        # Run module queries on a worker thread so the window never freezes
+        self.db.executor = QueryExecutor(self.root, self.pool)
     
     def init_login_ui(self):
         """Initialize login interface"""
@@ -409,7 +362,7 @@ class BusinessManagementSystem:
     
     def show_registration(self):
         """Show registration window"""
-        RegistrationWindow(self.root, self.conn)
+        RegistrationWindow(self.root, self.db)
     
     def load_saved_credentials(self):
         """Load saved credentials if they exist"""
@@ -443,20 +396,19 @@ class BusinessManagementSystem:
             return
         
         try:
-            self.cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-            user = self.cursor.fetchone()
+            user = self.db.users.find_by_username(username)
             
             # Hash password using SHA-256 for comparison
             hashed = hashlib.sha256(password.encode()).hexdigest()
             
-            if user and hashed == user[2]:
+            if user and hashed == user['password']:
                 # Save credentials if remember me is checked
                 self.save_credentials()
                 
                 self.current_user = {
-                    'id': user[0],
-                    'username': user[1],
-                    'role': user[4]
+                    'id': user['id'],
+                    'username': user['username'],
+                    'role': user['role']
                 }
                 self.show_main_menu()
             else:
@@ -483,9 +435,38 @@ class BusinessManagementSystem:
             ("🚪 Logout", self.logout)
         ]
         
+        # Query timings are for administrators only
+        if self.current_user['role'] == 'admin':
+            menu_buttons.insert(-1, ("🩺 Diagnostics", self.show_diagnostics))
+        
+        # Rebuild the buttons, since they depend on who logged in
+        for child in self.menu_frame.winfo_children():
+            child.destroy()
+        
         for text, command in menu_buttons:
             ttk.Button(self.menu_frame, text=text,
                       command=command).pack(side=tk.LEFT, padx=5)
+        
+        # Search box for every module at once
+        self.search_entry = ttk.Entry(self.menu_frame, width=30)
+        self.search_entry.pack(side=tk.RIGHT, padx=5)
+        self.search_entry.bind('<Return>', lambda e: self.global_search())
+        ttk.Label(self.menu_frame, text="🔍").pack(side=tk.RIGHT)
+    
+    def global_search(self):
+        """List matches from every module in the search window"""
+        term = self.search_entry.get().strip()
+        if not term:
+            return
+        
+        if self.search_window is None or not self.search_window.window.winfo_exists():
+            self.search_window = SearchWindow(self.root, self.db, self.open_record)
+        self.search_window.search(term)
+    
+    def open_record(self, module_name, record_id):
+        """Show a module with one of its records selected"""
+        self.show_module(load_module_class(module_name))
+        self.current_module.show_record(record_id)
     
     def logout(self):
         """Handle logout"""
@@ -495,52 +476,92 @@ class BusinessManagementSystem:
         self.username_entry.delete(0, tk.END)
         self.password_entry.delete(0, tk.END)
         
-        # Clear current module
+        if self.search_window is not None:
+            self.search_window.close()
+            self.search_window = None
+        
+        # Clear current module and drop cached modules
         if self.current_module:
             self.current_module.frame.pack_forget()
             self.current_module = None
+        
+        while self.module_cache:
+            _, module = self.module_cache.popitem()
+            self.close_module(module)
     
     def show_module(self, module_class):
-        """Show a module in the content frame"""
-        # Clear current module
+        """Show a module in the content frame, reusing a cached instance if possible"""
+        # Hide current module and remember which data it has shown
         if self.current_module:
             self.current_module.frame.pack_forget()
-        
-        # Create and show new module
-        self.current_module = module_class(self.content_frame, self.conn)
+            self.module_snapshots[type(self.current_module)] = self.db.snapshot(
+                self.current_module.tables)
+        
+        module = self.module_cache.pop(module_class, None)
+        if module is None:
+            # Create new module
+            module = module_class(self.content_frame, self.db)
+        elif self.db.snapshot(module.tables) != self.module_snapshots.get(module_class):
+            # Only reload a cached module when its tables changed
+            module.refresh()
+        
+        # Mark as most recently used and evict the least recently used
+        self.module_cache[module_class] = module
+        while len(self.module_cache) > self.max_cached_modules:
+            _, evicted = self.module_cache.popitem(last=False)
+            self.close_module(evicted)
+        
+        self.current_module = module
         self.current_module.frame.pack(fill=tk.BOTH, expand=True)
     
+    def close_module(self, module):
+        """Destroy a module's widgets and release its matplotlib figure"""
+        self.module_snapshots.pop(type(module), None)
+        
+        fig = getattr(module, 'fig', None)
+        if fig is not None:
+            # Already loaded by the module that created the figure
+            import matplotlib.pyplot as plt
+            plt.close(fig)
+        
+        module.frame.destroy()
+    
     def show_dashboard(self):
         """Show dashboard module"""
-        self.show_module(Dashboard)
+        self.show_module(load_module_class('dashboard'))
     
     def show_inventory(self):
         """Show inventory module"""
-        self.show_module(Inventory)
+        self.show_module(load_module_class('inventory'))
     
     def show_sales(self):
         """Show sales module"""
-        self.show_module(Sales)
+        self.show_module(load_module_class('sales'))
     
     def show_customers(self):
         """Show customers module"""
-        self.show_module(Customers)
+        self.show_module(load_module_class('customers'))
     
     def show_employees(self):
         """Show employees module"""
-        self.show_module(Employees)
+        self.show_module(load_module_class('employees'))
     
     def show_suppliers(self):
         """Show suppliers module"""
-        self.show_module(Suppliers)
+        self.show_module(load_module_class('suppliers'))
     
     def show_financial(self):
         """Show financial module"""
-        self.show_module(Financial)
+        self.show_module(load_module_class('financial'))
+    
+    def show_diagnostics(self):
+        """Show query diagnostics module"""
+        self.show_module(load_module_class('diagnostics'))
     
     def run(self):
         """Start the application"""
         self.root.mainloop()
+        self.db.executor.shutdown()
 
 if __name__ == "__main__":
     app = BusinessManagementSystem()
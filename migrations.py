@@ -0,0 +1,851 @@
+# Each migration is (version, script). Versions must increase; a database
+# whose PRAGMA user_version is already at the latest version is left alone.
+MIGRATIONS = [
+    (1, '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            role TEXT NOT NULL
+        );
+        
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT,
+            stock INTEGER DEFAULT 0,
+            price REAL NOT NULL,
+            description TEXT
+        );
+        
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            customer_name TEXT NOT NULL,
+            items TEXT,
+            items_count INTEGER DEFAULT 0,
+            total_amount REAL NOT NULL
+        );
+        
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            address TEXT,
+            notes TEXT,
+            total_purchases INTEGER DEFAULT 0
+        );
+        
+        CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            position TEXT,
+            department TEXT,
+            status TEXT DEFAULT 'Active',
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            address TEXT,
+            hire_date TEXT,
+            salary REAL,
+            notes TEXT
+        );
+        
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            contact_person TEXT,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            status TEXT DEFAULT 'Active',
+            address TEXT,
+            payment_terms TEXT,
+            notes TEXT
+        );
+        
+        CREATE TABLE IF NOT EXISTS financial_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT
+        );
+        
+        -- Default admin user (password admin123, SHA-256)
+        INSERT OR IGNORE INTO users (username, password, email, role)
+        VALUES ('admin', '240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9',
+                'admin@example.com', 'admin');
+    '''),
+    (2, '''
+        -- List views page on (sort column, id); an index on the sort column
+        -- already ends in the rowid, so it serves ORDER BY col, id directly
+        CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date);
+        CREATE INDEX IF NOT EXISTS idx_products_name ON products(name);
+        CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(name);
+        CREATE INDEX IF NOT EXISTS idx_employees_name ON employees(name);
+        CREATE INDEX IF NOT EXISTS idx_suppliers_name ON suppliers(name);
+        CREATE INDEX IF NOT EXISTS idx_financial_transactions_date ON financial_transactions(date);
+        
+        -- Recent sales per customer (WHERE customer_name = ? ORDER BY date DESC)
+        CREATE INDEX IF NOT EXISTS idx_sales_customer_date ON sales(customer_name, date, total_amount);
+        
+        -- Income/expense totals and date ranges per type, covering SUM(amount)
+        CREATE INDEX IF NOT EXISTS idx_financial_transactions_type_date
+            ON financial_transactions(type, date, amount);
+        
+        -- Expense breakdown (WHERE type = ? GROUP BY category), covering SUM(amount)
+        CREATE INDEX IF NOT EXISTS idx_financial_transactions_type_category
+            ON financial_transactions(type, category, amount);
+        
+        -- Staff lists filtered by department and status
+        CREATE INDEX IF NOT EXISTS idx_employees_department_status ON employees(department, status);
+    '''),
+    (3, '''
+        -- Headline dashboard numbers in a single row kept current by triggers
+        CREATE TABLE IF NOT EXISTS metrics_summary (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            sales_count INTEGER NOT NULL DEFAULT 0,
+            sales_revenue REAL NOT NULL DEFAULT 0,
+            product_count INTEGER NOT NULL DEFAULT 0,
+            customer_count INTEGER NOT NULL DEFAULT 0,
+            employee_count INTEGER NOT NULL DEFAULT 0,
+            supplier_count INTEGER NOT NULL DEFAULT 0
+        );
+        
+        INSERT OR REPLACE INTO metrics_summary (id, sales_count, sales_revenue, product_count,
+                                                customer_count, employee_count, supplier_count)
+        VALUES (1,
+                (SELECT COUNT(*) FROM sales),
+                (SELECT COALESCE(SUM(total_amount), 0) FROM sales),
+                (SELECT COUNT(*) FROM products),
+                (SELECT COUNT(*) FROM customers),
+                (SELECT COUNT(*) FROM employees),
+                (SELECT COUNT(*) FROM suppliers));
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_insert_metrics AFTER INSERT ON sales
+        BEGIN
+            UPDATE metrics_summary
+            SET sales_count = sales_count + 1,
+                sales_revenue = sales_revenue + NEW.total_amount
+            WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_metrics AFTER UPDATE OF total_amount ON sales
+        BEGIN
+            UPDATE metrics_summary
+            SET sales_revenue = sales_revenue - OLD.total_amount + NEW.total_amount
+            WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_delete_metrics AFTER DELETE ON sales
+        BEGIN
+            UPDATE metrics_summary
+            SET sales_count = sales_count - 1,
+                sales_revenue = sales_revenue - OLD.total_amount
+            WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_products_insert_metrics AFTER INSERT ON products
+        BEGIN
+            UPDATE metrics_summary SET product_count = product_count + 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_products_delete_metrics AFTER DELETE ON products
+        BEGIN
+            UPDATE metrics_summary SET product_count = product_count - 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_customers_insert_metrics AFTER INSERT ON customers
+        BEGIN
+            UPDATE metrics_summary SET customer_count = customer_count + 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_customers_delete_metrics AFTER DELETE ON customers
+        BEGIN
+            UPDATE metrics_summary SET customer_count = customer_count - 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_insert_metrics AFTER INSERT ON employees
+        BEGIN
+            UPDATE metrics_summary SET employee_count = employee_count + 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_delete_metrics AFTER DELETE ON employees
+        BEGIN
+            UPDATE metrics_summary SET employee_count = employee_count - 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_insert_metrics AFTER INSERT ON suppliers
+        BEGIN
+            UPDATE metrics_summary SET supplier_count = supplier_count + 1 WHERE id = 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_delete_metrics AFTER DELETE ON suppliers
+        BEGIN
+            UPDATE metrics_summary SET supplier_count = supplier_count - 1 WHERE id = 1;
+        END;
+    '''),
+    (4, '''
+        -- Per-day sales count and revenue for the dashboard charts; sales whose
+        -- date SQLite cannot parse are left out of the rollup
+        CREATE TABLE IF NOT EXISTS daily_sales (
+            day TEXT PRIMARY KEY,
+            sales_count INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        
+        INSERT OR REPLACE INTO daily_sales (day, sales_count, revenue)
+        SELECT date(date), COUNT(*), COALESCE(SUM(total_amount), 0)
+        FROM sales
+        WHERE date(date) IS NOT NULL
+        GROUP BY date(date);
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_insert_daily AFTER INSERT ON sales
+        WHEN date(NEW.date) IS NOT NULL
+        BEGIN
+            INSERT INTO daily_sales (day, sales_count, revenue)
+            VALUES (date(NEW.date), 1, NEW.total_amount)
+            ON CONFLICT(day) DO UPDATE
+            SET sales_count = sales_count + 1,
+                revenue = revenue + excluded.revenue;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_daily AFTER UPDATE OF date, total_amount ON sales
+        BEGIN
+            UPDATE daily_sales
+            SET sales_count = sales_count - 1,
+                revenue = revenue - OLD.total_amount
+            WHERE day = date(OLD.date);
+            
+            INSERT INTO daily_sales (day, sales_count, revenue)
+            SELECT date(NEW.date), 1, NEW.total_amount
+            WHERE date(NEW.date) IS NOT NULL
+            ON CONFLICT(day) DO UPDATE
+            SET sales_count = sales_count + 1,
+                revenue = revenue + excluded.revenue;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_delete_daily AFTER DELETE ON sales
+        BEGIN
+            UPDATE daily_sales
+            SET sales_count = sales_count - 1,
+                revenue = revenue - OLD.total_amount
+            WHERE day = date(OLD.date);
+        END;
+    '''),
+    (5, '''
+        -- Running ledger totals per type, and per type, category and month, so
+        -- the financial summary never scans financial_transactions. Rows with a
+        -- missing category or unparseable date are kept under ''
+        CREATE TABLE IF NOT EXISTS ledger_type_totals (
+            type TEXT PRIMARY KEY,
+            total REAL NOT NULL DEFAULT 0,
+            entries INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        
+        CREATE TABLE IF NOT EXISTS ledger_category_months (
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            month TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            entries INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (type, category, month)
+        ) WITHOUT ROWID;
+        
+        INSERT OR REPLACE INTO ledger_type_totals (type, total, entries)
+        SELECT type, COALESCE(SUM(amount), 0), COUNT(*)
+        FROM financial_transactions
+        GROUP BY type;
+        
+        INSERT OR REPLACE INTO ledger_category_months (type, category, month, total, entries)
+        SELECT type, COALESCE(category, ''), COALESCE(strftime('%Y-%m', date), ''),
+               COALESCE(SUM(amount), 0), COUNT(*)
+        FROM financial_transactions
+        GROUP BY 1, 2, 3;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_financial_transactions_insert_ledger
+        AFTER INSERT ON financial_transactions
+        BEGIN
+            INSERT INTO ledger_type_totals (type, total, entries)
+            VALUES (NEW.type, COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT(type) DO UPDATE
+            SET total = total + excluded.total,
+                entries = entries + 1;
+            
+            INSERT INTO ledger_category_months (type, category, month, total, entries)
+            VALUES (NEW.type, COALESCE(NEW.category, ''),
+                    COALESCE(strftime('%Y-%m', NEW.date), ''), COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT(type, category, month) DO UPDATE
+            SET total = total + excluded.total,
+                entries = entries + 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_financial_transactions_update_ledger
+        AFTER UPDATE OF date, type, category, amount ON financial_transactions
+        BEGIN
+            UPDATE ledger_type_totals
+            SET total = total - COALESCE(OLD.amount, 0),
+                entries = entries - 1
+            WHERE type = OLD.type;
+            
+            UPDATE ledger_category_months
+            SET total = total - COALESCE(OLD.amount, 0),
+                entries = entries - 1
+            WHERE type = OLD.type
+              AND category = COALESCE(OLD.category, '')
+              AND month = COALESCE(strftime('%Y-%m', OLD.date), '');
+            
+            INSERT INTO ledger_type_totals (type, total, entries)
+            VALUES (NEW.type, COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT(type) DO UPDATE
+            SET total = total + excluded.total,
+                entries = entries + 1;
+            
+            INSERT INTO ledger_category_months (type, category, month, total, entries)
+            VALUES (NEW.type, COALESCE(NEW.category, ''),
+                    COALESCE(strftime('%Y-%m', NEW.date), ''), COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT(type, category, month) DO UPDATE
+            SET total = total + excluded.total,
+                entries = entries + 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_financial_transactions_delete_ledger
+        AFTER DELETE ON financial_transactions
+        BEGIN
+            UPDATE ledger_type_totals
+            SET total = total - COALESCE(OLD.amount, 0),
+                entries = entries - 1
+            WHERE type = OLD.type;
+            
+            UPDATE ledger_category_months
+            SET total = total - COALESCE(OLD.amount, 0),
+                entries = entries - 1
+            WHERE type = OLD.type
+              AND category = COALESCE(OLD.category, '')
+              AND month = COALESCE(strftime('%Y-%m', OLD.date), '');
+        END;
+    '''),
+    (6, '''
+        -- Sale lines keyed to products; writing a line takes its quantity out of
+        -- stock and removing it puts the quantity back
+        CREATE TABLE IF NOT EXISTS sale_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+            product_id INTEGER NOT NULL REFERENCES products(id),
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            unit_price REAL NOT NULL
+        );
+        
+        CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items(sale_id);
+        
+        -- Covers units sold and revenue per product without touching the table
+        CREATE INDEX IF NOT EXISTS idx_sale_items_product
+        ON sale_items(product_id, quantity, unit_price);
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sale_items_insert_stock AFTER INSERT ON sale_items
+        BEGIN
+            SELECT RAISE(ABORT, 'Not enough stock for this sale')
+            WHERE (SELECT COALESCE(stock, 0) FROM products WHERE id = NEW.product_id) < NEW.quantity;
+            
+            UPDATE products
+            SET stock = COALESCE(stock, 0) - NEW.quantity
+            WHERE id = NEW.product_id;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sale_items_delete_stock AFTER DELETE ON sale_items
+        BEGIN
+            UPDATE products
+            SET stock = COALESCE(stock, 0) + OLD.quantity
+            WHERE id = OLD.product_id;
+        END;
+        
+        -- Foreign keys are not enforced on this connection, so cascade by hand
+        CREATE TRIGGER IF NOT EXISTS trg_sales_delete_items AFTER DELETE ON sales
+        BEGIN
+            DELETE FROM sale_items WHERE sale_id = OLD.id;
+        END;
+    '''),
+    (7, '''
+        -- Sales point at their customer by id; purchase count and lifetime
+        -- revenue on customers follow every sale written
+        ALTER TABLE sales ADD COLUMN customer_id INTEGER REFERENCES customers(id);
+        ALTER TABLE customers ADD COLUMN lifetime_revenue REAL NOT NULL DEFAULT 0;
+        
+        UPDATE sales
+        SET customer_id = (SELECT id FROM customers c
+                           WHERE c.name = sales.customer_name
+                           ORDER BY id LIMIT 1);
+        
+        -- Covers the recent-sales lookup for invoices
+        CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id, date, total_amount);
+        
+        UPDATE customers
+        SET total_purchases = (SELECT COUNT(*) FROM sales WHERE customer_id = customers.id),
+            lifetime_revenue = (SELECT COALESCE(SUM(total_amount), 0) FROM sales
+                                WHERE customer_id = customers.id);
+        
+        -- Sales written without an id (imports, older code) are linked by name
+        CREATE TRIGGER IF NOT EXISTS trg_sales_insert_link_customer AFTER INSERT ON sales
+        WHEN NEW.customer_id IS NULL
+        BEGIN
+            UPDATE sales
+            SET customer_id = (SELECT id FROM customers
+                               WHERE name = NEW.customer_name
+                               ORDER BY id LIMIT 1)
+            WHERE id = NEW.id;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_insert_customer_totals AFTER INSERT ON sales
+        WHEN NEW.customer_id IS NOT NULL
+        BEGIN
+            UPDATE customers
+            SET total_purchases = COALESCE(total_purchases, 0) + 1,
+                lifetime_revenue = lifetime_revenue + NEW.total_amount
+            WHERE id = NEW.customer_id;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_customer_totals
+        AFTER UPDATE OF customer_id, total_amount ON sales
+        BEGIN
+            UPDATE customers
+            SET total_purchases = COALESCE(total_purchases, 0) - 1,
+                lifetime_revenue = lifetime_revenue - OLD.total_amount
+            WHERE id = OLD.customer_id;
+            
+            UPDATE customers
+            SET total_purchases = COALESCE(total_purchases, 0) + 1,
+                lifetime_revenue = lifetime_revenue + NEW.total_amount
+            WHERE id = NEW.customer_id;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_delete_customer_totals AFTER DELETE ON sales
+        WHEN OLD.customer_id IS NOT NULL
+        BEGIN
+            UPDATE customers
+            SET total_purchases = COALESCE(total_purchases, 0) - 1,
+                lifetime_revenue = lifetime_revenue - OLD.total_amount
+            WHERE id = OLD.customer_id;
+        END;
+        
+        -- Foreign keys are not enforced, so unlink sales by hand (ON DELETE SET NULL)
+        CREATE TRIGGER IF NOT EXISTS trg_customers_delete_unlink_sales AFTER DELETE ON customers
+        BEGIN
+            UPDATE sales SET customer_id = NULL WHERE customer_id = OLD.id;
+        END;
+    '''),
+    (8, '''
+        -- One full-text index over every searchable record. The rowid packs
+        -- the source as id * 8 + kind (1 products, 2 customers, 3 suppliers,
+        -- 4 employees, 5 sales, 6 financial_transactions) so a record's
+        -- entry is found without a scan.
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        );
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 1, name, COALESCE(category, '') || ' ' || COALESCE(description, '')
+        FROM products;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_products_insert_search AFTER INSERT ON products
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 1, NEW.name, COALESCE(NEW.category, '') || ' ' ||
+                    COALESCE(NEW.description, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_products_update_search
+        AFTER UPDATE OF id, name, category, description ON products
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 1, NEW.name, COALESCE(NEW.category, '') || ' ' ||
+                    COALESCE(NEW.description, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_products_delete_search AFTER DELETE ON products
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1;
+        END;
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 2, name, COALESCE(email, '') || ' ' || COALESCE(phone, '') || ' ' ||
+                COALESCE(address, '') || ' ' || COALESCE(notes, '')
+        FROM customers;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_customers_insert_search AFTER INSERT ON customers
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 2, NEW.name, COALESCE(NEW.email, '') || ' ' ||
+                    COALESCE(NEW.phone, '') || ' ' || COALESCE(NEW.address, '') || ' ' ||
+                    COALESCE(NEW.notes, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_customers_update_search
+        AFTER UPDATE OF id, name, email, phone, address, notes ON customers
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 2, NEW.name, COALESCE(NEW.email, '') || ' ' ||
+                    COALESCE(NEW.phone, '') || ' ' || COALESCE(NEW.address, '') || ' ' ||
+                    COALESCE(NEW.notes, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_customers_delete_search AFTER DELETE ON customers
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2;
+        END;
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 3, name, COALESCE(contact_person, '') || ' ' || COALESCE(email, '') || ' ' ||
+                COALESCE(phone, '') || ' ' || COALESCE(address, '') || ' ' ||
+                COALESCE(payment_terms, '') || ' ' || COALESCE(notes, '')
+        FROM suppliers;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_insert_search AFTER INSERT ON suppliers
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 3, NEW.name, COALESCE(NEW.contact_person, '') || ' ' ||
+                    COALESCE(NEW.email, '') || ' ' || COALESCE(NEW.phone, '') || ' ' ||
+                    COALESCE(NEW.address, '') || ' ' || COALESCE(NEW.payment_terms, '') || ' ' ||
+                    COALESCE(NEW.notes, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_update_search
+        AFTER UPDATE OF id, name, contact_person, email, phone, address, payment_terms, notes ON suppliers
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 3, NEW.name, COALESCE(NEW.contact_person, '') || ' ' ||
+                    COALESCE(NEW.email, '') || ' ' || COALESCE(NEW.phone, '') || ' ' ||
+                    COALESCE(NEW.address, '') || ' ' || COALESCE(NEW.payment_terms, '') || ' ' ||
+                    COALESCE(NEW.notes, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_delete_search AFTER DELETE ON suppliers
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3;
+        END;
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 4, name, COALESCE(position, '') || ' ' || COALESCE(department, '') || ' ' ||
+                COALESCE(email, '') || ' ' || COALESCE(phone, '') || ' ' ||
+                COALESCE(address, '') || ' ' || COALESCE(notes, '')
+        FROM employees;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_insert_search AFTER INSERT ON employees
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 4, NEW.name, COALESCE(NEW.position, '') || ' ' ||
+                    COALESCE(NEW.department, '') || ' ' || COALESCE(NEW.email, '') || ' ' ||
+                    COALESCE(NEW.phone, '') || ' ' || COALESCE(NEW.address, '') || ' ' ||
+                    COALESCE(NEW.notes, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_update_search
+        AFTER UPDATE OF id, name, position, department, email, phone, address, notes ON employees
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 4, NEW.name, COALESCE(NEW.position, '') || ' ' ||
+                    COALESCE(NEW.department, '') || ' ' || COALESCE(NEW.email, '') || ' ' ||
+                    COALESCE(NEW.phone, '') || ' ' || COALESCE(NEW.address, '') || ' ' ||
+                    COALESCE(NEW.notes, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_delete_search AFTER DELETE ON employees
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4;
+        END;
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 5, customer_name, COALESCE(items, '') || ' ' || COALESCE(date, '')
+        FROM sales;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_insert_search AFTER INSERT ON sales
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 5, NEW.customer_name, COALESCE(NEW.items, '') || ' ' ||
+                    COALESCE(NEW.date, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_search
+        AFTER UPDATE OF id, customer_name, items, date ON sales
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 5;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 5, NEW.customer_name, COALESCE(NEW.items, '') || ' ' ||
+                    COALESCE(NEW.date, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_delete_search AFTER DELETE ON sales
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 5;
+        END;
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 6, category, COALESCE(type, '') || ' ' || COALESCE(description, '') || ' ' ||
+                COALESCE(date, '')
+        FROM financial_transactions;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_search AFTER INSERT ON financial_transactions
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 6, NEW.category, COALESCE(NEW.type, '') || ' ' ||
+                    COALESCE(NEW.description, '') || ' ' || COALESCE(NEW.date, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_update_search
+        AFTER UPDATE OF id, category, type, description, date ON financial_transactions
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 6;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 6, NEW.category, COALESCE(NEW.type, '') || ' ' ||
+                    COALESCE(NEW.description, '') || ' ' || COALESCE(NEW.date, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_search AFTER DELETE ON financial_transactions
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 6;
+        END;
+    '''),
+    (9, '''
+        -- Counts updates and deletes per table, so in-memory copies can tell
+        -- rows that only grew (reload the new ids) from rows that changed
+        CREATE TABLE IF NOT EXISTS change_log (
+            table_name TEXT PRIMARY KEY,
+            rewrites INTEGER NOT NULL DEFAULT 0
+        );
+        
+        INSERT OR IGNORE INTO change_log (table_name) VALUES ('sales'), ('financial_transactions');
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_change_log
+        AFTER UPDATE OF id, date, customer_name, total_amount ON sales
+        BEGIN
+            UPDATE change_log SET rewrites = rewrites + 1 WHERE table_name = 'sales';
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_delete_change_log AFTER DELETE ON sales
+        BEGIN
+            UPDATE change_log SET rewrites = rewrites + 1 WHERE table_name = 'sales';
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_update_change_log
+        AFTER UPDATE OF id, date, type, category, amount ON financial_transactions
+        BEGIN
+            UPDATE change_log SET rewrites = rewrites + 1
+            WHERE table_name = 'financial_transactions';
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_change_log
+        AFTER DELETE ON financial_transactions
+        BEGIN
+            UPDATE change_log SET rewrites = rewrites + 1
+            WHERE table_name = 'financial_transactions';
+        END;
+    '''),
+    (10, '''
+        -- Bring readable dates to the stored formats, so text order is date order;
+        -- values that do not start with a YYYY-MM-DD day are left as they are
+        UPDATE sales
+        SET date = strftime('%Y-%m-%d %H:%M:%S', date)
+        WHERE date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+          AND strftime('%Y-%m-%d %H:%M:%S', date) IS NOT NULL
+          AND date IS NOT strftime('%Y-%m-%d %H:%M:%S', date);
+        
+        UPDATE financial_transactions
+        SET date = date(date)
+        WHERE date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+          AND date(date) IS NOT NULL
+          AND date IS NOT date(date);
+        
+        UPDATE employees
+        SET hire_date = date(hire_date)
+        WHERE hire_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+          AND date(hire_date) IS NOT NULL
+          AND hire_date IS NOT date(hire_date);
+        
+        -- Seconds since 1970 computed from the text, so they can never drift from
+        -- it; NULL where the text is not a date
+        ALTER TABLE sales ADD COLUMN date_epoch INTEGER GENERATED ALWAYS AS (
+            CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                 THEN CAST(strftime('%s', date) AS INTEGER) END) VIRTUAL;
+        
+        ALTER TABLE financial_transactions ADD COLUMN date_epoch INTEGER GENERATED ALWAYS AS (
+            CASE WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                 THEN CAST(strftime('%s', date) AS INTEGER) END) VIRTUAL;
+        
+        ALTER TABLE employees ADD COLUMN hire_date_epoch INTEGER GENERATED ALWAYS AS (
+            CASE WHEN hire_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                 THEN CAST(strftime('%s', hire_date) AS INTEGER) END) VIRTUAL;
+        
+        -- Date ranges are integer range scans on these
+        CREATE INDEX IF NOT EXISTS idx_sales_date_epoch ON sales(date_epoch, total_amount);
+        CREATE INDEX IF NOT EXISTS idx_financial_transactions_date_epoch
+            ON financial_transactions(date_epoch);
+        CREATE INDEX IF NOT EXISTS idx_employees_hire_date_epoch ON employees(hire_date_epoch);
+        
+        -- Income/expense per day over a range, covering SUM(amount); replaces
+        -- the text (type, date, amount) index
+        DROP INDEX IF EXISTS idx_financial_transactions_type_date;
+        CREATE INDEX IF NOT EXISTS idx_financial_transactions_type_date_epoch
+            ON financial_transactions(type, date_epoch, amount);
+        
+        -- Reject dates written in any other format
+        CREATE TRIGGER IF NOT EXISTS trg_sales_insert_check_date BEFORE INSERT ON sales
+        WHEN NEW.date IS NOT strftime('%Y-%m-%d %H:%M:%S', NEW.date)
+        BEGIN
+            SELECT RAISE(ABORT, 'Sale date must be YYYY-MM-DD HH:MM:SS');
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_sales_update_check_date BEFORE UPDATE OF date ON sales
+        WHEN NEW.date IS NOT strftime('%Y-%m-%d %H:%M:%S', NEW.date)
+        BEGIN
+            SELECT RAISE(ABORT, 'Sale date must be YYYY-MM-DD HH:MM:SS');
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_check_date
+        BEFORE INSERT ON financial_transactions
+        WHEN NEW.date IS NOT date(NEW.date)
+        BEGIN
+            SELECT RAISE(ABORT, 'Transaction date must be YYYY-MM-DD');
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_update_check_date
+        BEFORE UPDATE OF date ON financial_transactions
+        WHEN NEW.date IS NOT date(NEW.date)
+        BEGIN
+            SELECT RAISE(ABORT, 'Transaction date must be YYYY-MM-DD');
+        END;
+        
+        -- Hire dates stay optional
+        CREATE TRIGGER IF NOT EXISTS trg_employees_insert_check_hire_date BEFORE INSERT ON employees
+        WHEN NEW.hire_date <> '' AND NEW.hire_date IS NOT date(NEW.hire_date)
+        BEGIN
+            SELECT RAISE(ABORT, 'Hire date must be YYYY-MM-DD');
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_update_check_hire_date
+        BEFORE UPDATE OF hire_date ON employees
+        WHEN NEW.hire_date <> '' AND NEW.hire_date IS NOT date(NEW.hire_date)
+        BEGIN
+            SELECT RAISE(ABORT, 'Hire date must be YYYY-MM-DD');
+        END;
+    '''),
+    (11, '''
+        -- List searches match their text columns through search_index, so the
+        -- supplier and employee documents also carry the status
+        DROP TRIGGER IF EXISTS trg_suppliers_insert_search;
+        DROP TRIGGER IF EXISTS trg_suppliers_update_search;
+        DROP TRIGGER IF EXISTS trg_employees_insert_search;
+        DROP TRIGGER IF EXISTS trg_employees_update_search;
+        
+        DELETE FROM search_index WHERE rowid IN (SELECT id * 8 + 3 FROM suppliers);
+        DELETE FROM search_index WHERE rowid IN (SELECT id * 8 + 4 FROM employees);
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 3, name, COALESCE(contact_person, '') || ' ' || COALESCE(email, '') || ' ' ||
+                COALESCE(phone, '') || ' ' || COALESCE(address, '') || ' ' ||
+                COALESCE(payment_terms, '') || ' ' || COALESCE(notes, '') || ' ' ||
+                COALESCE(status, '')
+        FROM suppliers;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_insert_search AFTER INSERT ON suppliers
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 3, NEW.name, COALESCE(NEW.contact_person, '') || ' ' ||
+                    COALESCE(NEW.email, '') || ' ' || COALESCE(NEW.phone, '') || ' ' ||
+                    COALESCE(NEW.address, '') || ' ' || COALESCE(NEW.payment_terms, '') || ' ' ||
+                    COALESCE(NEW.notes, '') || ' ' || COALESCE(NEW.status, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_suppliers_update_search
+        AFTER UPDATE OF id, name, contact_person, email, phone, address, payment_terms, notes, status
+        ON suppliers
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 3, NEW.name, COALESCE(NEW.contact_person, '') || ' ' ||
+                    COALESCE(NEW.email, '') || ' ' || COALESCE(NEW.phone, '') || ' ' ||
+                    COALESCE(NEW.address, '') || ' ' || COALESCE(NEW.payment_terms, '') || ' ' ||
+                    COALESCE(NEW.notes, '') || ' ' || COALESCE(NEW.status, ''));
+        END;
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id * 8 + 4, name, COALESCE(position, '') || ' ' || COALESCE(department, '') || ' ' ||
+                COALESCE(email, '') || ' ' || COALESCE(phone, '') || ' ' ||
+                COALESCE(address, '') || ' ' || COALESCE(notes, '') || ' ' || COALESCE(status, '')
+        FROM employees;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_insert_search AFTER INSERT ON employees
+        BEGIN
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 4, NEW.name, COALESCE(NEW.position, '') || ' ' ||
+                    COALESCE(NEW.department, '') || ' ' || COALESCE(NEW.email, '') || ' ' ||
+                    COALESCE(NEW.phone, '') || ' ' || COALESCE(NEW.address, '') || ' ' ||
+                    COALESCE(NEW.notes, '') || ' ' || COALESCE(NEW.status, ''));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_employees_update_search
+        AFTER UPDATE OF id, name, position, department, email, phone, address, notes, status
+        ON employees
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4;
+            INSERT INTO search_index (rowid, title, body)
+            VALUES (NEW.id * 8 + 4, NEW.name, COALESCE(NEW.position, '') || ' ' ||
+                    COALESCE(NEW.department, '') || ' ' || COALESCE(NEW.email, '') || ' ' ||
+                    COALESCE(NEW.phone, '') || ' ' || COALESCE(NEW.address, '') || ' ' ||
+                    COALESCE(NEW.notes, '') || ' ' || COALESCE(NEW.status, ''));
+        END;
+    '''),
+    (12, '''
+        -- List searches send one-letter words too ("Co 1"); without a
+        -- one-character prefix index each of those reads every matching
+        -- token's doclist. FTS5 fixes the prefix sizes at creation, so the
+        -- index is rebuilt; the triggers refer to it by name and carry on
+        CREATE TEMP TABLE search_index_copy AS
+        SELECT rowid AS id, title, body FROM search_index;
+        
+        DROP TABLE search_index;
+        
+        CREATE VIRTUAL TABLE search_index USING fts5(
+            title, body,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '1 2 3'
+        );
+        
+        INSERT INTO search_index (rowid, title, body)
+        SELECT id, title, body FROM search_index_copy;
+        
+        DROP TABLE search_index_copy;
+    '''),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_version(db):
+    """Return the schema version stored in the database"""
+    return db.fetch_value("PRAGMA user_version", default=0)
+
+def migrate(db):
+    """Apply pending migrations and return the resulting schema version"""
+    version = get_version(db)
+    if version >= LATEST_VERSION:
+        return version
+    
+    for target, script in MIGRATIONS:
+        if target <= version:
+            continue
+        
+        # executescript commits first, so wrap each step in its own transaction
+        try:
+            db.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {target};\nCOMMIT;")
+        except Exception:
+            db.conn.rollback()
+            raise
+        version = target
+    
+    return version
@@ -0,0 +1,360 @@
+from querystats import report_error
+from search import build_where
+
+def build_page_query(table, columns, order_by, descending=False, where='', params=(),
+                     key=None, forward=True, limit=100):
+    """Build the keyset SELECT for one page after (or before) a sort key
+
+    The selected columns are followed by the order_by columns, whose values
+    form the key for the next page; the last order_by column must be unique.
+    """
+    descending = descending == forward
+    conditions = [where] if where else []
+    params = list(params)
+
+    if key is not None:
+        placeholders = ', '.join('?' for _ in order_by)
+        conditions.append(f"({', '.join(order_by)}) {'<' if descending else '>'} ({placeholders})")
+        params.extend(key)
+
+    sql = f"SELECT {', '.join(list(columns) + list(order_by))} FROM {table}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + ", ".join(
+        f"{column} {'DESC' if descending else 'ASC'}" for column in order_by)
+    sql += " LIMIT ?"
+    params.append(limit)
+
+    return sql, params
+
+def sort_value(value):
+    """Make a column value comparable the way SQLite orders mixed types"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, bytes(value))
+
+class PagedList:
+    """Keyset-paginated Treeview that keeps only a bounded window of rows alive"""
+
+    def __init__(self, tree, scrollbar, db, table, columns, order_by,
+                 descending=False, search_fields=(), page_size=100, max_items=500):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.db = db
+
+        # Query shape; the last order_by column must be unique (the id)
+        self.table = table
+        self.columns = list(columns)
+        self.order_by = list(order_by)
+        self.descending = descending
+
+        # Search filter pushed into the WHERE clause
+        self.search_fields = list(search_fields)
+        self.where = ''
+        self.params = ()
+
+        # Window sizes
+        self.page_size = page_size
+        self.max_items = max(max_items, page_size * 2)
+
+        # Paging state
+        self.keys = {}
+        self.has_before = False
+        self.has_after = False
+        self.pending = False
+
+        # Watch scrolling so we can fetch more rows near either edge
+        self.tree.configure(yscrollcommand=self.on_scroll)
+
+    def build_query(self, key=None, forward=True):
+        """Build the SELECT for one page after (or before) the given key"""
+        # One extra row tells us whether there is another page
+        return build_page_query(self.table, self.columns, self.order_by, self.descending,
+                                self.where, self.params, key, forward, self.page_size + 1)
+
+    def set_filter(self, where, params=()):
+        """Restrict the list to rows matching a WHERE clause"""
+        self.where = where
+        self.params = tuple(params)
+
+    def count_query(self):
+        """Build the COUNT(*) for the rows matching the current filter"""
+        sql = f"SELECT COUNT(*) FROM {self.table}"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        return sql, self.params
+
+    def search(self, term, label=None, error=None):
+        """Show only rows matching the term, with the match count on the label"""
+        where, params = build_where(term, self.search_fields, self.table)
+        self.set_filter(where, params)
+        self.reload(error)
+
+        if label is None:
+            return
+
+        if not where:
+            # Not searching; drop any count still in flight
+            self.db.cancel((self, 'count'))
+            label.config(text="")
+            return
+
+        sql, params = self.count_query()
+        self.db.run(lambda db: db.fetch_value(sql, params, default=0),
+                    lambda count: label.config(text=f"{count:,} match{'' if count == 1 else 'es'}"),
+                    key=(self, 'count'), error=error)
+
+    def fetch_page(self, key, forward, done, error=None):
+        """Fetch one page of rows in the background and call done(rows, more)"""
+        sql, params = self.build_query(key, forward)
+        page_size = self.page_size
+
+        def finished(rows):
+            self.pending = False
+            done(rows[:page_size], len(rows) > page_size)
+
+        def failed(e):
+            self.pending = False
+            if error:
+                error(e)
+            else:
+                report_error(f"Error loading {self.table}", e)
+
+        # A newer page request for this list supersedes an older one
+        self.pending = True
+        self.db.run(lambda db: db.fetch_all(sql, params), finished,
+                    key=(self, 'page'), error=failed)
+
+    def jump_to(self, row_id, error=None):
+        """Clear the filter, load the rows around one record and select it"""
+        self.set_filter('')
+        self.db.cancel((self, 'count'))
+
+        sql = (f"SELECT {', '.join(self.columns + self.order_by)} FROM {self.table} "
+               f"WHERE {self.order_by[-1]} = ?")
+        half = self.page_size // 2
+
+        def job(db):
+            row = db.fetch_one(sql, (row_id,))
+            if row is None:
+                return None
+
+            # Half a page above the record and a page below it
+            key = tuple(row[len(self.columns):])
+            before = db.fetch_all(*build_page_query(self.table, self.columns, self.order_by,
+                                                    self.descending, key=key, forward=False,
+                                                    limit=half + 1))
+            after = db.fetch_all(*build_page_query(self.table, self.columns, self.order_by,
+                                                   self.descending, key=key, forward=True,
+                                                   limit=self.page_size + 1))
+            return row, before, after
+
+        def finished(result):
+            self.pending = False
+            if result is None:
+                # The record is gone; show the list from the top instead
+                self.reload(error)
+                return
+
+            row, before, after = result
+            self.clear()
+            for previous in reversed(before[:half]):
+                self.insert_row(previous)
+            self.insert_row(row)
+            for following in after[:self.page_size]:
+                self.insert_row(following)
+            self.has_before = len(before) > half
+            self.has_after = len(after) > self.page_size
+
+            iid = str(row[-1])
+            self.tree.selection_set(iid)
+            self.tree.see(iid)
+
+        def failed(e):
+            self.pending = False
+            if error:
+                error(e)
+            else:
+                report_error(f"Error loading {self.table}", e)
+
+        self.pending = True
+        self.db.run(job, finished, key=(self, 'page'), error=failed)
+
+    def insert_row(self, row, index='end'):
+        """Insert one fetched row into the tree, remembering its sort key"""
+        width = len(self.columns)
+        key = tuple(row[width:])
+        iid = str(key[-1])
+
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+        self.tree.insert("", index, iid=iid, values=row[:width])
+        self.keys[iid] = key
+
+    def refresh_row(self, row_id, select=False, error=None):
+        """Show the current state of one row after it was inserted or updated
+
+        Only that row is fetched: it is moved to its sorted position when that
+        falls inside the loaded window, and removed when it no longer matches
+        the filter or sorts outside the window.
+        """
+        conditions = [f"{self.order_by[-1]} = ?"]
+        if self.where:
+            conditions.insert(0, f"({self.where})")
+        sql = (f"SELECT {', '.join(self.columns + self.order_by)} FROM {self.table} "
+               f"WHERE {' AND '.join(conditions)}")
+        params = tuple(self.params) + (row_id,)
+
+        def failed(e):
+            if error:
+                error(e)
+            else:
+                report_error(f"Error loading {self.table}", e)
+
+        self.db.run(lambda db: db.fetch_one(sql, params),
+                    lambda row: self.place_row(str(row_id), row, select),
+                    key=(self, 'row', str(row_id)), error=failed)
+
+    def place_row(self, iid, row, select=False):
+        """Insert, move or drop one tree item for a freshly fetched row"""
+        selected = iid in self.tree.selection()
+        if self.tree.exists(iid):
+            self.remove_rows((iid,))
+        if row is None:
+            return
+
+        index = self.position_for(tuple(row[len(self.columns):]))
+        if index is None:
+            return
+
+        self.insert_row(row, index)
+        if selected or select:
+            self.tree.selection_set(iid)
+            self.tree.see(iid)
+
+    def position_for(self, key):
+        """Index a sort key belongs at in the loaded window, or None if outside it"""
+        children = self.tree.get_children()
+        wanted = tuple(sort_value(value) for value in key)
+
+        # Binary search over the window, which is kept in display order
+        low, high = 0, len(children)
+        while low < high:
+            middle = (low + high) // 2
+            current = tuple(sort_value(value) for value in self.keys[children[middle]])
+            if (current > wanted) if self.descending else (current < wanted):
+                low = middle + 1
+            else:
+                high = middle
+
+        # Rows above or below the window appear once the user scrolls there
+        if (low == 0 and self.has_before) or (low == len(children) and self.has_after):
+            return None
+        return low
+
+    def remove_row(self, row_id):
+        """Remove one deleted row from the tree"""
+        iid = str(row_id)
+        if self.tree.exists(iid):
+            self.remove_rows((iid,))
+
+    def remove_rows(self, items):
+        """Remove rows from the tree and forget their keys"""
+        if items:
+            self.tree.delete(*items)
+        for item in items:
+            self.keys.pop(item, None)
+
+    def clear(self):
+        """Remove every row and stop paging"""
+        self.remove_rows(self.tree.get_children())
+        self.has_before = False
+        self.has_after = False
+
+    def reload(self, error=None):
+        """Reload the first page"""
+        self.fetch_page(None, True, self.show_first_page, error)
+
+    def show_first_page(self, rows, more):
+        """Replace the tree contents with the first page"""
+        self.clear()
+
+        for row in rows:
+            self.insert_row(row)
+        self.has_after = more
+
+        self.tree.yview_moveto(0)
+
+    def on_scroll(self, first, last):
+        """Forward scroll positions to the scrollbar and page near the edges"""
+        self.scrollbar.set(first, last)
+
+        if self.pending:
+            return
+
+        if float(last) >= 0.9 and self.has_after:
+            self.pending = True
+            self.tree.after_idle(self.load_next)
+        elif float(first) <= 0.1 and self.has_before:
+            self.pending = True
+            self.tree.after_idle(self.load_previous)
+
+    def move_view(self, old_count, shift):
+        """Keep the same rows on screen after rows were added or removed above them"""
+        count = len(self.tree.get_children())
+        if not count:
+            return
+
+        top = float(self.tree.yview()[0]) * old_count + shift
+        self.tree.yview_moveto(max(top, 0) / count)
+
+    def load_next(self):
+        """Request the page after the last row"""
+        children = self.tree.get_children()
+        if not children or not self.has_after:
+            self.pending = False
+            return
+
+        self.fetch_page(self.keys[children[-1]], True, self.append_page)
+
+    def append_page(self, rows, more):
+        """Append a page below the last row, trimming rows from the top"""
+        for row in rows:
+            self.insert_row(row)
+        self.has_after = more
+
+        # Drop rows that scrolled far out of view
+        children = self.tree.get_children()
+        excess = len(children) - self.max_items
+        if excess > 0:
+            self.remove_rows(children[:excess])
+            self.has_before = True
+            self.move_view(len(children), -excess)
+
+    def load_previous(self):
+        """Request the page before the first row"""
+        children = self.tree.get_children()
+        if not children or not self.has_before:
+            self.pending = False
+            return
+
+        self.fetch_page(self.keys[children[0]], False, self.prepend_page)
+
+    def prepend_page(self, rows, more):
+        """Prepend a page above the first row, trimming rows from the bottom"""
+        old_count = len(self.tree.get_children())
+        for row in rows:
+            self.insert_row(row, 0)
+        self.has_before = more
+
+        # Drop rows that scrolled far out of view
+        children = self.tree.get_children()
+        excess = len(children) - self.max_items
+        if excess > 0:
+            self.remove_rows(children[-excess:])
+            self.has_after = True
+        self.move_view(old_count, len(rows))
@@ -0,0 +1,159 @@
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Histogram buckets grow by this factor from FIRST_BUCKET_MS, so percentiles
+# read from them are within about 20% of the real value
+BUCKET_GROWTH = 1.2
+FIRST_BUCKET_MS = 0.01
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+HERE = os.path.dirname(os.path.abspath(__file__))
+SKIPPED_FILES = {os.path.join(HERE, name) for name in ('database.py', 'querystats.py')}
+
+def bucket_for(ms):
+    """Histogram bucket index for a duration"""
+    if ms <= FIRST_BUCKET_MS:
+        return 0
+    return int(math.log(ms / FIRST_BUCKET_MS, BUCKET_GROWTH)) + 1
+
+def bucket_limit(index):
+    """Upper bound in ms of a histogram bucket"""
+    return FIRST_BUCKET_MS * BUCKET_GROWTH ** index
+
+def call_site():
+    """Label the code that issued a query as module:Class.method"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in SKIPPED_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    name = getattr(code, 'co_qualname', code.co_name).replace('.<locals>', '')
+    return f"{module}:{name}"
+
+class QueryTimer:
+    """Latency histogram and totals for one call site"""
+
+    def __init__(self, label, sql):
+        self.label = label
+        self.sql = ' '.join(sql.split())
+        self.buckets = {}
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms, rows):
+        bucket = bucket_for(ms)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.calls += 1
+        self.rows += max(rows, 0)
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """Approximate latency in ms below which p of the calls finished"""
+        if not self.calls:
+            return 0.0
+
+        target = p * self.calls
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(bucket_limit(bucket), self.max_ms)
+        return self.max_ms
+
+class QueryStats:
+    """Timing for every database call, grouped by call site
+
+    Shared by all connections and threads. Queries slower than the threshold
+    are appended to a log file when one is set.
+    """
+
+    def __init__(self, slow_ms=200, slow_log_path=None, max_errors=50):
+        self.lock = threading.Lock()
+        self.timers = {}
+        self.errors = deque(maxlen=max_errors)
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self.started = time.time()
+
+    def record(self, sql, seconds, rows, error=None):
+        """Add one call, labelled by where it came from and the table it touched"""
+        match = TABLE_PATTERN.search(sql)
+        label = f"{call_site()} [{match.group(1)}]" if match else call_site()
+        ms = seconds * 1000
+
+        with self.lock:
+            timer = self.timers.get(label)
+            if timer is None:
+                timer = self.timers[label] = QueryTimer(label, sql)
+            timer.add(ms, rows)
+            if error is not None:
+                timer.errors += 1
+                self.errors.append((datetime.now(), label, str(error)))
+
+        if self.slow_log_path and ms >= self.slow_ms:
+            self.log_slow(label, sql, ms, rows)
+
+    def log_slow(self, label, sql, ms, rows):
+        """Append a slow query to the log file"""
+        try:
+            with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                f.write(f"{datetime.now().isoformat(timespec='seconds')} {ms:.1f}ms "
+                        f"rows={rows} {label} {' '.join(sql.split())[:300]}\n")
+        except OSError as e:
+            print(f"Failed to write slow query log: {str(e)}")
+
+    def report_error(self, context, error):
+        """Keep an application error for the diagnostics view and print it"""
+        with self.lock:
+            self.errors.append((datetime.now(), context, str(error)))
+        print(f"{context}: {str(error)}")
+
+    def snapshot(self):
+        """Return one summary dict per call site, slowest total first"""
+        with self.lock:
+            timers = list(self.timers.values())
+            summary = [{
+                'label': timer.label,
+                'sql': timer.sql,
+                'calls': timer.calls,
+                'errors': timer.errors,
+                'rows': timer.rows,
+                'total_ms': timer.total_ms,
+                'max_ms': timer.max_ms,
+                'p50_ms': timer.percentile(0.50),
+                'p95_ms': timer.percentile(0.95),
+                'p99_ms': timer.percentile(0.99),
+            } for timer in timers]
+        return sorted(summary, key=lambda item: item['total_ms'], reverse=True)
+
+    def recent_errors(self):
+        """Latest (time, context, message) errors, newest first"""
+        with self.lock:
+            return list(reversed(self.errors))
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self.lock:
+            self.timers.clear()
+            self.errors.clear()
+            self.started = time.time()
+
+# One collector for the whole process
+stats = QueryStats()
+
+def report_error(context, error):
+    """Record an error from UI code with the shared collector"""
+    stats.report_error(context, error)
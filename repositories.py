@@ -0,0 +1,287 @@
+from search import INDEX_KINDS
+
+class Repository:
+    """CRUD statements for one table
+
+    Statements are built once per column set and reused verbatim, so SQLite's
+    statement cache compiles each of them only once.
+    """
+    table = None
+    columns = ()
+
+    # Tables that triggers change when this one is written
+    related_tables = ()
+
+    def __init__(self, db):
+        self.db = db
+        self.statements = {}
+
+    def statement(self, kind, columns=()):
+        """Return the cached SQL for a statement kind and column set"""
+        key = (kind, tuple(columns))
+        sql = self.statements.get(key)
+        if sql is not None:
+            return sql
+
+        names = ', '.join(columns)
+        if kind == 'get':
+            sql = f"SELECT id, {', '.join(self.columns)} FROM {self.table} WHERE id = ?"
+        elif kind == 'insert':
+            placeholders = ', '.join('?' for _ in columns)
+            sql = f"INSERT INTO {self.table} ({names}) VALUES ({placeholders})"
+        elif kind == 'update':
+            assignments = ', '.join(f"{column} = ?" for column in columns)
+            sql = f"UPDATE {self.table} SET {assignments} WHERE id = ?"
+        elif kind == 'delete':
+            sql = f"DELETE FROM {self.table} WHERE id = ?"
+        elif kind == 'count':
+            sql = f"SELECT COUNT(*) FROM {self.table}"
+        else:
+            raise ValueError(f"Unknown statement kind: {kind}")
+
+        self.statements[key] = sql
+        return sql
+
+    def get(self, row_id):
+        """Fetch one row by id, or None"""
+        return self.db.fetch_one(self.statement('get'), (row_id,))
+
+    def insert(self, record):
+        """Insert a row from a column -> value dict and return its id"""
+        sql = self.statement('insert', record.keys())
+        row_id = self.db.execute(sql, tuple(record.values())).lastrowid
+        self.db.touch(self.table, *self.related_tables)
+        return row_id
+
+    def insert_many(self, columns, rows, batch_size=1000):
+        """Insert many value tuples for the given columns in batches"""
+        count = self.db.execute_many(self.statement('insert', columns), rows, batch_size)
+        self.db.touch(self.table, *self.related_tables)
+        return count
+
+    def update(self, row_id, record):
+        """Update a row from a column -> value dict"""
+        sql = self.statement('update', record.keys())
+        self.db.execute(sql, tuple(record.values()) + (row_id,))
+        self.db.touch(self.table, *self.related_tables)
+
+    def delete(self, row_id):
+        """Delete a row by id"""
+        self.db.execute(self.statement('delete'), (row_id,))
+        self.db.touch(self.table, *self.related_tables)
+
+    def count(self):
+        """Count all rows"""
+        return self.db.fetch_value(self.statement('count'), default=0)
+
+class MetricsRepository:
+    """Headline numbers kept current by triggers on the metrics_summary table"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def summary(self):
+        """Fetch every headline metric in one row"""
+        return self.db.fetch_one("""
+            SELECT sales_count, sales_revenue, product_count, customer_count,
+                   employee_count, supplier_count
+            FROM metrics_summary
+            WHERE id = 1
+        """)
+
+    def daily_sales(self, start_day, end_day):
+        """Fetch (day, sales_count, revenue) rollups for an inclusive 'YYYY-MM-DD' range"""
+        return self.db.fetch_all("""
+            SELECT day, sales_count, revenue
+            FROM daily_sales
+            WHERE day BETWEEN ? AND ?
+            ORDER BY day
+        """, (start_day, end_day))
+
+class SearchRepository:
+    """Ranked full-text search over the search_index kept by triggers"""
+
+    # Source table for each kind packed into the index rowid (id * 8 + kind)
+    KINDS = {kind: table for table, kind in INDEX_KINDS.items()}
+
+    def __init__(self, db):
+        self.db = db
+
+    def search(self, match, limit=50):
+        """Fetch (table, id, title, snippet) dicts for an FTS5 match, best first
+
+        Hits in the title rank above hits in the body.
+        """
+        rows = self.db.fetch_all("""
+            SELECT rowid, title, snippet(search_index, 1, '[', ']', '...', 8) AS snippet
+            FROM search_index
+            WHERE search_index MATCH ?
+            ORDER BY bm25(search_index, 10.0, 1.0)
+            LIMIT ?
+        """, (match, limit))
+        return [{'table': self.KINDS[row['rowid'] % 8], 'id': row['rowid'] // 8,
+                 'title': row['title'], 'snippet': row['snippet']} for row in rows]
+
+class UserRepository(Repository):
+    table = 'users'
+    columns = ('username', 'password', 'email', 'role')
+
+    def find_by_username(self, username):
+        """Fetch a user by username, or None"""
+        return self.db.fetch_one("SELECT * FROM users WHERE username = ?", (username,))
+
+    def find_by_email(self, email):
+        """Fetch a user by email, or None"""
+        return self.db.fetch_one("SELECT * FROM users WHERE email = ?", (email,))
+
+class ProductRepository(Repository):
+    table = 'products'
+    columns = ('name', 'category', 'stock', 'price', 'description')
+
+    def find_by_name(self, name):
+        """Fetch the first product with exactly this name, or None"""
+        return self.db.fetch_one("""
+            SELECT id, name, stock, price
+            FROM products
+            WHERE name = ?
+            ORDER BY id
+            LIMIT 1
+        """, (name,))
+
+class SaleRepository(Repository):
+    table = 'sales'
+    columns = ('date', 'customer_id', 'customer_name', 'items', 'items_count', 'total_amount')
+    related_tables = ('sale_items', 'products', 'customers')
+
+    @staticmethod
+    def items_text(lines):
+        """The items column for (quantity, product name) lines, one 'qty x name' per line
+
+        The form edits a sale's lines as this text and the search index reads
+        it, so every write path formats it here.
+        """
+        return "\n".join(f"{quantity} x {name}" for quantity, name in lines)
+
+    def recent_for_customer(self, customer_id, limit=5):
+        """Fetch the latest sales made to a customer"""
+        return self.db.fetch_all("""
+            SELECT date, total_amount
+            FROM sales
+            WHERE customer_id = ?
+            ORDER BY date DESC
+            LIMIT ?
+        """, (customer_id, limit))
+
+class SaleItemRepository(Repository):
+    table = 'sale_items'
+    columns = ('sale_id', 'product_id', 'quantity', 'unit_price')
+    related_tables = ('products',)
+
+    def for_sale(self, sale_id):
+        """Fetch a sale's lines with their product names"""
+        return self.db.fetch_all("""
+            SELECT i.product_id, p.name, i.quantity, i.unit_price
+            FROM sale_items i
+            LEFT JOIN products p ON p.id = i.product_id
+            WHERE i.sale_id = ?
+            ORDER BY i.id
+        """, (sale_id,))
+
+    def has_lines(self, sale_id):
+        """Whether a sale has lines; sales recorded before migration 6 have none"""
+        return bool(self.db.fetch_value(
+            "SELECT EXISTS (SELECT 1 FROM sale_items WHERE sale_id = ?)", (sale_id,)))
+
+    def replace_for_sale(self, sale_id, lines):
+        """Replace a sale's lines with (product_id, quantity, unit_price) tuples
+
+        Triggers put the old quantities back into stock and take the new ones
+        out, failing if a product does not have enough; call inside a transaction.
+        """
+        self.db.execute("DELETE FROM sale_items WHERE sale_id = ?", (sale_id,))
+        self.insert_many(self.columns, [(sale_id,) + tuple(line) for line in lines])
+
+    def totals_for_product(self, product_id):
+        """Units sold and revenue for one product"""
+        return self.db.fetch_one("""
+            SELECT COALESCE(SUM(quantity), 0) AS units,
+                   COALESCE(SUM(quantity * unit_price), 0) AS revenue
+            FROM sale_items
+            WHERE product_id = ?
+        """, (product_id,))
+
+    def totals_by_product(self, limit=10):
+        """Fetch (product_id, name, units, revenue) for the best-selling products"""
+        return self.db.fetch_all("""
+            SELECT t.product_id, p.name, t.units, t.revenue
+            FROM (
+                SELECT product_id, SUM(quantity) AS units,
+                       SUM(quantity * unit_price) AS revenue
+                FROM sale_items
+                GROUP BY product_id
+            ) t
+            LEFT JOIN products p ON p.id = t.product_id
+            ORDER BY t.units DESC
+            LIMIT ?
+        """, (limit,))
+
+class CustomerRepository(Repository):
+    table = 'customers'
+    columns = ('name', 'email', 'phone', 'address', 'notes', 'total_purchases',
+               'lifetime_revenue')
+    related_tables = ('sales',)
+
+    def find_by_name(self, name):
+        """Fetch the first customer with exactly this name, or None"""
+        return self.db.fetch_one("""
+            SELECT id, name
+            FROM customers
+            WHERE name = ?
+            ORDER BY id
+            LIMIT 1
+        """, (name,))
+
+class EmployeeRepository(Repository):
+    table = 'employees'
+    columns = ('name', 'position', 'department', 'status', 'email', 'phone',
+               'address', 'hire_date', 'salary', 'notes')
+
+class SupplierRepository(Repository):
+    table = 'suppliers'
+    columns = ('name', 'contact_person', 'email', 'phone', 'status', 'address',
+               'payment_terms', 'notes')
+
+class TransactionRepository(Repository):
+    table = 'financial_transactions'
+    columns = ('date', 'type', 'category', 'amount', 'description')
+
+    def total_for_type(self, type_):
+        """Sum of amounts for one transaction type, from the running ledger"""
+        return self.db.fetch_value("""
+            SELECT total
+            FROM ledger_type_totals
+            WHERE type = ?
+        """, (type_,), default=0)
+
+    def totals_by_type(self):
+        """Map each transaction type to its running total"""
+        rows = self.db.fetch_all("SELECT type, total FROM ledger_type_totals")
+        return {row['type']: row['total'] for row in rows}
+
+    def expense_by_category(self):
+        """Fetch (category, total) rows for expenses, from the running ledger"""
+        return self.db.fetch_all("""
+            SELECT category, SUM(total) AS total
+            FROM ledger_category_months
+            WHERE type = 'Expense' AND entries > 0
+            GROUP BY category
+        """)
+
+    def monthly_totals(self, type_, start_month, end_month):
+        """Fetch (month, category, total) rows for one type over an inclusive 'YYYY-MM' range"""
+        return self.db.fetch_all("""
+            SELECT month, category, total
+            FROM ledger_category_months
+            WHERE type = ? AND month BETWEEN ? AND ? AND entries > 0
+            ORDER BY month, category
+        """, (type_, start_month, end_month))
@@ -1,14 +1,27 @@
+import re
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from exporter import export_table
+from importer import import_csv
+from analytics import GRANULARITIES
+from charts import ChartRenderer
+from dates import TIMESTAMP_FORMAT, normalize
+from paged_list import PagedList
+from querystats import report_error
+from specs import LIST_SPECS
+from timeseries import RANGES, date_range
+
 class Sales:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('sales', 'sale_items')
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -49,6 +62,10 @@ class Sales:
         # Load initial data
         self.load_sales()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_sales()
+    
     def init_sales_list(self, parent):
         """Initialize sales list view"""
         # Search frame
@@ -63,6 +80,10 @@ class Sales:
         ttk.Button(search_frame, text="Search",
                   command=self.search_sales).pack(side=tk.LEFT, padx=5)
         
+        # Match count
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=5)
+        
         # Sales list
         self.sales_tree = ttk.Treeview(parent, columns=("ID", "Date", "Customer", "Items", "Total"),
                                      show="headings")
@@ -83,7 +104,10 @@ class Sales:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.sales_tree.yview)
-        self.sales_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Page rows in as the user scrolls instead of loading the whole table
+        self.sales_list = PagedList(self.sales_tree, scrollbar, self.db, "sales",
+                                    **LIST_SPECS["sales"])
         
         # Pack widgets
         self.sales_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -103,6 +127,10 @@ class Sales:
                   command=self.show_edit_sale).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🗑️ Delete Sale",
                   command=self.delete_sale).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📥 Import CSV",
+                  command=self.import_sales).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📤 Export",
+                  command=self.export_sales).pack(side=tk.LEFT, padx=5)
         
         # Bind Enter key to search
         self.search_entry.bind('<Return>', lambda e: self.search_sales())
@@ -130,17 +158,21 @@ class Sales:
         # Customer
         customer_frame = ttk.Frame(details_frame)
         customer_frame.pack(fill=tk.X, pady=5)
-        ttk.Label(customer_frame, text="Customer:").pack(side=tk.LEFT)
+        ttk.Label(customer_frame, text="Customer (name or #id):").pack(side=tk.LEFT)
         self.customer_entry = ttk.Entry(customer_frame)
         self.customer_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
         # Items
         items_frame = ttk.Frame(details_frame)
         items_frame.pack(fill=tk.X, pady=5)
-        ttk.Label(items_frame, text="Items:").pack(side=tk.LEFT)
+        ttk.Label(items_frame, text="Items (qty x product):").pack(side=tk.LEFT)
         self.items_text = tk.Text(items_frame, height=4)
         self.items_text.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
+        # Shown for sales recorded before stock tracking, whose items are free text
+        self.items_note = ttk.Label(details_frame, text="", wraplength=400)
+        self.items_note.pack(fill=tk.X)
+        
         # Total
         total_frame = ttk.Frame(details_frame)
         total_frame.pack(fill=tk.X, pady=5)
@@ -156,28 +188,44 @@ class Sales:
         charts_frame = ttk.LabelFrame(parent, text="Sales Analytics", padding=10)
         charts_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Chart range and period length
+        options_frame = ttk.Frame(charts_frame)
+        options_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(options_frame, text="Range:").pack(side=tk.LEFT)
+        self.range_var = tk.StringVar(value='Last 30 days')
+        range_box = ttk.Combobox(options_frame, textvariable=self.range_var,
+                                 values=list(RANGES), state='readonly', width=15)
+        range_box.pack(side=tk.LEFT, padx=5)
+        range_box.bind('<<ComboboxSelected>>', lambda e: self.update_charts())
+        
+        ttk.Label(options_frame, text="Group by:").pack(side=tk.LEFT, padx=(10, 0))
+        self.granularity_var = tk.StringVar(value='Day')
+        granularity_box = ttk.Combobox(options_frame, textvariable=self.granularity_var,
+                                       values=[g.capitalize() for g in GRANULARITIES],
+                                       state='readonly', width=10)
+        granularity_box.pack(side=tk.LEFT, padx=5)
+        granularity_box.bind('<<ComboboxSelected>>', lambda e: self.update_charts())
+        
         # Create figure for charts
         self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(12, 4))
         self.canvas = FigureCanvasTkAgg(self.fig, master=charts_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Titles and axes are set once; refreshes only update the plotted data
+        self.ax1.set_title('📈 Sales')
+        self.ax1.set_xlabel('Period')
+        self.ax1.set_ylabel('Revenue ($)')
+        self.ax1.tick_params(axis='x', rotation=45)
+        self.ax2.set_title('💰 Top Customers')
+        self.charts = ChartRenderer(self.fig, self.canvas)
     
     def load_sales(self):
         """Load sales from database"""
         try:
-            # Clear existing items
-            for item in self.sales_tree.get_children():
-                self.sales_tree.delete(item)
-            
-            # Get sales from database
-            self.cursor.execute("""
-                SELECT id, date, customer_name, items_count, total_amount
-                FROM sales
-                ORDER BY date DESC
-            """)
-            
-            # Add sales to treeview
-            for sale in self.cursor.fetchall():
-                self.sales_tree.insert("", tk.END, values=sale)
+            # Load the first page in the background; later pages are fetched on scroll
+            self.sales_list.reload(lambda e: messagebox.showerror(
+                                   "Error", f"Failed to load sales: {str(e)}"))
             
             # Update charts
             self.update_charts()
@@ -195,31 +243,31 @@ class Sales:
         sale_id = self.sales_tree.item(selection[0])['values'][0]
         
         # Get sale details from database
-        self.cursor.execute("""
-            SELECT id, date, customer_name, items, total_amount
-            FROM sales
-            WHERE id = ?
-        """, (sale_id,))
-        
-        sale = self.cursor.fetchone()
+        sale = self.db.sales.get(sale_id)
         if sale:
             # Update form fields
             self.id_entry.configure(state='normal')
             self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(sale[0]))
+            self.id_entry.insert(0, str(sale['id']))
             self.id_entry.configure(state='readonly')
             
             self.date_entry.delete(0, tk.END)
-            self.date_entry.insert(0, sale[1])
+            self.date_entry.insert(0, sale['date'])
             
             self.customer_entry.delete(0, tk.END)
-            self.customer_entry.insert(0, sale[2])
+            self.customer_entry.insert(0, sale['customer_name'])
             
             self.items_text.delete('1.0', tk.END)
-            self.items_text.insert('1.0', sale[3] or '')
+            self.items_text.insert('1.0', sale['items'] or '')
+            
+            if self.db.sale_items.has_lines(sale['id']):
+                self.items_note.config(text="")
+            else:
+                self.items_note.config(text="⚠️ Recorded before stock tracking: re-enter the items "
+                                            "as 'qty x product' lines to save this sale")
             
             self.total_entry.delete(0, tk.END)
-            self.total_entry.insert(0, str(sale[4]))
+            self.total_entry.insert(0, str(sale['total_amount']))
     
     def show_new_sale(self):
         """Show new sale form"""
@@ -229,10 +277,11 @@ class Sales:
         self.id_entry.configure(state='readonly')
         
         self.date_entry.delete(0, tk.END)
-        self.date_entry.insert(0, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        self.date_entry.insert(0, datetime.now().strftime(TIMESTAMP_FORMAT))
         
         self.customer_entry.delete(0, tk.END)
         self.items_text.delete('1.0', tk.END)
+        self.items_note.config(text="")
         self.total_entry.delete(0, tk.END)
     
     def show_edit_sale(self):
@@ -253,35 +302,109 @@ class Sales:
             total = self.total_entry.get()
             
             # Validate inputs
-            if not all([date, customer, items, total]):
+            if not all([date, customer, items]):
                 messagebox.showerror("Error", "Please fill in all required fields")
                 return
             
             try:
-                total = float(total)
-            except ValueError:
-                messagebox.showerror("Error", "Invalid total amount")
+                date = normalize(date, TIMESTAMP_FORMAT)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid date: {str(e)}")
                 return
             
-            if sale_id:  # Update existing sale
-                self.cursor.execute("""
-                    UPDATE sales
-                    SET date = ?, customer_name = ?, items = ?, total_amount = ?
-                    WHERE id = ?
-                """, (date, customer, items, total, sale_id))
-            else:  # Add new sale
-                self.cursor.execute("""
-                    INSERT INTO sales (date, customer_name, items, total_amount)
-                    VALUES (?, ?, ?, ?)
-                """, (date, customer, items, total))
+            try:
+                entries = self.parse_items(items)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
             
-            self.conn.commit()
-            self.load_sales()
+            # A sale recorded before stock tracking has no lines, so its items
+            # never left stock; writing lines now would take them out
+            move_stock = True
+            if sale_id and not self.db.sale_items.has_lines(sale_id):
+                move_stock = messagebox.askyesnocancel(
+                    "Sale recorded before stock tracking",
+                    "This sale's items were never taken out of stock.\n\n"
+                    "Yes: record its lines and take the items out of stock now\n"
+                    "No: save the sale without changing stock\n"
+                    "Cancel: keep editing")
+                if move_stock is None:
+                    return
+            
+            with self.db.transaction():
+                # Link the sale to its customer record when there is one
+                customer_row = self.find_customer(customer)
+                if customer_row is None and customer.startswith('#'):
+                    raise ValueError(f"Unknown customer: {customer}")
+                
+                # Price each line from the product it refers to
+                lines = []
+                for quantity, reference in entries:
+                    product = self.find_product(reference)
+                    if product is None:
+                        raise ValueError(f"Unknown product: {reference}")
+                    lines.append((product['id'], product['name'], quantity, product['price']))
+                
+                # Blank total means the sum of the lines
+                try:
+                    total = float(total) if total else sum(q * p for _, _, q, p in lines)
+                except ValueError:
+                    raise ValueError("Invalid total amount")
+                
+                record = {'date': date,
+                          'customer_id': customer_row['id'] if customer_row else None,
+                          'customer_name': customer_row['name'] if customer_row else customer,
+                          'items': self.db.sales.items_text((q, name) for _, name, q, _ in lines),
+                          'items_count': sum(q for _, _, q, _ in lines),
+                          'total_amount': total}
+                
+                if sale_id:  # Update existing sale
+                    self.db.sales.update(sale_id, record)
+                else:  # Add new sale
+                    sale_id = self.db.sales.insert(record)
+                
+                # Stock moves with the lines in the same transaction
+                if move_stock:
+                    self.db.sale_items.replace_for_sale(
+                        sale_id, [(product_id, q, price) for product_id, _, q, price in lines])
+            
+            # Redraw only the saved row instead of reloading the list
+            self.sales_list.refresh_row(sale_id, select=True)
+            self.update_charts()
             messagebox.showinfo("Success", "Sale saved successfully")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save sale: {str(e)}")
     
+    def parse_items(self, text):
+        """Parse 'qty x product' lines into (quantity, product) pairs"""
+        entries = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            
+            match = re.fullmatch(r'\s*(?:(\d+)\s*[xX×]\s*)?(.+?)\s*', line)
+            quantity = int(match.group(1) or 1)
+            if quantity < 1:
+                raise ValueError(f"Line {number}: quantity must be at least 1")
+            entries.append((quantity, match.group(2)))
+        
+        if not entries:
+            raise ValueError("Please enter at least one item")
+        return entries
+    
+    def find_product(self, reference):
+        """Look up a product by exact name, or by id written as #id"""
+        if reference.startswith('#') and reference[1:].isdigit():
+            return self.db.products.get(int(reference[1:]))
+        return self.db.products.find_by_name(reference)
+    
+    def find_customer(self, reference):
+        """Look up a customer by exact name, or by id written as #id"""
+        if reference.startswith('#') and reference[1:].isdigit():
+            return self.db.customers.get(int(reference[1:]))
+        return self.db.customers.find_by_name(reference)
+    
     def delete_sale(self):
         """Delete selected sale"""
         selection = self.sales_tree.selection()
@@ -293,87 +416,70 @@ class Sales:
             try:
                 sale_id = self.sales_tree.item(selection[0])['values'][0]
                 
-                self.cursor.execute("DELETE FROM sales WHERE id = ?", (sale_id,))
-                self.conn.commit()
+                with self.db.transaction():
+                    self.db.sales.delete(sale_id)
                 
-                self.load_sales()
+                self.sales_list.remove_row(sale_id)
+                self.update_charts()
                 messagebox.showinfo("Success", "Sale deleted successfully")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete sale: {str(e)}")
     
+    def import_sales(self):
+        """Bulk import sales from a CSV file"""
+        import_csv(self.frame, self.db, 'sales', self.refresh)
+    
+    def export_sales(self):
+        """Export sales to a CSV or JSONL file"""
+        export_table(self.frame, self.db, 'sales')
+    
     def update_charts(self):
         """Update sales charts"""
+        # Query in the background and draw when the data arrives
+        start, end = date_range(self.range_var.get())
+        granularity = self.granularity_var.get().lower()
+        self.db.run(lambda db: (db.timeseries.sales(granularity, start, end),
+                                db.analytics.top_customers(db, 5, start, end)),
+                    self.draw_charts, key=(self, 'charts'),
+                    error=lambda e: report_error("Error updating charts", e))
+    
+    def draw_charts(self, data):
+        """Draw sales charts"""
         try:
-            # Clear previous plots
-            self.ax1.clear()
-            self.ax2.clear()
+            (periods, revenue, _), top_customers = data
             
-            # Get sales data for charts
-            self.cursor.execute("""
-                SELECT date, total_amount
-                FROM sales
-                ORDER BY date
-                LIMIT 7
-            """)
+            # Plot revenue per period
+            self.charts.line(self.ax1, 'revenue', periods, revenue, marker='o',
+                             color=self.colors['primary'])
             
-            sales_data = self.cursor.fetchall()
-            if sales_data:
-                dates = [sale[0] for sale in sales_data]
-                amounts = [sale[1] for sale in sales_data]
-                
-                # Plot daily sales
-                self.ax1.plot(dates, amounts, marker='o',
-                            color=self.colors['primary'])
-                self.ax1.set_title('📈 Daily Sales')
-                self.ax1.set_xlabel('Date')
-                self.ax1.set_ylabel('Amount ($)')
-                self.ax1.tick_params(axis='x', rotation=45)
-                
-                # Plot sales distribution
-                self.ax2.pie(amounts, labels=dates, autopct='%1.1f%%',
-                           colors=[self.colors['primary'], self.colors['accent'],
-                                 self.colors['success']])
-                self.ax2.set_title('💰 Sales Distribution')
+            # Plot revenue share of the biggest customers
+            self.charts.pie(self.ax2, 'customers', [name for name, _, _ in top_customers],
+                            [revenue for _, revenue, _ in top_customers],
+                            colors=[self.colors['primary'], self.colors['accent'],
+                                    self.colors['success']])
             
-            # Adjust layout and display
-            self.fig.tight_layout()
-            self.canvas.draw()
+            # Redraw only if the data changed
+            self.charts.show()
             
         except Exception as e:
-            print(f"Error updating charts: {str(e)}")
+            report_error("Error updating charts", e)
+    
+    def show_record(self, sale_id):
+        """Open a sale from a search hit, showing the sales made around the same date"""
+        self.search_entry.delete(0, tk.END)
+        self.match_label.config(text="")
+        self.sales_list.jump_to(sale_id, lambda e: messagebox.showerror(
+            "Error", f"Failed to load sales: {str(e)}"))
     
     def search_sales(self):
-        """Search sales and highlight matches"""
-        search_term = self.search_entry.get().lower()
-        
-        # Clear existing items
-        for item in self.sales_tree.get_children():
-            self.sales_tree.delete(item)
+        """Search sales and show only the matches"""
+        search_term = self.search_entry.get()
         
         try:
-            # Get all sales
-            self.cursor.execute("""
-                SELECT id, date, customer_name, items_count, total_amount
-                FROM sales
-                ORDER BY date DESC
-            """)
-            
-            # Add sales to treeview with highlighting
-            for sale in self.cursor.fetchall():
-                # Convert all values to strings for case-insensitive search
-                values = [str(val) for val in sale]
-                
-                # Check if any field contains the search term
-                if search_term in ' '.join(values).lower():
-                    # Insert with tag for highlighting
-                    item = self.sales_tree.insert("", tk.END, values=values, tags=('highlight',))
-                else:
-                    # Insert without highlighting
-                    self.sales_tree.insert("", tk.END, values=values)
-            
-            # Configure tag for highlighting
-            self.sales_tree.tag_configure('highlight', background='#FFE5B4')  # Light orange background
+            # Filter the list in SQL and page in the matches, showing the match count
+            self.sales_list.search(search_term, self.match_label, lambda e: messagebox.showerror(
+                                   "Error", f"Failed to search sales: {str(e)}"))
             
             # Update charts
             self.update_charts()
@@ -0,0 +1,73 @@
+# Match kinds for searchable columns
+TEXT = 'text'            # word-prefix match through the full-text search_index
+PREFIX = 'prefix'        # prefix match as a range scan, so an index on the column is used
+NUMBER = 'number'        # exact match when the search term is a number
+SUBSTRING = 'substring'  # case-insensitive LIKE '%term%'; scans the table, so a last resort
+
+# Kind packed into each search_index rowid (id * 8 + kind), per source table
+INDEX_KINDS = {'products': 1, 'customers': 2, 'suppliers': 3, 'employees': 4,
+               'sales': 5, 'financial_transactions': 6}
+
+def escape_like(term):
+    """Escape LIKE wildcards so the term matches literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def parse_number(term):
+    """Return the term as an int or float, or None if it is not numeric"""
+    for convert in (int, float):
+        try:
+            return convert(term)
+        except ValueError:
+            pass
+    return None
+
+def build_where(term, fields, table=None):
+    """Build a WHERE clause matching the term against any of the given (column, kind) fields
+
+    TEXT fields need the table: a row's text columns are all in its one
+    search_index document, so a single MATCH on the index covers them. With
+    no SUBSTRING fields, and NUMBER fields only on indexed columns, every
+    branch is an index lookup and SQLite unions them instead of scanning.
+
+    Returns (sql, params), or ('', ()) when the term is empty.
+    """
+    term = term.strip()
+    if not term:
+        return '', ()
+
+    number = parse_number(term)
+    clauses = []
+    params = []
+
+    for column, kind in fields:
+        if kind == NUMBER:
+            if number is not None:
+                clauses.append(f"{column} = ?")
+                params.append(number)
+        elif kind == PREFIX:
+            clauses.append(f"({column} >= ? AND {column} < ?)")
+            params.extend([term, term + '\uffff'])
+        elif kind == SUBSTRING:
+            clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(f"%{escape_like(term)}%")
+
+    match = build_match(term)
+    if match and any(kind == TEXT for _, kind in fields):
+        if table not in INDEX_KINDS:
+            raise ValueError(f"{table} has no full-text index; search it with SUBSTRING")
+        clauses.append("id IN (SELECT rowid / 8 FROM search_index "
+                       "WHERE search_index MATCH ? AND rowid % 8 = ?)")
+        params.extend([match, INDEX_KINDS[table]])
+
+    if not clauses:
+        return '0', ()
+
+    return "(" + " OR ".join(clauses) + ")", tuple(params)
+
+def build_match(term):
+    """Build an FTS5 MATCH expression requiring every word of the term as a prefix
+
+    Returns '' when the term has no words.
+    """
+    words = term.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
@@ -0,0 +1,49 @@
+from search import TEXT, PREFIX, NUMBER
+
+# How each table is listed and searched: the columns shown, the keyset order
+# (the unique id last) and the searchable fields. The module lists, the API
+# and the benchmark all read these, so they page and search the same way.
+LIST_SPECS = {
+    'products': {
+        'columns': ('id', 'name', 'category', 'stock', 'price'),
+        'order_by': ('name', 'id'),
+        'descending': False,
+        'search_fields': (('id', NUMBER), ('name', TEXT), ('category', TEXT),
+                          ('stock', NUMBER), ('price', NUMBER)),
+    },
+    'sales': {
+        'columns': ('id', 'date', 'customer_name', 'items_count', 'total_amount'),
+        'order_by': ('date', 'id'),
+        'descending': True,
+        'search_fields': (('id', NUMBER), ('date', PREFIX), ('customer_name', TEXT),
+                          ('items_count', NUMBER), ('total_amount', NUMBER)),
+    },
+    'customers': {
+        'columns': ('id', 'name', 'email', 'phone', 'total_purchases'),
+        'order_by': ('name', 'id'),
+        'descending': False,
+        'search_fields': (('id', NUMBER), ('name', TEXT), ('email', TEXT),
+                          ('phone', TEXT), ('total_purchases', NUMBER)),
+    },
+    'employees': {
+        'columns': ('id', 'name', 'position', 'department', 'status'),
+        'order_by': ('name', 'id'),
+        'descending': False,
+        'search_fields': (('id', NUMBER), ('name', TEXT), ('position', TEXT),
+                          ('department', TEXT), ('status', TEXT)),
+    },
+    'suppliers': {
+        'columns': ('id', 'name', 'contact_person', 'email', 'status'),
+        'order_by': ('name', 'id'),
+        'descending': False,
+        'search_fields': (('id', NUMBER), ('name', TEXT), ('contact_person', TEXT),
+                          ('email', TEXT), ('status', TEXT)),
+    },
+    'financial_transactions': {
+        'columns': ('id', 'date', 'type', 'category', 'amount'),
+        'order_by': ('date', 'id'),
+        'descending': True,
+        'search_fields': (('id', NUMBER), ('date', PREFIX), ('type', TEXT),
+                          ('category', TEXT), ('amount', NUMBER)),
+    },
+}
@@ -0,0 +1,48 @@
+import os
+import time
+from datetime import datetime
+
+class StartupTimer:
+    """Time each startup phase up to the first login frame
+
+    Every run appends one line to a log file so cold-start latency can be
+    tracked across releases and terminals. Set BMS_STARTUP_BUDGET_MS to get
+    a warning whenever a start takes longer than the budget.
+    """
+
+    def __init__(self, start=None, log_path='startup_times.log'):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.log_path = log_path
+        self.phases = []
+
+    def mark(self, phase):
+        """Record the time spent since the previous mark under a phase name"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+
+    def total_ms(self):
+        """Milliseconds from the start to the latest mark"""
+        return (self.last - self.start) * 1000
+
+    def report(self):
+        """Append this run's timings to the log and warn when over budget"""
+        phases = ' '.join(f"{phase}={ms:.1f}ms" for phase, ms in self.phases)
+        line = f"{datetime.now().isoformat(timespec='seconds')} total={self.total_ms():.1f}ms {phases}"
+
+        try:
+            with open(self.log_path, 'a') as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Failed to write startup timings: {str(e)}")
+
+        budget = os.environ.get('BMS_STARTUP_BUDGET_MS')
+        if budget:
+            try:
+                if self.total_ms() > float(budget):
+                    print(f"Startup took {self.total_ms():.0f}ms, over the {budget}ms budget ({phases})")
+            except ValueError:
+                print(f"Invalid BMS_STARTUP_BUDGET_MS: {budget}")
+
+        return line
@@ -2,11 +2,17 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 
+from exporter import export_table
+from paged_list import PagedList
+from specs import LIST_SPECS
+
 class Suppliers:
-    def __init__(self, parent, db_connection):
+    # Tables this module displays; a cached instance refreshes when they change
+    tables = ('suppliers',)
+    
+    def __init__(self, parent, db):
         self.frame = ttk.Frame(parent)
-        self.conn = db_connection
-        self.cursor = self.conn.cursor()
+        self.db = db
         
         # Configure colors
         self.colors = {
@@ -47,6 +53,10 @@ class Suppliers:
         # Load initial data
         self.load_suppliers()
     
+    def refresh(self):
+        """Reload data that changed while the module was hidden"""
+        self.load_suppliers()
+    
     def init_supplier_list(self, parent):
         """Initialize supplier list view"""
         # Search frame
@@ -61,6 +71,10 @@ class Suppliers:
         ttk.Button(search_frame, text="Search",
                   command=self.search_suppliers).pack(side=tk.LEFT, padx=5)
         
+        # Match count
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT, padx=5)
+        
         # Supplier list
         self.supplier_tree = ttk.Treeview(parent, columns=("ID", "Name", "Contact", "Email", "Status"),
                                        show="headings")
@@ -81,7 +95,10 @@ class Suppliers:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.supplier_tree.yview)
-        self.supplier_tree.configure(yscrollcommand=scrollbar.set)
+        
+        # Page rows in as the user scrolls instead of loading the whole table
+        self.supplier_list = PagedList(self.supplier_tree, scrollbar, self.db, "suppliers",
+                                       **LIST_SPECS["suppliers"])
         
         # Pack widgets
         self.supplier_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -101,6 +118,8 @@ class Suppliers:
                   command=self.show_edit_supplier).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="🗑️ Delete Supplier",
                   command=self.delete_supplier).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="📤 Export",
+                  command=self.export_suppliers).pack(side=tk.LEFT, padx=5)
         
         # Bind Enter key to search
         self.search_entry.bind('<Return>', lambda e: self.search_suppliers())
@@ -183,20 +202,9 @@ class Suppliers:
     def load_suppliers(self):
         """Load suppliers from database"""
         try:
-            # Clear existing items
-            for item in self.supplier_tree.get_children():
-                self.supplier_tree.delete(item)
-            
-            # Get suppliers from database
-            self.cursor.execute("""
-                SELECT id, name, contact_person, email, status
-                FROM suppliers
-                ORDER BY name
-            """)
-            
-            # Add suppliers to treeview
-            for supplier in self.cursor.fetchall():
-                self.supplier_tree.insert("", tk.END, values=supplier)
+            # Load the first page in the background; later pages are fetched on scroll
+            self.supplier_list.reload(lambda e: messagebox.showerror(
+                                      "Error", f"Failed to load suppliers: {str(e)}"))
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load suppliers: {str(e)}")
@@ -211,43 +219,36 @@ class Suppliers:
         supplier_id = self.supplier_tree.item(selection[0])['values'][0]
         
         # Get supplier details from database
-        self.cursor.execute("""
-            SELECT id, name, contact_person, email, phone, status,
-                   address, payment_terms, notes
-            FROM suppliers
-            WHERE id = ?
-        """, (supplier_id,))
-        
-        supplier = self.cursor.fetchone()
+        supplier = self.db.suppliers.get(supplier_id)
         if supplier:
             # Update form fields
             self.id_entry.configure(state='normal')
             self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(supplier[0]))
+            self.id_entry.insert(0, str(supplier['id']))
             self.id_entry.configure(state='readonly')
             
             self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, supplier[1])
+            self.name_entry.insert(0, supplier['name'])
             
             self.contact_entry.delete(0, tk.END)
-            self.contact_entry.insert(0, supplier[2])
+            self.contact_entry.insert(0, supplier['contact_person'])
             
             self.email_entry.delete(0, tk.END)
-            self.email_entry.insert(0, supplier[3])
+            self.email_entry.insert(0, supplier['email'])
             
             self.phone_entry.delete(0, tk.END)
-            self.phone_entry.insert(0, supplier[4])
+            self.phone_entry.insert(0, supplier['phone'])
             
-            self.status_var.set(supplier[5])
+            self.status_var.set(supplier['status'])
             
             self.address_text.delete('1.0', tk.END)
-            self.address_text.insert('1.0', supplier[6] or '')
+            self.address_text.insert('1.0', supplier['address'] or '')
             
             self.payment_entry.delete(0, tk.END)
-            self.payment_entry.insert(0, supplier[7] or '')
+            self.payment_entry.insert(0, supplier['payment_terms'] or '')
             
             self.notes_text.delete('1.0', tk.END)
-            self.notes_text.insert('1.0', supplier[8] or '')
+            self.notes_text.insert('1.0', supplier['notes'] or '')
     
     def show_add_supplier(self):
         """Show add supplier form"""
@@ -296,24 +297,18 @@ class Suppliers:
                 messagebox.showerror("Error", "Please enter a valid email address")
                 return
             
-            if supplier_id:  # Update existing supplier
-                self.cursor.execute("""
-                    UPDATE suppliers
-                    SET name = ?, contact_person = ?, email = ?, phone = ?,
-                        status = ?, address = ?, payment_terms = ?, notes = ?
-                    WHERE id = ?
-                """, (name, contact, email, phone, status, address,
-                      payment, notes, supplier_id))
-            else:  # Add new supplier
-                self.cursor.execute("""
-                    INSERT INTO suppliers (name, contact_person, email, phone,
-                                         status, address, payment_terms, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (name, contact, email, phone, status, address,
-                      payment, notes))
+            record = {'name': name, 'contact_person': contact, 'email': email,
+                      'phone': phone, 'status': status, 'address': address,
+                      'payment_terms': payment, 'notes': notes}
             
-            self.conn.commit()
-            self.load_suppliers()
+            with self.db.transaction():
+                if supplier_id:  # Update existing supplier
+                    self.db.suppliers.update(supplier_id, record)
+                else:  # Add new supplier
+                    supplier_id = self.db.suppliers.insert(record)
+            
+            # Redraw only the saved row instead of reloading the list
+            self.supplier_list.refresh_row(supplier_id, select=True)
             messagebox.showinfo("Success", "Supplier saved successfully")
             
         except Exception as e:
@@ -330,46 +325,34 @@ class Suppliers:
             try:
                 supplier_id = self.supplier_tree.item(selection[0])['values'][0]
                 
-                self.cursor.execute("DELETE FROM suppliers WHERE id = ?", (supplier_id,))
-                self.conn.commit()
+                with self.db.transaction():
+                    self.db.suppliers.delete(supplier_id)
                 
-                self.load_suppliers()
+                self.supplier_list.remove_row(supplier_id)
                 messagebox.showinfo("Success", "Supplier deleted successfully")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete supplier: {str(e)}")
     
+    def export_suppliers(self):
+        """Export suppliers to a CSV or JSONL file"""
+        export_table(self.frame, self.db, 'suppliers')
+    
+    def show_record(self, supplier_id):
+        """Open a supplier from a search hit and load it into the form for editing"""
+        self.search_entry.delete(0, tk.END)
+        self.match_label.config(text="")
+        self.supplier_list.jump_to(supplier_id, lambda e: messagebox.showerror(
+            "Error", f"Failed to load suppliers: {str(e)}"))
+    
     def search_suppliers(self):
-        """Search suppliers and highlight matches"""
-        search_term = self.search_entry.get().lower()
-        
-        # Clear existing items
-        for item in self.supplier_tree.get_children():
-            self.supplier_tree.delete(item)
+        """Search suppliers and show only the matches"""
+        search_term = self.search_entry.get()
         
         try:
-            # Get all suppliers
-            self.cursor.execute("""
-                SELECT id, name, contact_person, email, status
-                FROM suppliers
-                ORDER BY name
-            """)
-            
-            # Add suppliers to treeview with highlighting
-            for supplier in self.cursor.fetchall():
-                # Convert all values to strings for case-insensitive search
-                values = [str(val) for val in supplier]
-                
-                # Check if any field contains the search term
-                if search_term in ' '.join(values).lower():
-                    # Insert with tag for highlighting
-                    item = self.supplier_tree.insert("", tk.END, values=values, tags=('highlight',))
-                else:
-                    # Insert without highlighting
-                    self.supplier_tree.insert("", tk.END, values=values)
-            
-            # Configure tag for highlighting
-            self.supplier_tree.tag_configure('highlight', background='#FFE5B4')  # Light orange background
+            # Filter the list in SQL and page in the matches, showing the match count
+            self.supplier_list.search(search_term, self.match_label, lambda e: messagebox.showerror(
+                                      "Error", f"Failed to search suppliers: {str(e)}"))
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search suppliers: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from migrations import MIGRATIONS, migrate
+
+class LegacyDateTest(unittest.TestCase):
+    """Aggregations over a database upgraded with a date migration 10 cannot read"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.directory.name, 'legacy.db'))
+
+        # Schema as it was before dates were validated, with a sale written then
+        for version, script in MIGRATIONS:
+            if version < 10:
+                self.db.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+        self.db.executescript("""
+            INSERT INTO sales (date, customer_name, total_amount) VALUES
+                ('07-03-2025', 'Legacy', 500000),
+                ('2025-03-04 10:00:00', 'Alice', 100),
+                ('2025-03-05', 'Bob', 50);
+            INSERT INTO financial_transactions (date, type, category, amount) VALUES
+                ('March 2025', 'Expense', 'Rent', 900),
+                ('2025-03-04', 'Expense', 'Rent', 300);
+        """)
+        migrate(self.db)
+
+    def tearDown(self):
+        self.db.conn.close()
+        self.directory.cleanup()
+
+    def test_totals_by_period_skip_unreadable_dates(self):
+        analytics = self.db.analytics
+        self.assertEqual(analytics.totals_by_period(self.db, 'sales', 'day'),
+                         [('2025-03-04', 100.0, 1), ('2025-03-05', 50.0, 1)])
+        self.assertEqual(analytics.totals_by_period(self.db, 'sales', 'week'),
+                         [('2025-03-03', 150.0, 2)])
+        self.assertEqual(analytics.totals_by_period(self.db, 'sales', 'month'),
+                         [('2025-03', 150.0, 2)])
+        self.assertEqual(analytics.totals_by_period(self.db, 'sales', 'quarter'),
+                         [('2025-Q1', 150.0, 2)])
+
+    def test_groups_skip_unreadable_dates(self):
+        analytics = self.db.analytics
+        self.assertEqual(analytics.top_customers(self.db),
+                         [('Alice', 100.0, 1), ('Bob', 50.0, 1)])
+        self.assertEqual(analytics.expenses_by_category(self.db), [('Rent', 300.0, 1)])
+
+    def test_fixed_date_is_picked_up(self):
+        self.db.execute("UPDATE sales SET date = '2025-03-07 09:00:00' WHERE customer_name = 'Legacy'")
+        self.assertEqual(self.db.analytics.totals_by_period(self.db, 'sales', 'month'),
+                         [('2025-03', 500150.0, 3)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+from analytics import GRANULARITIES, period_key
+from dates import epoch
+
+# Chart ranges offered in the UI: label -> number of days up to today (None = everything)
+RANGES = {
+    'Last 7 days': 7,
+    'Last 30 days': 30,
+    'Last 90 days': 90,
+    'Last 12 months': 365,
+    'All time': None,
+}
+
+def date_range(label, today=None):
+    """Return the inclusive (start, end) 'YYYY-MM-DD' days for a RANGES label
+
+    start is None for a range without a lower bound.
+    """
+    today = today or date.today()
+    days = RANGES[label]
+    start = None if days is None else (today - timedelta(days=days - 1)).isoformat()
+    return start, today.isoformat()
+
+def next_day(day):
+    """The day after a 'YYYY-MM-DD' day, as an exclusive upper bound for range scans"""
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+def periods(start, end, granularity):
+    """Every bucket key between two days, oldest first, so empty periods show as zero"""
+    current = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+    keys = []
+    while current <= last:
+        key = period_key(current.isoformat(), granularity)
+        if not keys or keys[-1] != key:
+            keys.append(key)
+        current += timedelta(days=1)
+    return keys
+
+class TimeSeriesRepository:
+    """Totals per day, week, month or quarter over a date range
+
+    Each query is a range scan on an index whose first column is the date
+    (the daily_sales primary key, or financial_transactions(type, date_epoch,
+    amount) per type), so its cost follows the rows in range rather than the
+    table size. SQL sums per day; the days are then folded into periods, so
+    the result has one point per period however many rows fall in it.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def fold(self, day_totals, start, end, granularity):
+        """Sum {day: total} into [total per period] for every period of the range"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+
+        keys = periods(start, end, granularity) if start else []
+        totals = dict.fromkeys(keys, 0)
+        for day, total in day_totals.items():
+            key = period_key(day, granularity)
+            if key in totals:
+                totals[key] += total
+        return keys, list(totals.values())
+
+    def sales(self, granularity, start, end):
+        """Return (periods, revenue, sales_count) lists from the daily rollup"""
+        where = "day >= ? AND day < ?" if start else "day < ?"
+        params = (start, next_day(end)) if start else (next_day(end),)
+        rows = self.db.fetch_all(f"""
+            SELECT day, revenue, sales_count
+            FROM daily_sales
+            WHERE {where} AND sales_count > 0
+        """, params)
+
+        if start is None:
+            start = self.db.fetch_value("SELECT MIN(day) FROM daily_sales WHERE sales_count > 0")
+
+        keys, revenue = self.fold({row[0]: row[1] for row in rows}, start, end, granularity)
+        _, counts = self.fold({row[0]: row[2] for row in rows}, start, end, granularity)
+        return keys, revenue, counts
+
+    def cash_flow(self, granularity, start, end):
+        """Return (periods, income, expense) lists from financial_transactions"""
+        where = "date_epoch >= ? AND date_epoch < ?" if start else "date_epoch < ?"
+        bounds = (epoch(start), epoch(next_day(end))) if start else (epoch(next_day(end)),)
+
+        # One integer range scan per type on (type, date_epoch, amount); a
+        # transaction's epoch is its midnight, so each epoch is one day
+        totals = {}
+        first_days = []
+        for type_ in ('Income', 'Expense'):
+            rows = self.db.fetch_all(f"""
+                SELECT date(date_epoch, 'unixepoch') AS day, SUM(amount)
+                FROM financial_transactions
+                WHERE type = ? AND {where}
+                GROUP BY date_epoch
+            """, (type_,) + bounds)
+            totals[type_] = {row[0]: row[1] for row in rows}
+
+            if start is None:
+                first = self.db.fetch_value("""
+                    SELECT date(MIN(date_epoch), 'unixepoch')
+                    FROM financial_transactions
+                    WHERE type = ?
+                """, (type_,))
+                if first:
+                    first_days.append(first)
+
+        start = start or min(first_days, default=None)
+        keys, income = self.fold(totals['Income'], start, end, granularity)
+        _, expense = self.fold(totals['Expense'], start, end, granularity)
+        return keys, income, expense